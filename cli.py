@@ -0,0 +1,264 @@
+"""
+Headless command line for bulk work, no display needed.
+
+    python -m cli create invoices.jsonl [--batch-size 200] [--fiscal-year 2082/2083]
+    python -m cli render OUTPUT [--zip] [--fiscal-year FY] [--from DATE] [--to DATE] [--jobs N]
+    python -m cli statements OUTPUT --from DATE --to DATE [--zip] [--jobs N] [--profile P]
+    python -m cli sales-register OUTPUT.xlsx|OUTPUT.csv --from DATE --to DATE
+    python -m cli vat-return OUTPUT.xlsx|OUTPUT.csv [--fiscal-year FY]
+    python -m cli rebuild-sales-daily
+    python -m cli backup
+
+Every command accepts --db PATH to work on a database other than the
+application's (the same as setting MOONAL_DB_PATH).
+
+Each line of a create file is one invoice:
+
+    {"client_name": "Shrestha Traders", "client_contact": "", "address": "",
+     "pan_no": "", "vat_rate": 13, "discount": 0, "paid_amount": 0,
+     "items": [{"product_id": 1, "quantity": 2, "price_per_unit": 650}]}
+
+price_per_unit defaults to the product's current price. The whole file is
+checked first and nothing is written if any line is invalid. A valid file is
+then saved --batch-size invoices per transaction, so a database error part way
+keeps the batches already committed: the command names the line its failed
+batch started at, and only the invoices from that line on need re-running.
+For an all-or-nothing import, pass a --batch-size of at least the file's
+invoice count.
+"""
+import argparse
+import json
+import os
+import sqlite3
+import sys
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m cli", description="Moonal invoicing without the GUI.")
+    parser.add_argument("--db", help="database file (default: the application's database)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    create = commands.add_parser("create", help="create invoices from a JSONL file")
+    create.add_argument("file", help="JSONL file, one invoice per line ('-' for stdin)")
+    create.add_argument("--batch-size", type=_positive_int, default=200,
+                        help="invoices written per transaction (default: 200)")
+    create.add_argument("--fiscal-year", help="numbering fiscal year, e.g. 2082/2083 (default: current)")
+
+    render = commands.add_parser("render", help="render invoice PDFs to a folder or ZIP archive")
+    render.add_argument("output", help="destination folder, or .zip file with --zip")
+    render.add_argument("--zip", action="store_true", help="write a single ZIP archive")
+    _add_period_arguments(render)
+    render.add_argument("--jobs", type=int, default=None,
+                        help="worker processes (default: one per CPU core)")
+    render.add_argument("--profile", default="compact", choices=("default", "compact"),
+                        help="PDF output profile (default: compact)")
+
+    statements = commands.add_parser("statements", help="render every customer's statement of account")
+    statements.add_argument("output", help="destination folder, or .zip file with --zip")
+    statements.add_argument("--zip", action="store_true", help="write a single ZIP archive")
+    statements.add_argument("--from", dest="start_date", required=True, help="first date, YYYY-MM-DD")
+    statements.add_argument("--to", dest="end_date", required=True, help="last date, YYYY-MM-DD")
+    statements.add_argument("--jobs", type=int, default=None,
+                            help="worker processes (default: one per CPU core)")
+    statements.add_argument("--profile", default="compact", choices=("default", "compact"),
+                            help="PDF output profile (default: compact)")
+
+    register = commands.add_parser("sales-register", help="export the sales register to Excel or CSV")
+    register.add_argument("output", help="file to write; .xlsx for an Excel workbook, otherwise CSV")
+    register.add_argument("--from", dest="start_date", required=True, help="first date, YYYY-MM-DD")
+    register.add_argument("--to", dest="end_date", required=True, help="last date, YYYY-MM-DD")
+
+    vat_return = commands.add_parser("vat-return", help="export the monthly VAT return figures of a fiscal year")
+    vat_return.add_argument("output", help="file to write; .xlsx for an Excel workbook, otherwise CSV")
+    vat_return.add_argument("--fiscal-year", help="fiscal year, e.g. 2082/2083 (default: current)")
+
+    commands.add_parser("rebuild-sales-daily", help="recompute the daily sales rollup from all invoices")
+    commands.add_parser("backup", help="take a database backup")
+    return parser
+
+
+def _positive_int(value):
+    """argparse type for counts that must be at least 1."""
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid int value: {value!r}")
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {number}")
+    return number
+
+
+def _add_period_arguments(parser):
+    parser.add_argument("--fiscal-year", help="only this fiscal year, e.g. 2082/2083")
+    parser.add_argument("--from", dest="start_date", help="first date, YYYY-MM-DD")
+    parser.add_argument("--to", dest="end_date", help="last date, YYYY-MM-DD")
+
+
+def cmd_create(args):
+    # Validate the whole file before writing anything, so a bad line never
+    # leaves a partial import behind that a corrected re-run would duplicate
+    source = sys.stdin if args.file == "-" else open(args.file, encoding="utf-8")
+    invoices = []  # (line number, save_invoice arguments)
+    errors = 0
+    with source:
+        for line_no, line in enumerate(source, 1):
+            if not line.strip():
+                continue
+            try:
+                invoices.append((line_no, _parse_invoice(json.loads(line))))
+            except (ValueError, KeyError, TypeError) as e:
+                print(f"line {line_no}: {e}", file=sys.stderr)
+                errors += 1
+    if errors:
+        print(f"{errors} invalid lines, no invoices created", file=sys.stderr)
+        return 1
+
+    created = 0
+    try:
+        for start in range(0, len(invoices), args.batch_size):
+            batch = invoices[start:start + args.batch_size]
+            try:
+                created += _save_batch([invoice for _, invoice in batch], args.fiscal_year)
+            except (sqlite3.Error, ValueError) as e:
+                print(f"line {batch[0][0]}: batch not saved: {e}", file=sys.stderr)
+                print(f"invoices before line {batch[0][0]} were saved; re-run from that line only", file=sys.stderr)
+                return 1
+    finally:
+        print(f"{created} invoices created")
+    return 0
+
+
+def _parse_invoice(record):
+    """Validate one JSONL record into save_invoice keyword arguments."""
+    from controllers.product_controller import ProductController
+
+    if not record.get("client_name"):
+        raise ValueError("client_name is required")
+    if not record.get("items"):
+        raise ValueError("an invoice needs at least one item")
+    items = []
+    for item in record["items"]:
+        product = ProductController.get_product_by_id(item["product_id"])
+        if product is None:
+            raise ValueError(f"product {item['product_id']} not found")
+        quantity = int(item["quantity"])
+        if quantity <= 0:
+            raise ValueError("quantity must be positive")
+        items.append({"product_id": product[0], "quantity": quantity,
+                      "price_per_unit": float(item.get("price_per_unit", product[2]))})
+    return {
+        "client_name": record["client_name"],
+        "client_contact": record.get("client_contact", ""),
+        "address": record.get("address", ""),
+        "pan_no": record.get("pan_no", ""),
+        "items": items,
+        "vat_rate": float(record.get("vat_rate", 13)),
+        "discount": float(record.get("discount", 0)),
+        "paid_amount": float(record.get("paid_amount", 0)),
+    }
+
+
+def _save_batch(batch, fiscal_year):
+    """Write a batch of invoices, with their stock changes, in one transaction."""
+    from config.database import transaction
+    from controllers.invoice_controller import InvoiceController
+
+    with transaction():
+        for invoice in batch:
+            InvoiceController.save_invoice(fiscal_year=fiscal_year, **invoice)
+    return len(batch)
+
+
+def cmd_render(args):
+    from services.batch_export import BatchPDFExporter
+
+    def progress(done, total):
+        print(f"\r{done}/{total} PDFs", end="", file=sys.stderr, flush=True)
+
+    count = BatchPDFExporter(workers=args.jobs, profile=args.profile).export(
+        args.output, as_zip=args.zip, start_date=args.start_date, end_date=args.end_date,
+        fiscal_year=args.fiscal_year, progress=progress)
+    print(file=sys.stderr)
+    print(f"{count} PDFs written to {args.output}")
+    return 0
+
+
+def cmd_statements(args):
+    from services.statement_service import StatementExporter
+
+    count = StatementExporter(workers=args.jobs, profile=args.profile).export(
+        args.output, args.start_date, args.end_date, as_zip=args.zip)
+    print(f"{count} statements written to {args.output}")
+    return 0
+
+
+def cmd_sales_register(args):
+    from controllers.report_controller import ReportController
+
+    count = ReportController.export_sales_register(args.start_date, args.end_date, args.output)
+    if not count:
+        print("No sales in this period")
+        return 0
+    print(f"{count} rows written to {args.output}")
+    return 0
+
+
+def cmd_vat_return(args):
+    from controllers.report_controller import ReportController
+    from utils.invoice_utils import InvoiceUtils
+
+    fiscal_year = args.fiscal_year or InvoiceUtils.get_fiscal_year_nepali()
+    totals = ReportController.export_vat_return(fiscal_year, args.output)
+    print(f"VAT return {fiscal_year} written to {args.output} (net VAT {totals['net_vat']:,.2f})")
+    return 0
+
+
+def cmd_rebuild_sales_daily(args):
+    from config.database import rebuild_sales_daily
+
+    print(f"{rebuild_sales_daily()} daily rows rebuilt")
+    return 0
+
+
+def cmd_backup(args):
+    from controllers.backup_controller import BackupController
+
+    ok, result = BackupController.create_backup("CLI", "SYSTEM")
+    if not ok:
+        print(f"Backup failed: {result}", file=sys.stderr)
+        return 1
+    print(f"Backup created: {result}")
+    return 0
+
+
+COMMANDS = {
+    "create": cmd_create,
+    "render": cmd_render,
+    "statements": cmd_statements,
+    "sales-register": cmd_sales_register,
+    "vat-return": cmd_vat_return,
+    "rebuild-sales-daily": cmd_rebuild_sales_daily,
+    "backup": cmd_backup,
+}
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    db_path = os.path.abspath(args.db) if args.db else None
+    if db_path:
+        # Set before config.database is imported so the default pool opens it
+        os.environ["MOONAL_DB_PATH"] = db_path
+
+    from config import database
+    if db_path and database.pool.db_path != db_path:
+        database.pool = database.ConnectionPool(db_path)
+    database.create_tables()
+    try:
+        return COMMANDS[args.command](args)
+    finally:
+        database.close_reporting_connections()
+        database.pool.close_all()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
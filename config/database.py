@@ -2,6 +2,9 @@ import os
 import sqlite3
 import sys
 import platform
+import threading
+from contextlib import contextmanager
+from urllib.request import pathname2url
 
 def get_persistent_db_path():
     """Determine the database path based on the running environment."""
@@ -10,7 +13,12 @@ def get_persistent_db_path():
     Returns a secure, OS-specific path for the database.
     Linux: ~/.local/share/MoonalInvoiceApp/
     Windows: %LOCALAPPDATA%/MoonalInvoiceApp/
+    MOONAL_DB_PATH overrides the location (tests, scripted runs).
     """
+    override = os.environ.get("MOONAL_DB_PATH")
+    if override:
+        return override
+
     home = os.path.expanduser("~")
     
     if platform.system() == "Windows":
@@ -45,14 +53,218 @@ def get_persistent_db_path():
 
 DB_NAME = get_persistent_db_path()
 
+
+class ConnectionPool:
+    """
+    Hands out one long-lived SQLite connection per thread.
+
+    The Tk main thread and each background worker keep their own connection for
+    the lifetime of the thread, so pragmas are applied once per connection rather
+    than once per query. Borrowing is re-entrant: a nested borrow on the same
+    thread returns the same connection, and only the outermost return discards
+    any transaction the caller left uncommitted (matching the old close() behaviour).
+    """
+
+    def __init__(self, db_path, read_only=False):
+        self.db_path = db_path
+        self.read_only = read_only
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections = {}  # threading.Thread -> sqlite3.Connection
+        self._stats = {
+            "connections_opened": 0,
+            "connections_closed": 0,
+            "borrows": 0,
+            "reuses": 0,
+        }
+
+    def _count(self, key, amount=1):
+        with self._lock:
+            self._stats[key] += amount
+
+    def _open(self):
+        if self.read_only:
+            conn = _open_reporting_connection(self.db_path)
+        else:
+            conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            # Enable Write-Ahead Logging for concurrency and safety
+            conn.execute("PRAGMA journal_mode=WAL;")
+        with self._lock:
+            self._prune_dead_threads()
+            self._connections[threading.current_thread()] = conn
+            self._stats["connections_opened"] += 1
+        return conn
+
+    def _prune_dead_threads(self):
+        """Close connections owned by threads that have exited. Caller holds the lock."""
+        for thread in [t for t in self._connections if not t.is_alive()]:
+            try:
+                self._connections.pop(thread).close()
+            except sqlite3.Error:
+                pass
+            self._stats["connections_closed"] += 1
+
+    def acquire(self):
+        """Borrow this thread's connection, opening it on first use."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._open()
+            self._local.conn = conn
+            self._local.depth = 0
+        else:
+            self._count("reuses")
+        self._local.depth += 1
+        self._count("borrows")
+        return conn
+
+    def release(self, conn):
+        """Return a borrowed connection. The outermost release rolls back leftovers."""
+        if getattr(self._local, "conn", None) is not conn:
+            return
+        self._local.depth = max(0, self._local.depth - 1)
+        if self._local.depth == 0 and conn.in_transaction:
+            conn.rollback()
+
+    @contextmanager
+    def connection(self):
+        """Context manager that borrows this thread's connection and returns it."""
+        conn = self.acquire()
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    def close_all(self):
+        """Close every pooled connection (e.g. before the database file is replaced)."""
+        with self._lock:
+            for conn in self._connections.values():
+                try:
+                    conn.close()
+                except sqlite3.Error:
+                    pass
+                self._stats["connections_closed"] += 1
+            self._connections.clear()
+        # Other threads notice the closed connection through their own thread-local
+        self._local = threading.local()
+
+    def stats(self):
+        """Return a snapshot of the churn counters."""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["open_connections"] = len(self._connections)
+        return stats
+
+
+class _PooledConnection:
+    """Proxy returned by connect_db(): close() hands the connection back to the pool."""
+
+    def __init__(self, pool, conn):
+        self._pool = pool
+        self._conn = conn
+        self._released = False
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+    def __enter__(self):
+        return self._conn.__enter__()
+
+    def __exit__(self, *exc):
+        return self._conn.__exit__(*exc)
+
+    def close(self):
+        if not self._released:
+            self._released = True
+            self._pool.release(self._conn)
+
+
+def _open_reporting_connection(db_path):
+    """
+    Open a read-only connection tuned for large scans: memory-mapped I/O, a
+    64 MB page cache and in-memory temp tables for sorting and grouping.
+    Under WAL it reads a snapshot and never blocks (or is blocked by) writers.
+    """
+    uri = f"file:{pathname2url(os.path.abspath(db_path))}?mode=ro"
+    conn = sqlite3.connect(uri, uri=True, timeout=30, check_same_thread=False)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA mmap_size=268435456")
+    conn.execute("PRAGMA cache_size=-65536")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute("PRAGMA query_only=ON")
+    return conn
+
+
+pool = ConnectionPool(DB_NAME)
+_reporting_pool = None
+_reporting_lock = threading.Lock()
+
+
+def get_connection():
+    """
+    Borrow the calling thread's pooled connection.
+
+    Usage:
+        with get_connection() as conn:
+            conn.execute(...)
+    """
+    return pool.connection()
+
+
+def get_reporting_connection():
+    """
+    Borrow the calling thread's read-only reporting connection.
+
+    Reports run on their own worker thread (see utils.async_utils.run_report_async)
+    so long aggregations never share a connection with invoice entry.
+    """
+    global _reporting_pool
+    with _reporting_lock:
+        if _reporting_pool is None or _reporting_pool.db_path != pool.db_path:
+            if _reporting_pool is not None:
+                _reporting_pool.close_all()
+            _reporting_pool = ConnectionPool(pool.db_path, read_only=True)
+        return _reporting_pool.connection()
+
+
+def close_reporting_connections():
+    """Close the reporting connections (on shutdown)."""
+    with _reporting_lock:
+        if _reporting_pool is not None:
+            _reporting_pool.close_all()
+
+
+@contextmanager
+def transaction(immediate=True):
+    """
+    Run a unit of work inside one transaction on the calling thread's connection.
+
+    BEGIN IMMEDIATE takes the write lock up front so concurrent writers queue on
+    busy_timeout instead of failing mid-transaction. Nested calls join the
+    outer transaction; only the outermost block commits or rolls back.
+    """
+    with get_connection() as conn:
+        if conn.in_transaction:
+            yield conn
+            return
+        conn.execute("BEGIN IMMEDIATE" if immediate else "BEGIN")
+        try:
+            yield conn
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+
+
+def get_pool_stats():
+    """Connection churn counters for diagnostics."""
+    return pool.stats()
+
+
 def connect_db():
-    """Connect to the SQLite database, creating it if necessary."""
+    """Borrow a pooled connection; call close() on the result to return it."""
     try:
-        conn = sqlite3.connect(DB_NAME, timeout=30)
-        conn.row_factory = sqlite3.Row
-        # Enable Write-Ahead Logging for concurrency and safety
-        conn.execute("PRAGMA journal_mode=WAL;")
-        return conn
+        return _PooledConnection(pool, pool.acquire())
     except sqlite3.Error as e:
         print(f"Error connecting to database: {e}")
         return None
@@ -60,133 +272,167 @@ def connect_db():
 
 
 def create_tables():
+    """
+    Bring the schema up to date.
 
-    conn = connect_db()
-    if conn is None:
-        print("Failed to connect to the database. Exiting.")
-        return
-
+    The schema version lives in PRAGMA user_version, so an up-to-date database
+    costs a single pragma read at startup. Pending migrations run in order,
+    each once, inside its own transaction.
+    """
     try:
-        cursor = conn.cursor()
-
-        # Users Table (RBAC)
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS users (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                username TEXT UNIQUE NOT NULL,
-                password_hash TEXT NOT NULL,
-                role TEXT CHECK(role IN ('admin','user')) NOT NULL DEFAULT 'user',
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
+        with get_connection() as conn:
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            if version >= LATEST_SCHEMA_VERSION:
+                return
+            _run_migrations(conn, version)
+    except sqlite3.Error as e:
+        print(f"Error migrating database schema: {e}")
 
-        # Products Table
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS Products (
-            product_id INTEGER PRIMARY KEY AUTOINCREMENT,
-            name TEXT NOT NULL,
-            brand TEXT,
-            viscosity TEXT,
-            category TEXT DEFAULT 'Lubricant',
-            unit TEXT DEFAULT 'Ltr',
-            price REAL NOT NULL DEFAULT 0,
-            purchase_price REAL DEFAULT 0,
-            stock_quantity INTEGER DEFAULT 0,
-            min_stock_alert INTEGER DEFAULT 10,
-            hs_code TEXT,
-            description TEXT DEFAULT '',
-            batch_number TEXT
+
+def _run_migrations(conn, current_version):
+    """Apply every registered migration newer than current_version."""
+    for version, migration in MIGRATIONS:
+        if version <= current_version:
+            continue
+        # BEGIN IMMEDIATE takes the write lock up front; re-read the version under
+        # the lock in case another process migrated the file in the meantime.
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if conn.execute("PRAGMA user_version").fetchone()[0] >= version:
+                conn.rollback()
+                continue
+            migration(conn)
+            conn.execute(f"PRAGMA user_version = {version}")
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        print(f"Applied schema migration {version:03d}: {migration.__doc__.strip()}")
+
+
+def _create_base_tables(conn):
+    """Create the original application tables if they do not exist yet."""
+    cursor = conn.cursor()
+
+    # Users Table (RBAC)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS users (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            username TEXT UNIQUE NOT NULL,
+            password_hash TEXT NOT NULL,
+            role TEXT CHECK(role IN ('admin','user')) NOT NULL DEFAULT 'user',
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
         )
-        ''')
+    ''')
+
+    # Products Table
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS Products (
+        product_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT NOT NULL,
+        brand TEXT,
+        viscosity TEXT,
+        category TEXT DEFAULT 'Lubricant',
+        unit TEXT DEFAULT 'Ltr',
+        price REAL NOT NULL DEFAULT 0,
+        purchase_price REAL DEFAULT 0,
+        stock_quantity INTEGER DEFAULT 0,
+        min_stock_alert INTEGER DEFAULT 10,
+        hs_code TEXT,
+        description TEXT DEFAULT '',
+        batch_number TEXT
+    )
+    ''')
 
 
 
-        # Audit Log Table
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS audit_log (
+    # Audit Log Table
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS audit_log (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        action TEXT NOT NULL,
+        performed_by TEXT NOT NULL,
+        details TEXT,
+        timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    ''')
+
+    # Invoices Table
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS Invoices (
+            invoice_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            invoice_number TEXT UNIQUE,
+            client_name TEXT,
+            client_contact TEXT,
+            address TEXT,
+            pan_no TEXT,
+            date TEXT,
+            subtotal REAL DEFAULT 0,
+            vat_amount REAL DEFAULT 0,
+            total_amount REAL DEFAULT 0,
+            vat_rate REAL DEFAULT 13,
+            discount REAL DEFAULT 0,
+            paid_amount REAL DEFAULT 0,
+            due_amount REAL DEFAULT 0,
+            status TEXT DEFAULT 'ACTIVE',
+            cancel_reason TEXT DEFAULT '',
+            cancelled_date TEXT DEFAULT '',
+            is_credit_note INTEGER DEFAULT 0,
+            credit_note_number TEXT,
+            cancellation_comment TEXT DEFAULT ''
+        )
+    ''')
+
+    # Invoice Items Table
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS Invoice_Items (
+            item_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            invoice_id INTEGER,
+            product_id INTEGER,
+            quantity INTEGER,
+            price_per_unit REAL,
+            total_price REAL,
+            FOREIGN KEY (invoice_id) REFERENCES Invoices(invoice_id),
+            FOREIGN KEY (product_id) REFERENCES Products(product_id)
+        )
+    ''')
+    # Customers Table (CRM)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS customers (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
-            action TEXT NOT NULL,
-            performed_by TEXT NOT NULL,
-            details TEXT,
-            timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            name TEXT NOT NULL,
+            pan_vat TEXT UNIQUE,
+            address TEXT,
+            contact_person TEXT,
+            mobile TEXT,
+            email TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
         )
-        ''')
-
-        # Invoices Table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS Invoices (
-                invoice_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                invoice_number TEXT UNIQUE,
-                client_name TEXT,
-                client_contact TEXT,
-                address TEXT,
-                pan_no TEXT,
-                date TEXT,
-                subtotal REAL DEFAULT 0,
-                vat_amount REAL DEFAULT 0,
-                total_amount REAL DEFAULT 0,
-                vat_rate REAL DEFAULT 13,
-                discount REAL DEFAULT 0,
-                paid_amount REAL DEFAULT 0,
-                due_amount REAL DEFAULT 0,
-                status TEXT DEFAULT 'ACTIVE',
-                cancel_reason TEXT DEFAULT '',
-                cancelled_date TEXT DEFAULT '',
-                is_credit_note INTEGER DEFAULT 0,
-                credit_note_number TEXT,
-                cancellation_comment TEXT DEFAULT ''
-            )
-        ''')
-
-        # Invoice Items Table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS Invoice_Items (
-                item_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                invoice_id INTEGER,
-                product_id INTEGER,
-                quantity INTEGER,
-                price_per_unit REAL,
-                total_price REAL,
-                FOREIGN KEY (invoice_id) REFERENCES Invoices(invoice_id),
-                FOREIGN KEY (product_id) REFERENCES Products(product_id)
-            )
-        ''')
-        # Customers Table (CRM)
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS customers (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT NOT NULL,
-                pan_vat TEXT UNIQUE,
-                address TEXT,
-                contact_person TEXT,
-                mobile TEXT,
-                email TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
+    ''')
 
-        # Global Settings Table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS settings (
-                key TEXT PRIMARY KEY,
-                value TEXT NOT NULL
-            )
-        ''')
-        
-        conn.commit()
-        print("Tables created successfully!")
+    # Global Settings Table
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS settings (
+            key TEXT PRIMARY KEY,
+            value TEXT NOT NULL
+        )
+    ''')
 
-        # Migrate existing tables to add new columns if missing
-        _migrate_products_table(conn)
-        _migrate_invoices_table(conn)
 
-    except sqlite3.Error as e:
-        print(f"Error creating tables: {e}")
-        return
-    finally:
-        if conn:
-            _seed_default_settings(conn)
-            conn.close()
+def _migration_001_baseline_and_indexes(conn):
+    """Baseline schema, legacy column backfill, default settings and lookup indexes."""
+    _create_base_tables(conn)
+    _migrate_products_table(conn)
+    _migrate_invoices_table(conn)
+    _seed_default_settings(conn)
+
+    cursor = conn.cursor()
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_invoices_date ON Invoices(date)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_invoices_status ON Invoices(status)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_invoices_credit_note_number ON Invoices(credit_note_number)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_invoice_items_invoice ON Invoice_Items(invoice_id)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_invoice_items_product ON Invoice_Items(product_id)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_audit_log_timestamp ON audit_log(timestamp)")
 
 
 def _seed_default_settings(conn):
@@ -200,9 +446,7 @@ def _seed_default_settings(conn):
         ('default_vat', '13'),
         ('currency_symbol', 'Rs.')
     ]
-    for key, value in defaults:
-        cursor.execute("INSERT OR IGNORE INTO settings (key, value) VALUES (?, ?)", (key, value))
-    conn.commit()
+    cursor.executemany("INSERT OR IGNORE INTO settings (key, value) VALUES (?, ?)", defaults)
 
 
 def _migrate_products_table(conn):
@@ -225,7 +469,6 @@ def _migrate_products_table(conn):
         if col_name not in existing_cols:
             cursor.execute(f"ALTER TABLE Products ADD COLUMN {col_name} {col_type}")
             print(f"Migrated Products table: added '{col_name}' column.")
-    conn.commit()
 
 
 def _migrate_invoices_table(conn):
@@ -251,4 +494,294 @@ def _migrate_invoices_table(conn):
         if col_name not in existing_cols:
             cursor.execute(f"ALTER TABLE Invoices ADD COLUMN {col_name} {col_type}")
             print(f"Migrated Invoices table: added '{col_name}' column.")
-    conn.commit()
+
+
+def _migration_002_sequences(conn):
+    """Document number sequences per series and fiscal year."""
+    from utils.invoice_utils import InvoiceUtils
+
+    cursor = conn.cursor()
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS sequences (
+            series TEXT NOT NULL,
+            fiscal_year TEXT NOT NULL,
+            last_value INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (series, fiscal_year)
+        ) WITHOUT ROWID
+    ''')
+
+    # Seed each sequence from the highest number already issued
+    last_values = {}
+    cursor.execute("SELECT invoice_number FROM Invoices WHERE invoice_number IS NOT NULL")
+    for (invoice_number,) in cursor.fetchall():
+        parsed = InvoiceUtils.parse_document_number(invoice_number)
+        if parsed:
+            series, fiscal_year, value = parsed
+            key = (series, fiscal_year)
+            last_values[key] = max(last_values.get(key, 0), value)
+    cursor.executemany(
+        "INSERT OR REPLACE INTO sequences (series, fiscal_year, last_value) VALUES (?, ?, ?)",
+        [(series, fy, value) for (series, fy), value in last_values.items()]
+    )
+
+
+def _migration_003_invoice_search(conn):
+    """Full-text search index over invoice number, client, PAN and status."""
+    cursor = conn.cursor()
+    cursor.execute("UPDATE Invoices SET status = 'ACTIVE' WHERE status IS NULL")
+    try:
+        # External-content table: the text lives in Invoices, FTS keeps only the index
+        cursor.execute("""
+            CREATE VIRTUAL TABLE IF NOT EXISTS invoices_fts USING fts5(
+                invoice_number, client_name, pan_no, status,
+                content='Invoices', content_rowid='invoice_id', prefix='2 3 4'
+            )
+        """)
+    except sqlite3.OperationalError as e:
+        # SQLite built without FTS5: searches fall back to LIKE
+        print(f"Invoice search index unavailable: {e}")
+        return
+
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS invoices_fts_insert AFTER INSERT ON Invoices BEGIN
+            INSERT INTO invoices_fts (rowid, invoice_number, client_name, pan_no, status)
+            VALUES (new.invoice_id, new.invoice_number, new.client_name, new.pan_no, new.status);
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS invoices_fts_delete AFTER DELETE ON Invoices BEGIN
+            INSERT INTO invoices_fts (invoices_fts, rowid, invoice_number, client_name, pan_no, status)
+            VALUES ('delete', old.invoice_id, old.invoice_number, old.client_name, old.pan_no, old.status);
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS invoices_fts_update
+        AFTER UPDATE OF invoice_number, client_name, pan_no, status ON Invoices BEGIN
+            INSERT INTO invoices_fts (invoices_fts, rowid, invoice_number, client_name, pan_no, status)
+            VALUES ('delete', old.invoice_id, old.invoice_number, old.client_name, old.pan_no, old.status);
+            INSERT INTO invoices_fts (rowid, invoice_number, client_name, pan_no, status)
+            VALUES (new.invoice_id, new.invoice_number, new.client_name, new.pan_no, new.status);
+        END
+    """)
+    cursor.execute("INSERT INTO invoices_fts (invoices_fts) VALUES ('rebuild')")
+
+
+def _migration_004_product_search(conn):
+    """Trigram search index over product name, brand, viscosity, HS code and category."""
+    cursor = conn.cursor()
+    try:
+        # Trigram tokens match any substring of three or more characters
+        cursor.execute("""
+            CREATE VIRTUAL TABLE IF NOT EXISTS products_fts USING fts5(
+                name, brand, viscosity, hs_code, category,
+                content='Products', content_rowid='product_id', tokenize='trigram'
+            )
+        """)
+    except sqlite3.OperationalError as e:
+        # SQLite older than 3.34 or built without FTS5: searches fall back to LIKE
+        print(f"Product search index unavailable: {e}")
+        return
+
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS products_fts_insert AFTER INSERT ON Products BEGIN
+            INSERT INTO products_fts (rowid, name, brand, viscosity, hs_code, category)
+            VALUES (new.product_id, new.name, new.brand, new.viscosity, new.hs_code, new.category);
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS products_fts_delete AFTER DELETE ON Products BEGIN
+            INSERT INTO products_fts (products_fts, rowid, name, brand, viscosity, hs_code, category)
+            VALUES ('delete', old.product_id, old.name, old.brand, old.viscosity, old.hs_code, old.category);
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS products_fts_update
+        AFTER UPDATE OF name, brand, viscosity, hs_code, category ON Products BEGIN
+            INSERT INTO products_fts (products_fts, rowid, name, brand, viscosity, hs_code, category)
+            VALUES ('delete', old.product_id, old.name, old.brand, old.viscosity, old.hs_code, old.category);
+            INSERT INTO products_fts (rowid, name, brand, viscosity, hs_code, category)
+            VALUES (new.product_id, new.name, new.brand, new.viscosity, new.hs_code, new.category);
+        END
+    """)
+    cursor.execute("INSERT INTO products_fts (products_fts) VALUES ('rebuild')")
+
+
+def _migration_005_customer_statement_indexes(conn):
+    """Indexes for per-customer statements: documents by client name or PAN, in date order."""
+    cursor = conn.cursor()
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_invoices_client_date ON Invoices(client_name COLLATE NOCASE, date)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_invoices_pan_date ON Invoices(pan_no, date)")
+
+
+def _migration_006_sales_daily(conn):
+    """Daily sales rollup per fiscal year, maintained by InvoiceController."""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS sales_daily (
+            date TEXT NOT NULL,
+            fiscal_year TEXT NOT NULL DEFAULT '',
+            invoice_count INTEGER NOT NULL DEFAULT 0,
+            taxable REAL NOT NULL DEFAULT 0,
+            vat REAL NOT NULL DEFAULT 0,
+            total REAL NOT NULL DEFAULT 0,
+            credit_note_total REAL NOT NULL DEFAULT 0,
+            cancelled_total REAL NOT NULL DEFAULT 0,
+            PRIMARY KEY (date, fiscal_year)
+        ) WITHOUT ROWID
+    """)
+    _fill_sales_daily(conn)
+
+
+def _create_sales_daily(conn):
+    """Create sales_daily, empty, in its current shape (dropping any older version)."""
+    conn.execute("DROP TABLE IF EXISTS sales_daily")
+    conn.execute("""
+        CREATE TABLE sales_daily (
+            date TEXT NOT NULL,
+            fiscal_year TEXT NOT NULL DEFAULT '',
+            bs_month TEXT,
+            invoice_count INTEGER NOT NULL DEFAULT 0,
+            cancelled_count INTEGER NOT NULL DEFAULT 0,
+            credit_note_count INTEGER NOT NULL DEFAULT 0,
+            taxable REAL NOT NULL DEFAULT 0,
+            exempt REAL NOT NULL DEFAULT 0,
+            vat REAL NOT NULL DEFAULT 0,
+            total REAL NOT NULL DEFAULT 0,
+            credit_note_taxable REAL NOT NULL DEFAULT 0,
+            credit_note_vat REAL NOT NULL DEFAULT 0,
+            credit_note_total REAL NOT NULL DEFAULT 0,
+            cancelled_total REAL NOT NULL DEFAULT 0,
+            PRIMARY KEY (date, fiscal_year)
+        ) WITHOUT ROWID
+    """)
+    # Month summaries group on this index, a range of BS months per fiscal year
+    conn.execute("CREATE INDEX idx_sales_daily_bs_month ON sales_daily(bs_month)")
+
+
+def _fill_sales_daily(conn):
+    """
+    Recompute every sales_daily row from Invoices on conn (inside a transaction).
+    The table is recreated in its current shape first, so migrations written
+    before a column was added still refill it correctly.
+    """
+    _register_invoice_functions(conn)
+    _create_sales_daily(conn)
+    # invoice_count counts invoices issued that day, later cancellations included,
+    # and cancelled_count/cancelled_total book cancellations on the original's date;
+    # taxable/vat/total are net of credit notes, like the sales register, and
+    # taxable is after discount (total less VAT); exempt is the part of it
+    # invoiced without VAT. Together they give the VAT return's figures.
+    conn.execute("""
+        INSERT INTO sales_daily (date, fiscal_year, bs_month, invoice_count, cancelled_count, credit_note_count,
+                                 taxable, exempt, vat, total, credit_note_taxable, credit_note_vat,
+                                 credit_note_total, cancelled_total)
+        SELECT date, document_fiscal_year(invoice_number) AS fy, bs_month(date),
+               SUM(cn = 0), SUM(cn = 0 AND status = 'CANCELLED'), SUM(cn = 1),
+               SUM(total - vat), SUM(CASE WHEN cn = 0 AND vat_rate <= 0 THEN total - vat ELSE 0 END),
+               SUM(vat), SUM(total),
+               SUM(CASE WHEN cn = 1 THEN total - vat ELSE 0 END), SUM(CASE WHEN cn = 1 THEN vat ELSE 0 END),
+               SUM(CASE WHEN cn = 1 THEN total ELSE 0 END),
+               SUM(CASE WHEN cn = 0 AND status = 'CANCELLED' THEN total ELSE 0 END)
+        FROM (SELECT date, invoice_number, status, COALESCE(is_credit_note, 0) AS cn,
+                     COALESCE(vat_rate, 0) AS vat_rate, COALESCE(total_amount, 0) AS total,
+                     COALESCE(vat_amount, 0) AS vat
+              FROM Invoices
+              WHERE date IS NOT NULL)
+        GROUP BY date, fy
+    """)
+
+
+def _register_invoice_functions(conn):
+    """SQL functions exposing the document number and calendar helpers to backfills."""
+    from utils.invoice_utils import InvoiceUtils
+
+    conn.create_function("document_fiscal_year", 1, InvoiceUtils.document_fiscal_year, deterministic=True)
+    conn.create_function("bs_month", 1, InvoiceUtils.get_bs_month, deterministic=True)
+
+
+def _migration_007_invoice_periods(conn):
+    """Stored fiscal year and Bikram Sambat month per document, indexed for period reports."""
+    existing_cols = {row[1] for row in conn.execute("PRAGMA table_info(Invoices)")}
+    for col_name in ("fiscal_year", "bs_month"):
+        if col_name not in existing_cols:
+            conn.execute(f"ALTER TABLE Invoices ADD COLUMN {col_name} TEXT")
+    _register_invoice_functions(conn)
+    conn.execute("UPDATE Invoices SET fiscal_year = document_fiscal_year(invoice_number), bs_month = bs_month(date)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_invoices_fy_bs_month ON Invoices(fiscal_year, bs_month)")
+
+
+def _migration_008_sales_daily_net_taxable(conn):
+    """Refill sales_daily so taxable is the after-discount value VAT was charged on."""
+    _fill_sales_daily(conn)
+
+
+def _migration_009_invoice_fiscal_year_index(conn):
+    """
+    Index fiscal_year with invoice_id so the invoice list filtered by year
+    pages newest first straight off the index. Period reports now go by date,
+    so the (fiscal_year, bs_month) index has no reader left.
+    """
+    conn.execute("DROP INDEX IF EXISTS idx_invoices_fy_bs_month")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_invoices_fy_id ON Invoices(fiscal_year, invoice_id)")
+
+
+# Tables whose commits the repository cache must notice, whichever connection makes them
+VERSIONED_TABLES = ("Products", "customers", "settings")
+
+
+def _migration_010_table_versions(conn):
+    """
+    A change counter per cached table, bumped by triggers on every row written,
+    so the repository cache can tell which tables a commit touched.
+    """
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS table_versions (
+            name TEXT PRIMARY KEY,
+            version INTEGER NOT NULL DEFAULT 0
+        ) WITHOUT ROWID
+    """)
+    for table in VERSIONED_TABLES:
+        conn.execute("INSERT OR IGNORE INTO table_versions (name) VALUES (?)", (table,))
+        for event in ("INSERT", "UPDATE", "DELETE"):
+            conn.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS trg_{table.lower()}_{event.lower()}_version
+                AFTER {event} ON {table}
+                BEGIN
+                    UPDATE table_versions SET version = version + 1 WHERE name = '{table}';
+                END
+            """)
+
+
+def _migration_011_sales_daily_bs_month(conn):
+    """Store and index each day's Bikram Sambat month in sales_daily, for month summaries."""
+    _fill_sales_daily(conn)
+
+
+def _migration_012_sales_daily_vat_return(conn):
+    """Add the exempt, credit note and count figures the VAT return reads from sales_daily."""
+    _fill_sales_daily(conn)
+
+
+def rebuild_sales_daily():
+    """Rebuild the sales_daily rollup from the invoice history (backfill or repair)."""
+    with transaction() as conn:
+        _fill_sales_daily(conn)
+        return conn.execute("SELECT COUNT(*) FROM sales_daily").fetchone()[0]
+
+
+# Numbered schema migrations, applied in order and recorded in PRAGMA user_version.
+# Never edit or renumber a shipped migration; append a new one instead.
+MIGRATIONS = [
+    (1, _migration_001_baseline_and_indexes),
+    (2, _migration_002_sequences),
+    (3, _migration_003_invoice_search),
+    (4, _migration_004_product_search),
+    (5, _migration_005_customer_statement_indexes),
+    (6, _migration_006_sales_daily),
+    (7, _migration_007_invoice_periods),
+    (8, _migration_008_sales_daily_net_taxable),
+    (9, _migration_009_invoice_fiscal_year_index),
+    (10, _migration_010_table_versions),
+    (11, _migration_011_sales_daily_bs_month),
+    (12, _migration_012_sales_daily_vat_return),
+]
+LATEST_SCHEMA_VERSION = MIGRATIONS[-1][0]
@@ -6,6 +6,8 @@ class Settings:
     COMPANY_CONTACT = "9704508000"
     COMPANY_EMAIL = "moonalpvtltd@gmail.com"
     APP_DIR_NAME = "MoonalInvoiceApp"
+    # PDFService output profile for printed invoices ("default" or "compact")
+    PDF_PROFILE = "compact"
 
     # ── Warm Light-Mode Golden Palette ──────────────────────────────
     COLORS = {
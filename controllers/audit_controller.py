@@ -1,6 +1,6 @@
 import sqlite3
 from datetime import datetime
-from config.database import connect_db
+from config.database import get_connection, transaction
 
 class AuditLogger:
     @staticmethod
@@ -13,14 +13,12 @@ class AuditLogger:
             details (str): Additional context.
         """
         try:
-            conn = connect_db()
-            cursor = conn.cursor()
-            cursor.execute("""
-                INSERT INTO audit_log (action, performed_by, details, timestamp)
-                VALUES (?, ?, ?, ?)
-            """, (action, performed_by, details, datetime.now().strftime("%Y-%m-%d %H:%M:%S")))
-            conn.commit()
-            conn.close()
+            # Joins the caller's transaction if one is open instead of committing it early
+            with transaction() as conn:
+                conn.execute("""
+                    INSERT INTO audit_log (action, performed_by, details, timestamp)
+                    VALUES (?, ?, ?, ?)
+                """, (action, performed_by, details, datetime.now().strftime("%Y-%m-%d %H:%M:%S")))
             print(f"[AUDIT] {action} by {performed_by}")
         except Exception as e:
             print(f"[AUDIT ERROR] Failed to log action: {e}")
@@ -28,9 +26,7 @@ class AuditLogger:
     @staticmethod
     def get_logs(limit=100):
         """Fetch latest audit logs."""
-        conn = connect_db()
-        cursor = conn.cursor()
-        cursor.execute("SELECT * FROM audit_log ORDER BY timestamp DESC LIMIT ?", (limit,))
-        logs = cursor.fetchall()
-        conn.close()
-        return logs
+        with get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT * FROM audit_log ORDER BY timestamp DESC LIMIT ?", (limit,))
+            return cursor.fetchall()
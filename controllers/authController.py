@@ -1,7 +1,7 @@
 import hashlib
 import sqlite3
 import bcrypt
-from config.database import connect_db
+from config.database import get_connection
 from controllers.audit_controller import AuditLogger
 
 class AuthController:
@@ -16,35 +16,33 @@ class AuthController:
     @staticmethod
     def initialize_users():
         """Create default Admin and standard User if none exist."""
-        conn = connect_db()
-        cursor = conn.cursor()
-        
-        # Check if any users exist
-        cursor.execute("SELECT COUNT(*) FROM users")
-        if cursor.fetchone()[0] == 0:
-            # Create Default Admin
-            admin_pass = AuthController._hash_password("admin123")
-            cursor.execute("INSERT INTO users (username, password_hash, role) VALUES (?, ?, ?)",
-                           ("admin", admin_pass, "admin"))
-            
-            # Create Default User
-            user_pass = AuthController._hash_password("invoice@user")
-            cursor.execute("INSERT INTO users (username, password_hash, role) VALUES (?, ?, ?)",
-                           ("moonal@invoice", user_pass, "user"))
+        with get_connection() as conn:
+            cursor = conn.cursor()
             
-            conn.commit()
-            AuditLogger.log_action("SYSTEM_INIT", "SYSTEM", "Created default users")
-            print("Default users initialized.")
-        conn.close()
+            # Check if any users exist
+            cursor.execute("SELECT COUNT(*) FROM users")
+            if cursor.fetchone()[0] == 0:
+                # Create Default Admin
+                admin_pass = AuthController._hash_password("admin123")
+                cursor.execute("INSERT INTO users (username, password_hash, role) VALUES (?, ?, ?)",
+                               ("admin", admin_pass, "admin"))
+                
+                # Create Default User
+                user_pass = AuthController._hash_password("invoice@user")
+                cursor.execute("INSERT INTO users (username, password_hash, role) VALUES (?, ?, ?)",
+                               ("moonal@invoice", user_pass, "user"))
+                
+                conn.commit()
+                AuditLogger.log_action("SYSTEM_INIT", "SYSTEM", "Created default users")
+                print("Default users initialized.")
 
     @staticmethod
     def authenticate(username, password):
         """Verify credentials and set session."""
-        conn = connect_db()
-        cursor = conn.cursor()
-        cursor.execute("SELECT password_hash, role FROM users WHERE username = ?", (username,))
-        row = cursor.fetchone()
-        conn.close()
+        with get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT password_hash, role FROM users WHERE username = ?", (username,))
+            row = cursor.fetchone()
 
         if row:
             stored_hash, role = row
@@ -66,10 +64,9 @@ class AuthController:
                     # AUTO-MIGRATE to Bcrypt
                     try:
                         new_hash = AuthController._hash_password(password)
-                        conn = connect_db()
-                        conn.execute("UPDATE users SET password_hash = ? WHERE username = ?", (new_hash, username))
-                        conn.commit()
-                        conn.close()
+                        with get_connection() as conn:
+                            conn.execute("UPDATE users SET password_hash = ? WHERE username = ?", (new_hash, username))
+                            conn.commit()
                         AuditLogger.log_action("SECURITY_UPGRADE", username, "Migrated to bcrypt")
                         print(f"Migrated user '{username}' to bcrypt.")
                     except Exception as e:
@@ -105,10 +102,9 @@ class AuthController:
         if not AuthController.is_admin(): return False
         
         new_hash = AuthController._hash_password(new_password)
-        conn = connect_db()
-        conn.execute("UPDATE users SET password_hash = ? WHERE username = ?", (new_hash, username))
-        conn.commit()
-        conn.close()
+        with get_connection() as conn:
+            conn.execute("UPDATE users SET password_hash = ? WHERE username = ?", (new_hash, username))
+            conn.commit()
         AuditLogger.log_action("ADMIN_PASS_RESET", AuthController.CURRENT_USER, f"Target: {username}")
         return True
 
@@ -118,13 +114,11 @@ class AuthController:
         if not AuthController.is_admin(): return False, "Unauthorized"
         
         try:
-            conn = connect_db()
-            cursor = conn.cursor()
             p_hash = AuthController._hash_password(password)
-            cursor.execute("INSERT INTO users (username, password_hash, role) VALUES (?, ?, ?)", 
-                           (username, p_hash, role))
-            conn.commit()
-            conn.close()
+            with get_connection() as conn:
+                conn.execute("INSERT INTO users (username, password_hash, role) VALUES (?, ?, ?)", 
+                             (username, p_hash, role))
+                conn.commit()
             AuditLogger.log_action("USER_CREATE", AuthController.CURRENT_USER, f"Created {username} ({role})")
             return True, "User created successfully"
         except sqlite3.IntegrityError:
@@ -136,12 +130,10 @@ class AuthController:
     def get_all_users():
         """Get list of users (Admin only)."""
         if not AuthController.is_admin(): return []
-        conn = connect_db()
-        cursor = conn.cursor()
-        cursor.execute("SELECT id, username, role, created_at FROM users")
-        users = cursor.fetchall()
-        conn.close()
-        return users
+        with get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT id, username, role, created_at FROM users")
+            return cursor.fetchall()
 
     @staticmethod
     def delete_user(username):
@@ -149,22 +141,19 @@ class AuthController:
         if not AuthController.is_admin(): return False, "Unauthorized"
         if username == AuthController.CURRENT_USER: return False, "Cannot delete yourself"
         
-        conn = connect_db()
-        cursor = conn.cursor()
-        cursor.execute("DELETE FROM users WHERE username = ?", (username,))
-        conn.commit()
-        conn.close()
+        with get_connection() as conn:
+            conn.execute("DELETE FROM users WHERE username = ?", (username,))
+            conn.commit()
         AuditLogger.log_action("USER_DELETE", AuthController.CURRENT_USER, f"Deleted {username}")
         return True, "User deleted"
 
     @staticmethod
     def change_password(username, current_password, new_password):
         """Change password after verifying the current one."""
-        conn = connect_db()
-        cursor = conn.cursor()
-        cursor.execute("SELECT password_hash FROM users WHERE username = ?", (username,))
-        row = cursor.fetchone()
-        conn.close()
+        with get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT password_hash FROM users WHERE username = ?", (username,))
+            row = cursor.fetchone()
 
         if not row:
             raise ValueError("User not found.")
@@ -191,10 +180,9 @@ class AuthController:
 
         # Update to new password
         new_hash = AuthController._hash_password(new_password)
-        conn = connect_db()
-        conn.execute("UPDATE users SET password_hash = ? WHERE username = ?", (new_hash, username))
-        conn.commit()
-        conn.close()
+        with get_connection() as conn:
+            conn.execute("UPDATE users SET password_hash = ? WHERE username = ?", (new_hash, username))
+            conn.commit()
         AuditLogger.log_action("PASSWORD_CHANGE", username, "Password changed by user")
 
     @staticmethod
@@ -205,19 +193,17 @@ class AuthController:
             raise ValueError("Invalid security PINs.")
 
         # Check user exists
-        conn = connect_db()
-        cursor = conn.cursor()
-        cursor.execute("SELECT id FROM users WHERE username = ?", (username,))
-        row = cursor.fetchone()
-        if not row:
-            conn.close()
-            raise ValueError("User not found.")
-
-        # Reset password
-        new_hash = AuthController._hash_password(new_password)
-        cursor.execute("UPDATE users SET password_hash = ? WHERE username = ?", (new_hash, username))
-        conn.commit()
-        conn.close()
+        with get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT id FROM users WHERE username = ?", (username,))
+            row = cursor.fetchone()
+            if not row:
+                raise ValueError("User not found.")
+
+            # Reset password
+            new_hash = AuthController._hash_password(new_password)
+            cursor.execute("UPDATE users SET password_hash = ? WHERE username = ?", (new_hash, username))
+            conn.commit()
         AuditLogger.log_action("PASSWORD_RESET", username, "Password reset via security PINs")
 
     @staticmethod
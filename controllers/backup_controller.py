@@ -1,9 +1,10 @@
-import shutil
+import sqlite3
 import os
 import glob
 from datetime import datetime
-from config.database import DB_NAME
+from config.database import DB_NAME, get_connection
 from controllers.audit_controller import AuditLogger
+from services.repository_cache import repository_cache
 
 class BackupController:
     BACKUP_DIR = os.path.join(os.path.dirname(DB_NAME), "backups")
@@ -26,8 +27,14 @@ class BackupController:
             filename = f"backup_{timestamp}.sqlite"
             dest = os.path.join(BackupController.BACKUP_DIR, filename)
             
-            # Using copy2 to preserve metadata
-            shutil.copy2(DB_NAME, dest)
+            # Pooled connections stay open, so recent commits may still live in the
+            # WAL file; the online backup API copies a consistent snapshot of both.
+            with get_connection() as conn:
+                target = sqlite3.connect(dest)
+                try:
+                    conn.backup(target)
+                finally:
+                    target.close()
             
             AuditLogger.log_action("BACKUP_CREATE", user, f"Trigger: {trigger} | File: {filename}")
             BackupController.cleanup_old_backups()
@@ -100,9 +107,15 @@ class BackupController:
             # 1. Create a safety backup of current state
             BackupController.create_backup("PRE_RESTORE", user)
             
-            # 2. Restore (Copy backup to DB_NAME)
-            # Assuming all connections are closed by caller or transient
-            shutil.copy2(backup_path, DB_NAME)
+            # 2. Restore into the live database through the backup API so that
+            # pooled connections and the WAL file stay consistent.
+            source = sqlite3.connect(backup_path)
+            try:
+                with get_connection() as conn:
+                    source.backup(conn)
+            finally:
+                source.close()
+            repository_cache.invalidate()
             
             AuditLogger.log_action("RESTORE_SUCCESS", user, f"Restored from {filename}")
             return True, "Database restored successfully. Please restart the application."
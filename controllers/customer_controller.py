@@ -1,77 +1,65 @@
-from config.database import connect_db
+from config.database import get_connection
+from services.repository_cache import repository_cache
 
 class CustomerController:
     @staticmethod
     def add_customer(name, pan_vat, address, contact_person, mobile, email):
-        conn = connect_db()
-        cursor = conn.cursor()
-        try:
+        with get_connection() as conn:
+            cursor = conn.cursor()
             cursor.execute("""
                 INSERT INTO customers (name, pan_vat, address, contact_person, mobile, email)
                 VALUES (?, ?, ?, ?, ?, ?)
             """, (name, pan_vat, address, contact_person, mobile, email))
             conn.commit()
-            return cursor.lastrowid
-        except Exception as e:
-            raise e
-        finally:
-            conn.close()
+        repository_cache.invalidate("customers")
+        return cursor.lastrowid
 
     @staticmethod
     def update_customer(customer_id, name, pan_vat, address, contact_person, mobile, email):
-        conn = connect_db()
-        cursor = conn.cursor()
-        try:
+        with get_connection() as conn:
+            cursor = conn.cursor()
             cursor.execute("""
                 UPDATE customers 
                 SET name=?, pan_vat=?, address=?, contact_person=?, mobile=?, email=?
                 WHERE id=?
             """, (name, pan_vat, address, contact_person, mobile, email, customer_id))
             conn.commit()
-        except Exception as e:
-            raise e
-        finally:
-            conn.close()
+        repository_cache.invalidate("customers")
 
     @staticmethod
     def delete_customer(customer_id):
-        conn = connect_db()
-        try:
+        with get_connection() as conn:
             conn.execute("DELETE FROM customers WHERE id = ?", (customer_id,))
             conn.commit()
-        except Exception as e:
-            raise e
-        finally:
-            conn.close()
+        repository_cache.invalidate("customers")
 
     @staticmethod
     def get_all_customers():
-        conn = connect_db()
-        cursor = conn.cursor()
-        cursor.execute("SELECT * FROM customers ORDER BY name ASC")
-        rows = cursor.fetchall()
-        conn.close()
-        return rows
+        return list(repository_cache.get_all("customers"))
+
+    @staticmethod
+    def _load_customers():
+        with get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT * FROM customers ORDER BY name ASC")
+            return cursor.fetchall()
 
     @staticmethod
     def search_customers(query):
-        conn = connect_db()
-        cursor = conn.cursor()
-        search_term = f"%{query}%"
-        cursor.execute("""
-            SELECT * FROM customers 
-            WHERE name LIKE ? OR pan_vat LIKE ? OR mobile LIKE ?
-            ORDER BY name ASC
-        """, (search_term, search_term, search_term))
-        rows = cursor.fetchall()
-        conn.close()
-        return rows
+        with get_connection() as conn:
+            cursor = conn.cursor()
+            search_term = f"%{query}%"
+            cursor.execute("""
+                SELECT * FROM customers 
+                WHERE name LIKE ? OR pan_vat LIKE ? OR mobile LIKE ?
+                ORDER BY name ASC
+            """, (search_term, search_term, search_term))
+            return cursor.fetchall()
 
     @staticmethod
     def get_customer_by_id(customer_id):
-        conn = connect_db()
-        cursor = conn.cursor()
-        cursor.execute("SELECT * FROM customers WHERE id = ?", (customer_id,))
-        row = cursor.fetchone()
-        conn.close()
-        return row
+        return repository_cache.get_by_id("customers", customer_id)
+
+
+repository_cache.register("customers", CustomerController._load_customers, key=lambda row: row[0],
+                          tables=["customers"])
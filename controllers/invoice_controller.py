@@ -1,10 +1,17 @@
-from config.database import connect_db
+import json
+import sqlite3
+from config.database import get_connection, transaction
 from datetime import datetime
 from utils.invoice_utils import InvoiceUtils
 from controllers.product_controller import ProductController
+from services.repository_cache import repository_cache
  
 
 class InvoiceController:
+
+    # Document number series: tax invoices and credit notes are numbered independently
+    SERIES_INVOICE = "MU"
+    SERIES_CREDIT_NOTE = "CN"
     
     CANCELLATION_REASONS = [
         "Business permanently closed",
@@ -20,9 +27,12 @@ class InvoiceController:
     ]
 
     @staticmethod
-    def create_invoice(invoice_number, client_name, client_contact, address, pan_no, items, vat_rate, discount, paid_amount, is_credit_note=False, original_invoice_id=None, cancellation_comment=''):
-        conn = connect_db()
-        cursor = conn.cursor()
+    def create_invoice(invoice_number, client_name, client_contact, address, pan_no, items, vat_rate, discount, paid_amount, is_credit_note=False, original_invoice_id=None, cancellation_comment='', fiscal_year=None):
+        """
+        Insert an invoice (or credit note) with its items and return the new invoice_id.
+        Pass invoice_number=None to allocate the next number of the series inside
+        the same transaction as the insert.
+        """
         date = datetime.now().strftime("%Y-%m-%d")
         
         # Convert and validate item data to ensure proper calculations
@@ -44,39 +54,131 @@ class InvoiceController:
         total_amount = price_after_discount + vat_amount
         due_amount = total_amount - paid_amount
 
-        # Insert invoice data
-        cursor.execute('''
-            INSERT INTO Invoices (client_name, client_contact, address, pan_no, invoice_number, date, subtotal, vat_amount, discount, total_amount, vat_rate, paid_amount, due_amount, status, is_credit_note, credit_note_number, cancellation_comment)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 'ACTIVE', ?, ?, ?)
-        ''', (client_name, client_contact, address, pan_no, invoice_number, date, subtotal, vat_amount, discount, total_amount, vat_rate, paid_amount, due_amount, 1 if is_credit_note else 0, invoice_number if is_credit_note else None, cancellation_comment))
-        
-        invoice_id = cursor.lastrowid
+        with transaction() as conn:
+            cursor = conn.cursor()
 
-        # Insert invoice items
-        for item in items:
+            series = InvoiceController.SERIES_CREDIT_NOTE if is_credit_note else InvoiceController.SERIES_INVOICE
+            if invoice_number is None:
+                invoice_number = InvoiceController._allocate_number(
+                    conn, series, fiscal_year or InvoiceUtils.get_fiscal_year_nepali())
+            else:
+                InvoiceController._sync_sequence(conn, invoice_number)
+
+            # Insert invoice data
             cursor.execute('''
+                INSERT INTO Invoices (client_name, client_contact, address, pan_no, invoice_number, date, subtotal, vat_amount, discount, total_amount, vat_rate, paid_amount, due_amount, status, is_credit_note, credit_note_number, cancellation_comment, fiscal_year, bs_month)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 'ACTIVE', ?, ?, ?, ?, ?)
+            ''', (client_name, client_contact, address, pan_no, invoice_number, date, subtotal, vat_amount, discount, total_amount, vat_rate, paid_amount, due_amount, 1 if is_credit_note else 0, invoice_number if is_credit_note else None, cancellation_comment,
+                  InvoiceUtils.document_fiscal_year(invoice_number), InvoiceUtils.get_bs_month(date)))
+            
+            invoice_id = cursor.lastrowid
+            InvoiceController._add_to_sales_daily(conn, [InvoiceController._sales_daily_delta(
+                date, invoice_number, vat_amount, total_amount, is_credit_note, vat_rate=vat_rate)])
+
+            # Insert invoice items
+            cursor.executemany('''
                 INSERT INTO Invoice_Items (invoice_id, product_id, quantity, price_per_unit, total_price)
                 VALUES (?, ?, ?, ?, ?)
-            ''', (invoice_id, item['product_id'], item['quantity'], item['price_per_unit'], item['quantity'] * item['price_per_unit']))
+            ''', [(invoice_id, item['product_id'], item['quantity'], item['price_per_unit'], item['quantity'] * item['price_per_unit'])
+                  for item in items])
 
-        conn.commit()
-        conn.close()
         return invoice_id
+
+    @staticmethod
+    def save_invoice(client_name, client_contact, address, pan_no, items, vat_rate, discount, paid_amount, fiscal_year=None):
+        """
+        Unit of work for a new sale.
+        Allocates the number and writes the header, the line items and the stock
+        decrements in one transaction with a single commit. Any failure rolls the
+        whole sale back, so stock never drifts from invoices.
+        Returns (invoice_id, invoice_number).
+        """
+        with transaction():
+            invoice_id = InvoiceController.create_invoice(
+                None, client_name, client_contact, address, pan_no, items,
+                vat_rate, discount, paid_amount, fiscal_year=fiscal_year
+            )
+            ProductController.adjust_stock_bulk(
+                [(item['product_id'], -item['quantity']) for item in items])
+            invoice_number = InvoiceController.get_invoice_number(invoice_id)
+        return invoice_id, invoice_number
+
+    @staticmethod
+    def _allocate_number(conn, series, fiscal_year):
+        """
+        Atomically take the next value of a series on a connection that already
+        holds the write lock (BEGIN IMMEDIATE), so two counters saving at the same
+        moment can never read the same number.
+        """
+        row = conn.execute("""
+            INSERT INTO sequences (series, fiscal_year, last_value) VALUES (?, ?, 1)
+            ON CONFLICT(series, fiscal_year) DO UPDATE SET last_value = last_value + 1
+            RETURNING last_value
+        """, (series, fiscal_year)).fetchone()
+        return InvoiceUtils.format_document_number(series, fiscal_year, row[0])
+
+    @staticmethod
+    def _sync_sequence(conn, invoice_number):
+        """Keep the sequence ahead of an explicitly supplied document number."""
+        parsed = InvoiceUtils.parse_document_number(invoice_number)
+        if parsed:
+            conn.execute("""
+                INSERT INTO sequences (series, fiscal_year, last_value) VALUES (?, ?, ?)
+                ON CONFLICT(series, fiscal_year) DO UPDATE SET last_value = MAX(last_value, excluded.last_value)
+            """, parsed)
+
+    @staticmethod
+    def _sales_daily_delta(date, invoice_number, vat=0, total=0, is_credit_note=False, cancellation=None,
+                           vat_rate=0):
+        """
+        One document's contribution to its day's sales_daily row, with its
+        figures in SALES_DAILY_SUMS order. The taxable value is what VAT was
+        charged on, i.e. after discount: total less VAT; an invoice without
+        VAT is also booked as exempt. For a cancellation, pass the original's
+        total as `cancellation` (0 for a zero-total invoice); it is not a new
+        invoice, so it is counted as cancelled only.
+        """
+        is_invoice = not is_credit_note and cancellation is None
+        taxable = total - vat
+        return (date, InvoiceUtils.document_fiscal_year(invoice_number), InvoiceUtils.get_bs_month(date),
+                1 if is_invoice else 0, 0 if cancellation is None else 1, 1 if is_credit_note else 0,
+                taxable, taxable if is_invoice and (vat_rate or 0) <= 0 else 0, vat, total,
+                taxable if is_credit_note else 0, vat if is_credit_note else 0,
+                total if is_credit_note else 0, cancellation or 0)
+
+    # sales_daily figures added up by _add_to_sales_daily, after date, fiscal_year, bs_month
+    SALES_DAILY_SUMS = ("invoice_count", "cancelled_count", "credit_note_count", "taxable", "exempt", "vat",
+                        "total", "credit_note_taxable", "credit_note_vat", "credit_note_total", "cancelled_total")
+
+    @staticmethod
+    def _add_to_sales_daily(conn, deltas):
+        """Fold document deltas into the sales_daily rollup, inside the caller's transaction."""
+        sums = InvoiceController.SALES_DAILY_SUMS
+        conn.executemany(f"""
+            INSERT INTO sales_daily (date, fiscal_year, bs_month, {", ".join(sums)})
+            VALUES ({", ".join("?" * (len(sums) + 3))})
+            ON CONFLICT(date, fiscal_year) DO UPDATE SET
+                {", ".join(f"{name} = {name} + excluded.{name}" for name in sums)}
+        """, deltas)
+
+    @staticmethod
+    def get_invoice_number(invoice_id):
+        """Return the document number assigned to an invoice."""
+        with get_connection() as conn:
+            row = conn.execute("SELECT invoice_number FROM Invoices WHERE invoice_id = ?", (invoice_id,)).fetchone()
+        return row[0] if row else None
     
     
+    # Columns shown in the invoice history list
+    _LIST_COLUMNS = """
+        i.invoice_id, i.invoice_number, i.client_name, i.date, i.total_amount,
+        COALESCE(i.status, 'ACTIVE') as status,
+        i.is_credit_note, i.paid_amount, i.due_amount
+    """
+
     @staticmethod
-    def get_all_invoices():
-        """Retrieve all invoices with status for management view."""
-        conn = connect_db()
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT invoice_id, invoice_number, client_name, date, total_amount,
-                   COALESCE(status, 'ACTIVE') as status,
-                   is_credit_note, paid_amount, due_amount
-            FROM Invoices
-            ORDER BY invoice_id DESC
-        """)
-        invoices = [{
+    def _list_row_to_dict(row):
+        return {
             "invoice_id": row[0],
             "invoice_number": row[1],
             "client_name": row[2],
@@ -86,188 +188,311 @@ class InvoiceController:
             "is_credit_note": row[6],
             "paid_amount": row[7],
             "due_amount": row[8]
-        } for row in cursor.fetchall()]
-        conn.close()
-        return invoices
+        }
+
+    @staticmethod
+    def get_all_invoices():
+        """Retrieve all invoices with status for management view."""
+        with get_connection() as conn:
+            rows = conn.execute(f"""
+                SELECT {InvoiceController._LIST_COLUMNS}
+                FROM Invoices i
+                ORDER BY i.invoice_id DESC
+            """).fetchall()
+        return [InvoiceController._list_row_to_dict(row) for row in rows]
+
+    @staticmethod
+    def _list_filters(status=None, start_date=None, end_date=None, fiscal_year=None, is_credit_note=None):
+        """WHERE clauses and parameters for the invoice list filters (table alias i)."""
+        clauses, params = [], []
+        if status:
+            clauses.append("COALESCE(i.status, 'ACTIVE') = ?")
+            params.append(status)
+        if start_date:
+            clauses.append("i.date >= ?")
+            params.append(start_date)
+        if end_date:
+            clauses.append("i.date <= ?")
+            params.append(end_date)
+        if fiscal_year:
+            clauses.append("i.fiscal_year = ?")
+            params.append(fiscal_year)
+        if is_credit_note is not None:
+            clauses.append("i.is_credit_note = ?")
+            params.append(1 if is_credit_note else 0)
+        return clauses, params
+
+    @staticmethod
+    def count_invoices(status=None, start_date=None, end_date=None, fiscal_year=None, is_credit_note=None):
+        """Count the invoices matching the same filters as get_invoices_page."""
+        clauses, params = InvoiceController._list_filters(status, start_date, end_date, fiscal_year, is_credit_note)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        with get_connection() as conn:
+            return conn.execute(f"SELECT COUNT(*) FROM Invoices i {where}", params).fetchone()[0]
+
+    @staticmethod
+    def iter_invoice_ids(page_size=500, **filters):
+        """Yield matching invoice IDs newest first, one keyset page at a time."""
+        after_id = None
+        while True:
+            page = InvoiceController.get_invoices_page(after_id=after_id, limit=page_size, **filters)
+            for invoice in page:
+                yield invoice["invoice_id"]
+            if len(page) < page_size:
+                return
+            after_id = page[-1]["invoice_id"]
+
+    @staticmethod
+    def get_invoices_page(after_id=None, limit=100, status=None, start_date=None, end_date=None,
+                          fiscal_year=None, is_credit_note=None, search=None):
+        """
+        Retrieve one page of invoices, newest first, for the management view.
+        Pass the last invoice_id of the previous page as after_id to fetch the
+        next one; the query seeks on the primary key instead of using OFFSET,
+        so every page costs the same however deep the user scrolls.
+        """
+        clauses, params = InvoiceController._list_filters(status, None, None, fiscal_year, is_credit_note)
+        bounds = None
+        if start_date or end_date:
+            # Filtering on the date index would leave the matches to be sorted by
+            # invoice_id in a temporary B-tree. Instead read the lowest and highest
+            # invoice_id in the range from that index (it covers the rowid), then
+            # walk the primary key between them and check the date on each row;
+            # the unary + keeps the planner off the date index for that walk.
+            date_clauses, date_params = InvoiceController._list_filters(start_date=start_date, end_date=end_date)
+            with get_connection() as conn:
+                low, high = conn.execute(f"""
+                    SELECT MIN(i.invoice_id), MAX(i.invoice_id) FROM Invoices i
+                    WHERE {' AND '.join(date_clauses)}
+                """, date_params).fetchone()
+            if low is None:
+                return []
+            bounds = (low, high)
+            clauses += [clause.replace("i.date", "+i.date") for clause in date_clauses]
+            params += date_params
+
+        def fetch(source, key, extra_clauses, extra_params):
+            where_clauses = list(extra_clauses) + clauses
+            where_params = list(extra_params) + params
+            if bounds is not None:
+                where_clauses.append(f"{key} BETWEEN ? AND ?")
+                where_params.extend(bounds)
+            if after_id is not None:
+                where_clauses.append(f"{key} < ?")
+                where_params.append(after_id)
+            where = f"WHERE {' AND '.join(where_clauses)}" if where_clauses else ""
+            with get_connection() as conn:
+                return conn.execute(f"""
+                    SELECT {InvoiceController._LIST_COLUMNS}
+                    FROM {source}
+                    {where}
+                    ORDER BY {key} DESC
+                    LIMIT ?
+                """, (*where_params, limit)).fetchall()
+
+        match = InvoiceController._prefix_match_query(search) if search else ""
+        if not match:
+            rows = fetch("Invoices i", "i.invoice_id", [], [])
+        else:
+            try:
+                # Walk the index newest-first so LIMIT stops the scan early
+                rows = fetch("invoices_fts CROSS JOIN Invoices i ON i.invoice_id = invoices_fts.rowid",
+                             "invoices_fts.rowid", ["invoices_fts MATCH ?"], [match])
+            except sqlite3.OperationalError:
+                # No FTS5 index in this database: substring scan instead
+                rows = fetch("Invoices i", "i.invoice_id",
+                             ["(i.invoice_number LIKE ? OR i.client_name LIKE ? OR i.pan_no LIKE ? OR i.status LIKE ?)"],
+                             [f"%{search.strip()}%"] * 4)
+        return [InvoiceController._list_row_to_dict(row) for row in rows]
+
+    @staticmethod
+    def search_invoices(query, limit=100, after_id=None):
+        """
+        Search invoices by number, client name, PAN or status.
+        Every word typed is matched as a prefix, so "ram 2082" finds
+        Ram Traders' invoices numbered MU/2082/...
+        """
+        return InvoiceController.get_invoices_page(after_id=after_id, limit=limit, search=query)
+
+    @staticmethod
+    def _prefix_match_query(text):
+        """Turn free text into an FTS5 query requiring each word as a prefix."""
+        words = [w for w in text.split() if any(ch.isalnum() for ch in w)]
+        # Quoting makes punctuation (e.g. "/" in MU/2082) safe; "*" makes the last token a prefix
+        return " ".join('"' + w.replace('"', '""') + '"*' for w in words)
 
     
     @staticmethod
     def get_invoice_details(invoice_id):
         """Retrieve invoice details and items from the database by invoice_id."""
-        conn = connect_db()
-        cursor = conn.cursor()
-
-        # Fetch invoice data with all relevant fields including status
-        cursor.execute("""
-            SELECT invoice_number, client_name, client_contact, address, pan_no, date,
-                   subtotal, vat_amount, discount, total_amount, vat_rate, paid_amount, due_amount,
-                   COALESCE(status, 'ACTIVE'), COALESCE(cancel_reason, ''), COALESCE(cancelled_date, ''),
-                   is_credit_note, credit_note_number, COALESCE(cancellation_comment, '')
-            FROM Invoices
-            WHERE invoice_id = ?
-        """, (invoice_id,))
-        invoice_data = cursor.fetchone()
-        
-        if invoice_data:
-            invoice_data = {
-                "invoice_number": invoice_data[0],
-                "client_name": invoice_data[1],
-                "client_contact": invoice_data[2],
-                "address": invoice_data[3],
-                "pan_no": invoice_data[4],
-                "date": invoice_data[5],
-                "subtotal": invoice_data[6],
-                "vat_amount": invoice_data[7],
-                "discount": invoice_data[8],
-                "total_amount": invoice_data[9],
-                "vat_rate": invoice_data[10],
-                "paid_amount": invoice_data[11],
-                "due_amount": invoice_data[12],
-                "status": invoice_data[13],
-                "cancel_reason": invoice_data[14],
-                "cancelled_date": invoice_data[15],
-                "is_credit_note": invoice_data[16],
-                "credit_note_number": invoice_data[17],
-                "cancellation_comment": invoice_data[18]
-            }
-
-            # Fetch invoice items along with hs_code
+        with get_connection() as conn:
+            cursor = conn.cursor()
+
+            # Fetch invoice data with all relevant fields including status
             cursor.execute("""
-                SELECT Products.name, Products.hs_code, Invoice_Items.quantity,
-                       Invoice_Items.price_per_unit, Invoice_Items.total_price
-                FROM Invoice_Items
-                JOIN Products ON Invoice_Items.product_id = Products.product_id
-                WHERE Invoice_Items.invoice_id = ?
+                SELECT invoice_number, client_name, client_contact, address, pan_no, date,
+                       subtotal, vat_amount, discount, total_amount, vat_rate, paid_amount, due_amount,
+                       COALESCE(status, 'ACTIVE'), COALESCE(cancel_reason, ''), COALESCE(cancelled_date, ''),
+                       is_credit_note, credit_note_number, COALESCE(cancellation_comment, '')
+                FROM Invoices
+                WHERE invoice_id = ?
             """, (invoice_id,))
-            items = [{
-                "product_name": item[0],
-                "hs_code": item[1],
-                "quantity": item[2],
-                "price_per_unit": item[3],
-                "total_price": item[4]
-            } for item in cursor.fetchall()]
-
-            conn.close()
-            return invoice_data, items
-        else:
-            conn.close()
-            raise ValueError("Invoice not found")
+            invoice_data = cursor.fetchone()
+        
+            if invoice_data:
+                invoice_data = {
+                    "invoice_number": invoice_data[0],
+                    "client_name": invoice_data[1],
+                    "client_contact": invoice_data[2],
+                    "address": invoice_data[3],
+                    "pan_no": invoice_data[4],
+                    "date": invoice_data[5],
+                    "subtotal": invoice_data[6],
+                    "vat_amount": invoice_data[7],
+                    "discount": invoice_data[8],
+                    "total_amount": invoice_data[9],
+                    "vat_rate": invoice_data[10],
+                    "paid_amount": invoice_data[11],
+                    "due_amount": invoice_data[12],
+                    "status": invoice_data[13],
+                    "cancel_reason": invoice_data[14],
+                    "cancelled_date": invoice_data[15],
+                    "is_credit_note": invoice_data[16],
+                    "credit_note_number": invoice_data[17],
+                    "cancellation_comment": invoice_data[18]
+                }
+
+                # Fetch invoice items along with hs_code
+                cursor.execute("""
+                    SELECT Products.name, Products.hs_code, Invoice_Items.quantity,
+                           Invoice_Items.price_per_unit, Invoice_Items.total_price, Products.unit
+                    FROM Invoice_Items
+                    JOIN Products ON Invoice_Items.product_id = Products.product_id
+                    WHERE Invoice_Items.invoice_id = ?
+                """, (invoice_id,))
+                items = [{
+                    "product_name": item[0],
+                    "hs_code": item[1],
+                    "quantity": item[2],
+                    "price_per_unit": item[3],
+                    "total_price": item[4],
+                    "unit": item[5]
+                } for item in cursor.fetchall()]
+
+                return invoice_data, items
+            else:
+                raise ValueError("Invoice not found")
 
 
     @staticmethod
     def create_credit_note(original_invoice_id, reason, comment):
         """
         Create a Credit Note to cancel an existing invoice per Nepal IRD rules.
+        Runs as one transaction on one connection:
         1. Marks original invoice as CANCELLED.
         2. Creates a new invoice record with negative amounts (Credit Note).
+        3. Restores stock for every returned item.
+        Returns the credit note's invoice_id.
+        """
+        return InvoiceController.cancel_invoices([original_invoice_id], reason, comment)[0]
+
+    @staticmethod
+    def cancel_invoices(invoice_ids, reason, comment='', fiscal_year=None):
+        """
+        Cancel a list of invoices in one pass, issuing a Credit Note for each.
+        All-or-nothing: if any invoice cannot be cancelled, nothing is written.
+        Returns the credit note invoice_ids in the order of invoice_ids.
         """
         if not reason:
             raise ValueError("Cancellation reason is required.")
-        
-        conn = connect_db()
-        cursor = conn.cursor()
-
-        # Get original invoice details
-        cursor.execute("SELECT * FROM Invoices WHERE invoice_id = ?", (original_invoice_id,))
-        # Convert row to dict for easier access (assuming row order matches columns but better to select specific columns)
-        # Using get_invoice_details to act as a helper is cleaner but circular import risk.
-        # Let's fetch raw data. Need enough info to replicate.
-        pass # Actual logic below
-
-        # Fetch full details using existing helper logic (re-implemented to stay within method)
-        # Using get_invoice_details logic inline to avoid double connection
-        # Re-using create_invoice logic? No, create_invoice opens its own connection.
-        conn.close() # Close to use high-level methods
-
-        # 1. Get original data
-        original_data, original_items = InvoiceController.get_invoice_details(original_invoice_id)
-        
-        if original_data['status'] == 'CANCELLED':
-            raise ValueError("This invoice is already cancelled.")
-
-        conn = connect_db()
-        cursor = conn.cursor()
-        cursor.execute("SELECT product_id, quantity, price_per_unit FROM Invoice_Items WHERE invoice_id = ?", (original_invoice_id,))
-        raw_items = cursor.fetchall()
-
-        if not raw_items:
-             conn.close()
-             raise ValueError("Original invoice has no items.")
-
-        cn_items = []
-        for pid, qty, price in raw_items:
-            cn_items.append({
-                'product_id': pid,
-                'quantity': -qty,          # Negative quantity
-                'price_per_unit': price,
-                'total_price': -qty * price
-            })
-        
-        # 3. Mark original as CANCELLED
+        invoice_ids = list(dict.fromkeys(int(i) for i in invoice_ids))
+        if not invoice_ids:
+            return []
+
+        fiscal_year = fiscal_year or InvoiceUtils.get_fiscal_year_nepali()
+        date = datetime.now().strftime("%Y-%m-%d")
+        bs_month = InvoiceUtils.get_bs_month(date)
         cancelled_date = datetime.now().strftime("%Y-%m-%d %H:%M")
         full_reason = f"{reason}" + (f" | {comment}" if comment else "")
-        cursor.execute("""
-            UPDATE Invoices
-            SET status = 'CANCELLED', cancel_reason = ?, cancelled_date = ?
-            WHERE invoice_id = ?
-        """, (full_reason, cancelled_date, original_invoice_id))
-        conn.commit()
-        conn.close()
-
-        # 4. Generate Credit Note Number (using same sequence but different prefix? No, same sequence usually)
-        # IRD allows CN to have its own sequence or share sequence. Let's use standard sequence with CN prefix for clarity?
-        # Actually standard practice is Credit Notes have their own separate sequence.
-        # For simplicity in this app, we will use the MAIN sequence but label it clearly.
-        # Or better: "CN/081-82/xxxx"
-        
-        fiscal_year = InvoiceUtils.get_fiscal_year_nepali()
-        cn_number = InvoiceController.get_next_invoice_number(fiscal_year).replace("MU/", "CN/") 
-        # Note: referencing get_next_invoice_number might return MU/... so we replace it.
-        # But wait, get_next_invoice_number looks at "MU/" pattern. 
-        # We need a separate sequence for CN.
-        
-        conn = connect_db()
-        cursor = conn.cursor()
-        # Find next CN number
-        pattern = f"CN/{fiscal_year}/%"
-        cursor.execute("SELECT credit_note_number FROM Invoices WHERE credit_note_number LIKE ? ORDER BY invoice_id DESC LIMIT 1", (pattern,))
-        last_cn = cursor.fetchone()
-        if last_cn:
-            try:
-                last_num = int(last_cn[0].split('/')[-1])
-                new_num = last_num + 1
-            except: new_num = 1
-        else:
-            new_num = 1
-        cn_number = f"CN/{fiscal_year}/{new_num:04d}"
-        conn.close()
-
-        # 5. Create Credit Note Record
-        # We pass negative quantities, so totals will be negative automatically
-        InvoiceController.create_invoice(
-            invoice_number=cn_number,
-            client_name=original_data['client_name'],
-            client_contact=original_data['client_contact'],
-            address=original_data['address'],
-            pan_no=original_data['pan_no'],
-            items=cn_items,
-            vat_rate=original_data['vat_rate'],
-            discount=original_data['discount'],
-            paid_amount=0, # CN is not "paid", it's an adjustment
-            is_credit_note=True,
-            original_invoice_id=original_invoice_id,
-            cancellation_comment=comment
-        )
-        
-        # 6. Restore Stock (Credit Note implies items returned or cancelled)
-        # We passed negative quantity items to create_invoice (which doesn't adjust stock).
-        # We need to explicitly adjust stock back.
-        # Since cn_items has negative quantity (e.g. -5), passing -(-5) = +5 restores stock.
-        for item in cn_items:
-            try:
-                ProductController.adjust_stock(item['product_id'], -item['quantity'])
-            except Exception as e:
-                print(f"Error restoring stock for product {item['product_id']}: {e}")
+        # One JSON parameter instead of an IN (?, ?, ...) list of unbounded length
+        ids_json = json.dumps(invoice_ids)
+
+        with transaction() as conn:
+            cursor = conn.cursor()
+            originals = {row["invoice_id"]: row for row in cursor.execute("""
+                SELECT invoice_id, invoice_number, date, client_name, client_contact, address, pan_no,
+                       subtotal, vat_amount, discount, total_amount, vat_rate,
+                       COALESCE(status, 'ACTIVE') AS status, is_credit_note
+                FROM Invoices
+                WHERE invoice_id IN (SELECT value FROM json_each(?))
+            """, (ids_json,))}
+            with_items = {row[0] for row in cursor.execute("""
+                SELECT DISTINCT invoice_id FROM Invoice_Items
+                WHERE invoice_id IN (SELECT value FROM json_each(?))
+            """, (ids_json,))}
+
+            for invoice_id in invoice_ids:
+                original = originals.get(invoice_id)
+                if original is None:
+                    raise ValueError("Invoice not found")
+                if original["status"] == 'CANCELLED':
+                    raise ValueError("This invoice is already cancelled.")
+                if original["is_credit_note"]:
+                    raise ValueError("A credit note cannot be cancelled.")
+                if invoice_id not in with_items:
+                    raise ValueError("Original invoice has no items.")
+
+            cursor.executemany("""
+                UPDATE Invoices
+                SET status = 'CANCELLED', cancel_reason = ?, cancelled_date = ?
+                WHERE invoice_id = ?
+            """, [(full_reason, cancelled_date, invoice_id) for invoice_id in invoice_ids])
+
+            # Cancelled sales count against the day they were invoiced
+            sales_deltas = [InvoiceController._sales_daily_delta(
+                originals[i]["date"], originals[i]["invoice_number"], cancellation=originals[i]["total_amount"] or 0)
+                for i in invoice_ids]
+            credit_note_ids = []
+            for invoice_id in invoice_ids:
+                original = originals[invoice_id]
+                cn_number = InvoiceController._allocate_number(
+                    conn, InvoiceController.SERIES_CREDIT_NOTE, fiscal_year)
+                # The credit note mirrors the original with negative amounts;
+                # it is an adjustment, so nothing is "paid" against it.
+                cursor.execute('''
+                    INSERT INTO Invoices (client_name, client_contact, address, pan_no, invoice_number, date, subtotal, vat_amount, discount, total_amount, vat_rate, paid_amount, due_amount, status, is_credit_note, credit_note_number, cancellation_comment, fiscal_year, bs_month)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 0, ?, 'ACTIVE', 1, ?, ?, ?, ?)
+                ''', (original["client_name"], original["client_contact"], original["address"], original["pan_no"],
+                      cn_number, date, -original["subtotal"], -original["vat_amount"], original["discount"],
+                      -original["total_amount"], original["vat_rate"], -original["total_amount"], cn_number, comment,
+                      fiscal_year, bs_month))
+                credit_note_id = cursor.lastrowid
+                sales_deltas.append(InvoiceController._sales_daily_delta(
+                    date, cn_number, -original["vat_amount"], -original["total_amount"], is_credit_note=True))
+                cursor.execute("""
+                    INSERT INTO Invoice_Items (invoice_id, product_id, quantity, price_per_unit, total_price)
+                    SELECT ?, product_id, -quantity, price_per_unit, -quantity * price_per_unit
+                    FROM Invoice_Items WHERE invoice_id = ?
+                    ORDER BY item_id
+                """, (credit_note_id, invoice_id))
+                credit_note_ids.append(credit_note_id)
+            InvoiceController._add_to_sales_daily(conn, sales_deltas)
+
+            # Restore stock for all cancelled invoices with one set-based UPDATE
+            cursor.execute("""
+                UPDATE Products
+                SET stock_quantity = stock_quantity + returned.quantity
+                FROM (
+                    SELECT product_id, SUM(quantity) AS quantity
+                    FROM Invoice_Items
+                    WHERE invoice_id IN (SELECT value FROM json_each(?))
+                    GROUP BY product_id
+                ) AS returned
+                WHERE Products.product_id = returned.product_id
+            """, (ids_json,))
+
+        repository_cache.invalidate("products")
+        return credit_note_ids
 
     @staticmethod
     def cancel_invoice(invoice_id, reason, comment=''):
@@ -275,43 +500,29 @@ class InvoiceController:
         Wrapper Update: Alias for create_credit_note to match UI call.
         Cancels the invoice by generating a Credit Note and restoring stock.
         """
-        InvoiceController.create_credit_note(invoice_id, reason, comment)
+        return InvoiceController.create_credit_note(invoice_id, reason, comment)
 
 
     @staticmethod
-    def get_next_invoice_number(fiscal_year):
+    def get_next_invoice_number(fiscal_year, series=None):
         """
-        Get the next strictly sequential invoice number for the fiscal year.
-        Uses a transaction to prevent race conditions in multi-user environments.
+        Preview the next number of a series for the fiscal year.
+        This does not reserve the number; create_invoice allocates it atomically
+        when the invoice is saved.
         """
-        conn = connect_db()
-        cursor = conn.cursor()
-        
+        series = series or InvoiceController.SERIES_INVOICE
         try:
-            # Search for max invoice number in current fiscal year (MU/FY/XXXX)
-            pattern = f"MU/{fiscal_year}/%"
-            cursor.execute("""
-                SELECT invoice_number FROM Invoices 
-                WHERE invoice_number LIKE ? 
-                ORDER BY invoice_id DESC LIMIT 1
-            """, (pattern,))
-            
-            last_invoice = cursor.fetchone()
-            
-            if last_invoice:
-                try:
-                    # Extract number part (MU/081-82/0005 -> 5)
-                    last_num = int(last_invoice[0].split('/')[-1])
-                    new_num = last_num + 1
-                except (ValueError, IndexError):
-                    new_num = 1
-            else:
-                new_num = 1
-                
-            return f"MU/{fiscal_year}/{new_num:04d}"
+            with get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute("""
+                    SELECT last_value FROM sequences
+                    WHERE series = ? AND fiscal_year = ?
+                """, (series, fiscal_year))
+                row = cursor.fetchone()
+
+            new_num = (row[0] if row else 0) + 1
+            return InvoiceUtils.format_document_number(series, fiscal_year, new_num)
             
         except Exception as e:
             print(f"Error generating invoice number: {e}")
-            return f"MU/{fiscal_year}/ERROR"
-        finally:
-            conn.close()
+            return f"{series}/{fiscal_year}/ERROR"
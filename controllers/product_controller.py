@@ -1,4 +1,5 @@
 from models.product import Product
+from services.repository_cache import repository_cache
 
 
 class ProductController:
@@ -19,17 +20,33 @@ class ProductController:
             
         Product.add_product(name, price, hs_code.strip(), description.strip(), unit, category,
                            brand, viscosity, purchase_price, stock_quantity, min_stock_alert, batch_number)
+        repository_cache.invalidate("products")
 
     @staticmethod
     def get_all_products():
-        """Retrieve all products from the database."""
-        return Product.get_all_products()
+        """Retrieve all products (served from the shared cache)."""
+        return list(repository_cache.get_all("products"))
+
+    @staticmethod
+    def get_product_by_id(product_id):
+        """Retrieve a single product by its ID (served from the shared cache)."""
+        return repository_cache.get_by_id("products", product_id)
 
     @staticmethod
     def search_products(keyword):
-        """Search products by name, HS code, or category."""
+        """Search products by name, brand, viscosity, HS code or category."""
         return Product.search_products(keyword.strip())
 
+    @staticmethod
+    def search_product_ids(keyword, limit=20):
+        """Return IDs of the best matching products for a type-ahead picker."""
+        return Product.search_product_ids(keyword.strip(), limit)
+
+    @staticmethod
+    def get_products_by_ids(product_ids):
+        """Retrieve products for a list of IDs, in the order given."""
+        return Product.get_products_by_ids(product_ids)
+
     @staticmethod
     def update_product(product_id, name, price, hs_code, description='', unit='Ltr', category='Lubricant',
                        brand='', viscosity='', purchase_price=0, stock_quantity=0, min_stock_alert=10, batch_number=''):
@@ -45,6 +62,7 @@ class ProductController:
             
         Product.update_product(product_id, name, price, hs_code.strip(), description.strip(), unit, category,
                               brand, viscosity, purchase_price, stock_quantity, min_stock_alert, batch_number)
+        repository_cache.invalidate("products")
 
     @staticmethod
     def delete_product(product_id):
@@ -52,6 +70,7 @@ class ProductController:
         if not product_id:
             raise ValueError("Product ID is required to delete a product.")
         Product.delete_product(product_id)
+        repository_cache.invalidate("products")
 
     @staticmethod
     def get_stats():
@@ -65,7 +84,17 @@ class ProductController:
     @staticmethod
     def adjust_stock(product_id, quantity_change):
         Product.adjust_stock(product_id, quantity_change)
+        repository_cache.invalidate("products")
+
+    @staticmethod
+    def adjust_stock_bulk(changes):
+        """Apply a list of (product_id, quantity_change) pairs in one statement."""
+        Product.adjust_stock_bulk(changes)
+        repository_cache.invalidate("products")
 
     @staticmethod
     def get_low_stock_products():
         return Product.get_low_stock_products()
+
+
+repository_cache.register("products", Product.get_all_products, key=lambda row: row[0], tables=["Products"])
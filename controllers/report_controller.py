@@ -1,125 +1,346 @@
 import sqlite3
 import csv
 from datetime import datetime
-from config.database import connect_db
+from itertools import islice
+from config.database import get_reporting_connection
+from utils import nepali_calendar
+from utils.xlsx_writer import XLSXWriter
 
 class ReportController:
     
+    # Column headings of the sales register, in the order iter_sales_register yields them
+    SALES_REGISTER_COLUMNS = ("Date", "Invoice No", "Customer", "PAN", "Taxable", "VAT", "Total", "Type")
+
     @staticmethod
     def get_sales_register(start_date, end_date):
         """
         Fetch sales register data for VAT reporting.
         Includes both Invoices (Positive) and Credit Notes (Negative).
         """
-        conn = connect_db()
-        cursor = conn.cursor()
-        
-        query = """
-            SELECT 
-                date,
-                invoice_number,
-                client_name,
-                pan_no,
-                subtotal as taxable_amount,
-                vat_amount,
-                total_amount,
-                is_credit_note,
-                status
-            FROM Invoices
-            WHERE date BETWEEN ? AND ?
-            AND status != 'CANCELLED' 
-            ORDER BY date ASC, invoice_id ASC
+        columns = ReportController.SALES_REGISTER_COLUMNS
+        return [dict(zip(columns, row)) for row in ReportController.iter_sales_register(start_date, end_date)]
+
+    @staticmethod
+    def iter_sales_register(start_date, end_date, chunk_size=1000, credit_notes=None):
         """
-        # Note: We exclude 'CANCELLED' status for original invoices because 
-        # the Credit Note (active) negates them. 
-        # WAIT. IRD rules: 
-        # 1. Original Invoice (Active -> Cancelled) is still part of the sequential history?
-        #    Usually, a Cancelled invoice should appear in the register but with distinct marking, 
-        #    or the Credit Note acts as the reversal.
-        #    If we hide 'CANCELLED', the original sale disappears.
-        #    But the Credit Note (also 'ACTIVE' record) appears with negative amount.
-        #    So Net Effect = 0.
-        #    However, if we hide 'CANCELLED', then we only have the Credit Note (Negative).
-        #    Net Effect = Negative! That is wrong.
-        #    Correction: We must INCLUDE 'CANCELLED' invoices in the report to show the original sale,
-        #    AND the Credit Note to show the reversal.
-        #    Both sum up to 0.
-        
+        Yield sales register rows as tuples in SALES_REGISTER_COLUMNS order,
+        reading the cursor chunk_size rows at a time so memory stays flat
+        however long the period is. Amounts are raw numbers. credit_notes=True
+        or False limits the rows to credit notes or to invoices.
+        """
+        # Cancelled invoices stay in the register to show the original sale;
+        # their credit notes (negative amounts) reverse them, so both sum to 0.
+        # Taxable is after discount (total less VAT), as in sales_daily and the VAT return.
         query = """
-            SELECT 
+            SELECT
                 date,
                 invoice_number,
                 client_name,
                 pan_no,
-                subtotal as taxable_amount,
+                COALESCE(total_amount, 0) - COALESCE(vat_amount, 0) as taxable_amount,
                 vat_amount,
                 total_amount,
-                is_credit_note,
-                status
+                CASE WHEN is_credit_note = 1 THEN 'Credit Note'
+                     WHEN status = 'CANCELLED' THEN 'Cancelled'
+                     ELSE 'Invoice' END
             FROM Invoices
-            WHERE date BETWEEN ? AND ?
+            WHERE date BETWEEN ? AND ? {document_filter}
             ORDER BY date ASC, invoice_id ASC
         """
-        
-        cursor.execute(query, (start_date, end_date))
-        rows = cursor.fetchall()
-        
-        data = []
-        for row in rows:
-            # If it's a Credit Note, amounts are already negative in DB?
-            # Let's check create_credit_note... 
-            # Yes, we store negative quantities in items, so totals are negative.
-            # So simple summation works.
-            
-            data.append({
-                "Date": row[0],
-                "Invoice No": row[1],
-                "Customer": row[2],
-                "PAN": row[3],
-                "Taxable": row[4],
-                "VAT": row[5],
-                "Total": row[6],
-                "Type": "Credit Note" if row[7] else \
-                        ("Cancelled" if row[8] == 'CANCELLED' else "Invoice")
-            })
-            
-        conn.close()
-        return data
+        params = [start_date, end_date]
+        document_filter = ""
+        if credit_notes is not None:
+            document_filter = "AND COALESCE(is_credit_note, 0) = ?"
+            params.append(1 if credit_notes else 0)
+        with get_reporting_connection() as conn:
+            cursor = conn.execute(query.format(document_filter=document_filter), params)
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    return
+                yield from rows
+
+    @staticmethod
+    def count_sales_register(start_date, end_date):
+        """Number of documents in the sales register for a period."""
+        with get_reporting_connection() as conn:
+            return conn.execute("SELECT COUNT(*) FROM Invoices WHERE date BETWEEN ? AND ?",
+                                (start_date, end_date)).fetchone()[0]
+
+    @staticmethod
+    def export_sales_register(start_date, end_date, filename, progress=None):
+        """Export the sales register as XLSX or CSV, chosen by the file extension."""
+        if filename.lower().endswith(".xlsx"):
+            return ReportController.export_sales_register_xlsx(start_date, end_date, filename, progress)
+        return ReportController.export_sales_register_csv(start_date, end_date, filename, progress)
+
+    @staticmethod
+    def export_sales_register_csv(start_date, end_date, filename, progress=None, chunk_size=1000):
+        """
+        Stream the sales register for a period into a CSV file with numeric
+        amounts, without holding the period in memory. progress(done, total)
+        is called after every chunk. Returns the number of rows written.
+        """
+        total = ReportController.count_sales_register(start_date, end_date)
+        if progress:
+            progress(0, total)
+        written = 0
+        # utf-8-sig so Excel detects the encoding of Devanagari names
+        with open(filename, 'w', newline='', encoding='utf-8-sig') as f:
+            writer = csv.writer(f)
+            writer.writerow(ReportController.SALES_REGISTER_COLUMNS)
+            rows = ReportController.iter_sales_register(start_date, end_date, chunk_size)
+            while True:
+                chunk = list(islice(rows, chunk_size))
+                if not chunk:
+                    break
+                writer.writerows(chunk)
+                written += len(chunk)
+                if progress:
+                    progress(written, max(total, written))
+        return written
+
+    @staticmethod
+    def _statement_match(client_name, pan_no):
+        """WHERE clause and parameters selecting one customer's documents."""
+        if pan_no:
+            return "(client_name = ? COLLATE NOCASE OR pan_no = ?)", [client_name, pan_no]
+        return "client_name = ? COLLATE NOCASE", [client_name]
+
+    @staticmethod
+    def get_statement_opening_balance(client_name, pan_no, start_date):
+        """Amount owed by a customer before start_date (invoices less payments and credit notes)."""
+        match, params = ReportController._statement_match(client_name, pan_no)
+        with get_reporting_connection() as conn:
+            row = conn.execute(f"""
+                SELECT COALESCE(SUM(total_amount - COALESCE(paid_amount, 0)), 0)
+                FROM Invoices WHERE {match} AND date < ?
+            """, params + [start_date]).fetchone()
+        return row[0]
+
+    @staticmethod
+    def iter_statement_documents(client_name, pan_no, start_date, end_date):
+        """
+        Yield a customer's invoices and credit notes in the period, oldest first,
+        straight from the cursor so a long history is never held in memory.
+        Rows: (date, invoice_number, is_credit_note, status, total_amount, paid_amount).
+        """
+        match, params = ReportController._statement_match(client_name, pan_no)
+        with get_reporting_connection() as conn:
+            cursor = conn.execute(f"""
+                SELECT date, invoice_number, is_credit_note, COALESCE(status, 'ACTIVE'),
+                       total_amount, COALESCE(paid_amount, 0)
+                FROM Invoices
+                WHERE {match} AND date >= ? AND date <= ?
+                ORDER BY date, invoice_id
+            """, params + [start_date, end_date])
+            yield from cursor
+
+    @staticmethod
+    def export_sales_register_xlsx(start_date, end_date, filename, progress=None, chunk_size=1000):
+        """
+        Stream the sales register into an Excel workbook: an Invoices sheet
+        (cancelled originals included), a Credit Notes sheet, each with a
+        totals row, and a Summary sheet from the daily rollup. Amounts are
+        numeric cells. Returns the number of documents written.
+        """
+        total = ReportController.count_sales_register(start_date, end_date)
+        if progress:
+            progress(0, total)
+        columns = ReportController.SALES_REGISTER_COLUMNS
+        amounts = [columns.index(name) for name in ("Taxable", "VAT", "Total")]
+        widths = [12, 22, 32, 14, 14, 14, 14, 12]
+        written = 0
+        with XLSXWriter(filename) as book:
+            for title, credit_notes in (("Invoices", False), ("Credit Notes", True)):
+                sheet = book.add_sheet(title, columns, number_columns=amounts, widths=widths)
+                rows = ReportController.iter_sales_register(start_date, end_date, chunk_size, credit_notes)
+                while True:
+                    chunk = list(islice(rows, chunk_size))
+                    if not chunk:
+                        break
+                    sheet.write_rows(chunk)
+                    written += len(chunk)
+                    if progress:
+                        progress(written, max(total, written))
+                sheet.write_totals()
+
+            summary = ReportController.get_sales_summary(start_date, end_date)
+            sheet = book.add_sheet("Summary", ["Item", "Count", "Amount"], integer_columns=[1], number_columns=[2],
+                                   widths=[28, 10, 18])
+            sheet.write_rows([
+                ("Period", None, f"{start_date} to {end_date}"),
+                ("Invoices issued", summary["invoice_count"], None),
+                ("Taxable amount (net)", None, summary["taxable"]),
+                ("VAT collected (net)", None, summary["vat"]),
+                ("Total sales (net)", None, summary["total"]),
+                ("Credit notes", None, summary["credit_note_total"]),
+                ("Cancelled invoices", None, summary["cancelled_total"]),
+            ])
+        return written
 
     @staticmethod
     def get_monthly_summary(fiscal_year):
-        """Aggregate sales by month for the dashboard."""
-        conn = connect_db()
-        cursor = conn.cursor()
-        
-        # We need to filter by fiscal year pattern in invoice_number "MU/081-82/..."
-        # Or just use date range if we knew it. 
-        # Let's use the fiscal year string "081-82" in invoice_number for accuracy
-        
+        """Sales total per Bikram Sambat month ('2082-04': total) of a fiscal year, for the dashboard."""
+        return {row["bs_month"]: row["total"] for row in ReportController.get_bs_month_summary(fiscal_year)}
+
+    @staticmethod
+    def get_bs_month_summary(fiscal_year):
+        """
+        Per Bikram Sambat month of a fiscal year, Shrawan first: invoices issued,
+        net taxable, VAT and total (credit notes deducted) and the credit note
+        amount. Grouped from the sales_daily rollup over the fiscal year's range
+        of its bs_month index, the same date-based year as get_vat_return;
+        months without sales are omitted.
+        """
         query = """
-            SELECT strftime('%Y-%m', date) as month, SUM(total_amount)
-            FROM Invoices
-            WHERE invoice_number LIKE ?
-            GROUP BY month
-            ORDER BY month ASC
+            SELECT bs_month,
+                   SUM(invoice_count) AS invoice_count,
+                   SUM(taxable) AS taxable,
+                   SUM(vat) AS vat,
+                   SUM(total) AS total,
+                   SUM(credit_note_total) AS credit_note_total
+            FROM sales_daily
+            WHERE bs_month BETWEEN ? AND ?
+            GROUP BY bs_month
+            ORDER BY bs_month ASC
         """
-        pattern = f"%/{fiscal_year}/%"
-        cursor.execute(query, (pattern,))
-        results = cursor.fetchall()
-        conn.close()
-        
-        # Convert to dictionary {Month: Total}
-        return {row[0]: row[1] for row in results}
+        months = nepali_calendar.fiscal_year_months(fiscal_year)
+        with get_reporting_connection() as conn:
+            cursor = conn.execute(query, ReportController._bs_month_range(months))
+            columns = [d[0] for d in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    @staticmethod
+    def _bs_month_range(months):
+        """First and last 'YYYY-MM' of a fiscal year's (year, month) list, for a sales_daily.bs_month range."""
+        return tuple(f"{year:04d}-{month:02d}" for year, month in (months[0], months[-1]))
+
+    # Figures of the VAT return period table, in column order
+    VAT_RETURN_COLUMNS = (
+        ("period", "Period"), ("start_date", "From"), ("end_date", "To"),
+        ("taxable_sales", "Taxable Sales"), ("exempt_sales", "Exempt Sales"),
+        ("vat_collected", "VAT Collected"), ("credit_note_taxable", "Credit Note Taxable"),
+        ("credit_note_vat", "Credit Note VAT"), ("net_vat", "Net VAT Payable"),
+        ("cancelled_total", "Cancelled Originals"), ("invoice_count", "Invoices"),
+        ("cancelled_count", "Cancelled"), ("credit_note_count", "Credit Notes"),
+    )
+    VAT_RETURN_AMOUNTS = ("taxable_sales", "exempt_sales", "vat_collected", "credit_note_taxable",
+                          "credit_note_vat", "net_vat", "cancelled_total")
+    VAT_RETURN_COUNTS = ("invoice_count", "cancelled_count", "credit_note_count")
+
+    @staticmethod
+    def get_vat_return(fiscal_year):
+        """
+        VAT return figures for each Bikram Sambat month of a fiscal year,
+        Shrawan first, grouped from the sales_daily rollup like
+        get_bs_month_summary (periods follow the document date, whatever year
+        its number carries). Taxable and exempt values are after discount
+        (total less VAT); credit note figures are negative. Months without
+        documents are zero.
+        """
+        query = """
+            SELECT bs_month,
+                   SUM(taxable - exempt - credit_note_taxable),
+                   SUM(exempt),
+                   SUM(vat - credit_note_vat),
+                   SUM(credit_note_taxable),
+                   SUM(credit_note_vat),
+                   SUM(cancelled_total),
+                   SUM(invoice_count),
+                   SUM(cancelled_count),
+                   SUM(credit_note_count)
+            FROM sales_daily
+            WHERE bs_month BETWEEN ? AND ?
+            GROUP BY bs_month
+        """
+        months = nepali_calendar.fiscal_year_months(fiscal_year)
+        with get_reporting_connection() as conn:
+            by_month = {row[0]: row[1:] for row in conn.execute(
+                query, ReportController._bs_month_range(months))}
+
+        periods = []
+        for year, month in months:
+            start, end = nepali_calendar.month_range(year, month)
+            (taxable, exempt, vat, cn_taxable, cn_vat, cancelled,
+             invoices, cancelled_count, credit_notes) = by_month.get(f"{year:04d}-{month:02d}", (0,) * 9)
+            periods.append({
+                "period": f"{nepali_calendar.MONTH_NAMES[month - 1]} {year}",
+                "start_date": start.isoformat(),
+                "end_date": end.isoformat(),
+                "taxable_sales": taxable,
+                "exempt_sales": exempt,
+                "vat_collected": vat,
+                "credit_note_taxable": cn_taxable,
+                "credit_note_vat": cn_vat,
+                "net_vat": vat + cn_vat,
+                "cancelled_total": cancelled,
+                "invoice_count": invoices,
+                "cancelled_count": cancelled_count,
+                "credit_note_count": credit_notes,
+            })
+        return periods
+
+    @staticmethod
+    def export_vat_return(fiscal_year, filename):
+        """Write the VAT return period table with a totals row, as XLSX or CSV by extension."""
+        periods = ReportController.get_vat_return(fiscal_year)
+        keys = [key for key, _ in ReportController.VAT_RETURN_COLUMNS]
+        headings = [heading for _, heading in ReportController.VAT_RETURN_COLUMNS]
+        totals = {key: sum(period[key] for period in periods) for key in keys[3:]}
+        if filename.lower().endswith(".xlsx"):
+            amounts = [keys.index(key) for key in ReportController.VAT_RETURN_AMOUNTS]
+            counts = [keys.index(key) for key in ReportController.VAT_RETURN_COUNTS]
+            with XLSXWriter(filename) as book:
+                sheet = book.add_sheet(f"VAT Return {fiscal_year}", headings, number_columns=amounts,
+                                       integer_columns=counts, widths=[16, 12, 12] + [16] * (len(keys) - 3))
+                sheet.write_rows([period[key] for key in keys] for period in periods)
+                sheet.write_totals()
+        else:
+            with open(filename, 'w', newline='', encoding='utf-8-sig') as f:
+                writer = csv.writer(f)
+                writer.writerow(headings)
+                writer.writerows([period[key] for key in keys] for period in periods)
+                writer.writerow(["Total", "", ""] + [totals[key] for key in keys[3:]])
+        return totals
+
+    @staticmethod
+    def get_sales_summary(start_date, end_date):
+        """
+        Totals for a date range from the sales_daily rollup: net taxable, VAT
+        and total (credit notes deducted), invoices issued, and the credit
+        note and cancelled amounts.
+        """
+        with get_reporting_connection() as conn:
+            row = conn.execute("""
+                SELECT COALESCE(SUM(invoice_count), 0), COALESCE(SUM(taxable), 0),
+                       COALESCE(SUM(vat), 0), COALESCE(SUM(total), 0),
+                       COALESCE(SUM(credit_note_total), 0), COALESCE(SUM(cancelled_total), 0)
+                FROM sales_daily
+                WHERE date BETWEEN ? AND ?
+            """, (start_date, end_date)).fetchone()
+        keys = ("invoice_count", "taxable", "vat", "total", "credit_note_total", "cancelled_total")
+        return dict(zip(keys, row))
 
     @staticmethod
     def export_to_excel(data, filename):
-        """Export list of dicts to CSV (Excel compatible)."""
+        """Export list of dicts to an .xlsx workbook, or to CSV for any other extension."""
         if not data:
             return False
-            
+
         try:
-            with open(filename, 'w', newline='', encoding='utf-8') as f:
-                writer = csv.DictWriter(f, fieldnames=data[0].keys())
+            columns = list(data[0].keys())
+            if filename.lower().endswith(".xlsx"):
+                numeric = [i for i, key in enumerate(columns)
+                           if isinstance(data[0][key], (int, float)) and not isinstance(data[0][key], bool)]
+                with XLSXWriter(filename) as book:
+                    sheet = book.add_sheet("Report", columns, number_columns=numeric)
+                    sheet.write_rows([row[key] for key in columns] for row in data)
+                    if numeric:
+                        sheet.write_totals()
+                return True
+            with open(filename, 'w', newline='', encoding='utf-8-sig') as f:
+                writer = csv.DictWriter(f, fieldnames=columns)
                 writer.writeheader()
                 writer.writerows(data)
             return True
@@ -1,12 +1,9 @@
-from config.database import connect_db
+from config.database import get_connection
 from datetime import datetime
 
 class Invoice:
     @staticmethod
     def create_invoice(client_name, client_contact, address, pan_no, subtotal, vat_rate=13, discount=0, paid_amount=0):
-        conn = connect_db()
-        cursor = conn.cursor()
-        
         # Calculate VAT, discount, total, and due amount
         vat_amount = subtotal * (vat_rate / 100)
         discount_amount = subtotal * (discount / 100)
@@ -18,31 +15,25 @@ class Invoice:
         date = datetime.now().strftime("%Y-%m-%d")
 
         # Insert invoice data
-        cursor.execute('''
-            INSERT INTO Invoices (client_name, client_contact, address, pan_no, invoice_number, date, subtotal, vat_amount, discount, total_amount, vat_rate, paid_amount, due_amount)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (client_name, client_contact, address, pan_no, invoice_number, date, subtotal, vat_amount, discount_amount, total_amount, vat_rate, paid_amount, due_amount))
-        
-        invoice_id = cursor.lastrowid
-        conn.commit()
-        conn.close()
-        return invoice_id
+        with get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                INSERT INTO Invoices (client_name, client_contact, address, pan_no, invoice_number, date, subtotal, vat_amount, discount, total_amount, vat_rate, paid_amount, due_amount)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (client_name, client_contact, address, pan_no, invoice_number, date, subtotal, vat_amount, discount_amount, total_amount, vat_rate, paid_amount, due_amount))
+            conn.commit()
+            return cursor.lastrowid
 
     @staticmethod
     def get_invoice(invoice_id):
         """Retrieve a single invoice by its ID."""
-        conn = connect_db()
-        cursor = conn.cursor()
-        
         # Retrieve invoice data with relevant fields
-        cursor.execute('''
-            SELECT client_name, client_contact, address, pan_no, invoice_number, date, subtotal, vat_amount, discount, total_amount, vat_rate, paid_amount, due_amount
-            FROM Invoices
-            WHERE invoice_id = ?
-        ''', (invoice_id,))
-        
-        invoice_data = cursor.fetchone()
-        conn.close()
+        with get_connection() as conn:
+            invoice_data = conn.execute('''
+                SELECT client_name, client_contact, address, pan_no, invoice_number, date, subtotal, vat_amount, discount, total_amount, vat_rate, paid_amount, due_amount
+                FROM Invoices
+                WHERE invoice_id = ?
+            ''', (invoice_id,)).fetchone()
 
         if invoice_data:
             return {
@@ -66,10 +57,7 @@ class Invoice:
     @staticmethod
     def delete_invoice(invoice_id):
         """Delete an invoice by its ID."""
-        conn = connect_db()
-        cursor = conn.cursor()
-        
         # Delete the invoice from the database
-        cursor.execute("DELETE FROM Invoices WHERE invoice_id = ?", (invoice_id,))
-        conn.commit()
-        conn.close()
+        with get_connection() as conn:
+            conn.execute("DELETE FROM Invoices WHERE invoice_id = ?", (invoice_id,))
+            conn.commit()
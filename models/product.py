@@ -1,4 +1,6 @@
-from config.database import connect_db
+import json
+import sqlite3
+from config.database import get_connection, transaction
 
 
 class Product:
@@ -6,118 +8,141 @@ class Product:
     def add_product(name, price, hs_code, description='', unit='Ltr', category='Lubricant',
                    brand='', viscosity='', purchase_price=0, stock_quantity=0, min_stock_alert=10, batch_number=''):
         """Add a new product with inventory details."""
-        conn = connect_db()
-        cursor = conn.cursor()
-        cursor.execute('''
-            INSERT INTO Products (
-                name, price, hs_code, description, unit, category,
-                brand, viscosity, purchase_price, stock_quantity, min_stock_alert, batch_number
-            )
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (name, price, hs_code, description, unit, category, 
-              brand, viscosity, purchase_price, stock_quantity, min_stock_alert, batch_number))
-        conn.commit()
-        conn.close()
+        with get_connection() as conn:
+            conn.execute('''
+                INSERT INTO Products (
+                    name, price, hs_code, description, unit, category,
+                    brand, viscosity, purchase_price, stock_quantity, min_stock_alert, batch_number
+                )
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (name, price, hs_code, description, unit, category, 
+                  brand, viscosity, purchase_price, stock_quantity, min_stock_alert, batch_number))
+            conn.commit()
 
     @staticmethod
     def get_all_products():
         """Retrieve all products with inventory info."""
-        conn = connect_db()
-        cursor = conn.cursor()
-        # Columns: 0:id, 1:name, 2:price, 3:hs, 4:desc, 5:unit, 6:cat, 7:brand, 8:visc, 9:pprice, 10:stock, 11:min, 12:batch
-        cursor.execute("""
-            SELECT product_id, name, price, hs_code, description, unit, category,
-                   brand, viscosity, purchase_price, stock_quantity, min_stock_alert, batch_number
-            FROM Products ORDER BY name
-        """)
-        products = cursor.fetchall()
-        conn.close()
-        return products
+        with get_connection() as conn:
+            cursor = conn.cursor()
+            # Columns: 0:id, 1:name, 2:price, 3:hs, 4:desc, 5:unit, 6:cat, 7:brand, 8:visc, 9:pprice, 10:stock, 11:min, 12:batch
+            cursor.execute("""
+                SELECT product_id, name, price, hs_code, description, unit, category,
+                       brand, viscosity, purchase_price, stock_quantity, min_stock_alert, batch_number
+                FROM Products ORDER BY name
+            """)
+            return cursor.fetchall()
 
     @staticmethod
     def get_product_by_id(product_id):
         """Retrieve a single product by its ID."""
-        conn = connect_db()
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT product_id, name, price, hs_code, description, unit, category,
-                   brand, viscosity, purchase_price, stock_quantity, min_stock_alert, batch_number
-            FROM Products WHERE product_id = ?
-        """, (product_id,))
-        product = cursor.fetchone()
-        conn.close()
-        return product
+        with get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT product_id, name, price, hs_code, description, unit, category,
+                       brand, viscosity, purchase_price, stock_quantity, min_stock_alert, batch_number
+                FROM Products WHERE product_id = ?
+            """, (product_id,))
+            return cursor.fetchone()
+
+    @staticmethod
+    def get_products_by_ids(product_ids):
+        """Retrieve products for a list of IDs, in the order given."""
+        with get_connection() as conn:
+            rows = conn.execute("""
+                SELECT product_id, name, price, hs_code, description, unit, category,
+                       brand, viscosity, purchase_price, stock_quantity, min_stock_alert, batch_number
+                FROM Products WHERE product_id IN (SELECT value FROM json_each(?))
+            """, (json.dumps(list(product_ids)),)).fetchall()
+        by_id = {row[0]: row for row in rows}
+        return [by_id[pid] for pid in product_ids if pid in by_id]
+
+    @staticmethod
+    def search_product_ids(keyword, limit=20):
+        """
+        Return IDs of products matching every word of keyword, best match first.
+        Words of three or more characters are looked up in the trigram index;
+        shorter ones are matched with LIKE against the index's candidates.
+        """
+        words = keyword.split()
+        sql_limit = -1 if limit is None else limit
+        like_clause = "(p.name LIKE ? OR p.brand LIKE ? OR p.viscosity LIKE ? OR p.hs_code LIKE ? OR p.category LIKE ?)"
+        with get_connection() as conn:
+            if not words:
+                rows = conn.execute("SELECT product_id FROM Products ORDER BY name LIMIT ?", (sql_limit,)).fetchall()
+                return [row[0] for row in rows]
+
+            long_words = [w for w in words if len(w) >= 3]
+            short_words = [w for w in words if len(w) < 3]
+            if long_words:
+                match = " ".join('"' + w.replace('"', '""') + '"' for w in long_words)
+                clauses = ["products_fts MATCH ?"] + [like_clause] * len(short_words)
+                params = [match] + [f"%{w}%" for w in short_words for _ in range(5)]
+                try:
+                    # bm25 weights: name counts most, then brand/viscosity, HS code, category
+                    rows = conn.execute(f"""
+                        SELECT p.product_id
+                        FROM products_fts JOIN Products p ON p.product_id = products_fts.rowid
+                        WHERE {' AND '.join(clauses)}
+                        ORDER BY bm25(products_fts, 10.0, 4.0, 4.0, 2.0, 1.0), p.name
+                        LIMIT ?
+                    """, (*params, sql_limit)).fetchall()
+                    return [row[0] for row in rows]
+                except sqlite3.OperationalError:
+                    pass  # No trigram index in this database: scan with LIKE below
+
+            clauses = [like_clause] * len(words)
+            params = [f"%{w}%" for w in words for _ in range(5)]
+            rows = conn.execute(f"""
+                SELECT p.product_id FROM Products p
+                WHERE {' AND '.join(clauses)}
+                ORDER BY p.name
+                LIMIT ?
+            """, (*params, sql_limit)).fetchall()
+        return [row[0] for row in rows]
 
     @staticmethod
     def search_products(keyword):
-        """Search products by name, HS code, or category."""
-        conn = connect_db()
-        cursor = conn.cursor()
-        like = f"%{keyword}%"
-        cursor.execute('''
-            SELECT product_id, name, price, hs_code, description, unit, category,
-                   brand, viscosity, purchase_price, stock_quantity, min_stock_alert, batch_number
-            FROM Products
-            WHERE name LIKE ? OR hs_code LIKE ? OR category LIKE ?
-            ORDER BY name
-        ''', (like, like, like))
-        products = cursor.fetchall()
-        conn.close()
-        return products
+        """Search products by name, brand, viscosity, HS code or category, best match first."""
+        return Product.get_products_by_ids(Product.search_product_ids(keyword, limit=None))
 
     @staticmethod
     def update_product(product_id, name, price, hs_code, description='', unit='Ltr', category='Lubricant',
                        brand='', viscosity='', purchase_price=0, stock_quantity=0, min_stock_alert=10, batch_number=''):
         """Update an existing product."""
-        conn = connect_db()
-        cursor = conn.cursor()
-        cursor.execute('''
-            UPDATE Products
-            SET name=?, price=?, hs_code=?, description=?, unit=?, category=?,
-                brand=?, viscosity=?, purchase_price=?, stock_quantity=?, min_stock_alert=?, batch_number=?
-            WHERE product_id=?
-        ''', (name, price, hs_code, description, unit, category, 
-              brand, viscosity, purchase_price, stock_quantity, min_stock_alert, batch_number, product_id))
-        conn.commit()
-        conn.close()
+        with get_connection() as conn:
+            conn.execute('''
+                UPDATE Products
+                SET name=?, price=?, hs_code=?, description=?, unit=?, category=?,
+                    brand=?, viscosity=?, purchase_price=?, stock_quantity=?, min_stock_alert=?, batch_number=?
+                WHERE product_id=?
+            ''', (name, price, hs_code, description, unit, category, 
+                  brand, viscosity, purchase_price, stock_quantity, min_stock_alert, batch_number, product_id))
+            conn.commit()
 
     @staticmethod
     def delete_product(product_id):
         """Delete a product from the database."""
-        conn = connect_db()
-        cursor = conn.cursor()
-        cursor.execute('DELETE FROM Products WHERE product_id = ?', (product_id,))
-        conn.commit()
-        conn.close()
+        with get_connection() as conn:
+            conn.execute('DELETE FROM Products WHERE product_id = ?', (product_id,))
+            conn.commit()
 
     @staticmethod
     def get_product_count():
         """Get the total number of products."""
-        conn = connect_db()
-        cursor = conn.cursor()
-        cursor.execute("SELECT COUNT(*) FROM Products")
-        count = cursor.fetchone()[0]
-        conn.close()
-        return count
+        with get_connection() as conn:
+            return conn.execute("SELECT COUNT(*) FROM Products").fetchone()[0]
 
     @staticmethod
     def get_category_count():
         """Get the number of distinct categories."""
-        conn = connect_db()
-        cursor = conn.cursor()
-        cursor.execute("SELECT COUNT(DISTINCT category) FROM Products")
-        count = cursor.fetchone()[0]
-        conn.close()
-        return count
+        with get_connection() as conn:
+            return conn.execute("SELECT COUNT(DISTINCT category) FROM Products").fetchone()[0]
 
     @staticmethod
     def get_average_price():
         """Get the average product price."""
-        conn = connect_db()
-        cursor = conn.cursor()
-        cursor.execute("SELECT AVG(price) FROM Products")
-        avg = cursor.fetchone()[0]
-        conn.close()
+        with get_connection() as conn:
+            avg = conn.execute("SELECT AVG(price) FROM Products").fetchone()[0]
         return avg if avg else 0.0
 
     @staticmethod
@@ -126,22 +151,26 @@ class Product:
         Adjust stock quantity. 
         quantity_change: positive to add, negative to reduce.
         """
-        conn = connect_db()
-        cursor = conn.cursor()
-        cursor.execute("UPDATE Products SET stock_quantity = stock_quantity + ? WHERE product_id = ?", (quantity_change, product_id))
-        conn.commit()
-        conn.close()
+        Product.adjust_stock_bulk([(product_id, quantity_change)])
+
+    @staticmethod
+    def adjust_stock_bulk(changes):
+        """
+        Apply many (product_id, quantity_change) adjustments with one statement.
+        Joins the caller's transaction when there is one.
+        """
+        with transaction() as conn:
+            conn.executemany("UPDATE Products SET stock_quantity = stock_quantity + ? WHERE product_id = ?",
+                             [(quantity_change, product_id) for product_id, quantity_change in changes])
 
     @staticmethod
     def get_low_stock_products():
         """Get products where stock <= min_stock_alert."""
-        conn = connect_db()
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT product_id, name, stock_quantity, min_stock_alert, unit 
-            FROM Products 
-            WHERE stock_quantity <= min_stock_alert
-        """)
-        rows = cursor.fetchall()
-        conn.close()
-        return rows
+        with get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT product_id, name, stock_quantity, min_stock_alert, unit 
+                FROM Products 
+                WHERE stock_quantity <= min_stock_alert
+            """)
+            return cursor.fetchall()
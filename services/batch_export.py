@@ -0,0 +1,121 @@
+import io
+import os
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, wait
+from contextlib import nullcontext
+from itertools import islice
+
+from config import database
+from controllers.invoice_controller import InvoiceController
+from controllers.settings_controller import SettingsController
+from services.pdf_service import PDFService
+from services.render_service import PRIORITY_BATCH, RenderService
+
+# Invoices rendered per task: large enough to amortise inter-process
+# overhead, small enough to keep every worker busy until the end.
+CHUNK_SIZE = 20
+
+
+class BatchPDFExporter:
+    """
+    Renders every invoice and credit note matching a filter to PDF, either as
+    individual files in a folder or into a single ZIP archive.
+
+    Invoice IDs are streamed from the database in keyset pages and handed out
+    in chunks as batch-priority jobs to a RenderService, so memory stays flat
+    and throughput scales with the number of cores. Given the application's
+    shared service, interactive prints keep overtaking the export; otherwise
+    a private service with one worker per CPU core is used for the export.
+    """
+
+    def __init__(self, workers=None, render_service=None, profile="compact"):
+        self.workers = workers or os.cpu_count() or 1
+        self.render_service = render_service
+        # Exports are archives, so they use the compact PDF profile by default
+        self.profile = profile
+
+    def export(self, destination, as_zip=False, start_date=None, end_date=None,
+               fiscal_year=None, progress=None):
+        """
+        Export matching invoices to `destination` (a folder, or a .zip path when
+        as_zip is set). `progress(done, total)` is called from this thread after
+        each finished chunk. Returns the number of PDFs written.
+        """
+        filters = {"start_date": start_date, "end_date": end_date, "fiscal_year": fiscal_year}
+        total = InvoiceController.count_invoices(**filters)
+        if progress:
+            progress(0, total)
+        if total == 0:
+            return 0
+
+        invoice_ids = InvoiceController.iter_invoice_ids(**filters)
+        return self._run(destination, as_zip, total, invoice_ids, _render_chunk, (), progress)
+
+    def _run(self, destination, as_zip, total, record_ids, task, task_args, progress):
+        """
+        Hand record_ids out in chunks to `task(chunk, company, as_zip, output_dir,
+        db_path, profile, *task_args)` on the render workers, and collect the
+        returned (filename, pdf bytes or None) pairs into the folder or archive.
+        """
+        output_dir = os.path.dirname(os.path.abspath(destination)) if as_zip else destination
+        os.makedirs(output_dir, exist_ok=True)
+        company = PDFService.company_fields(SettingsController.get_all_settings())
+
+        service = self.render_service or RenderService(self.workers)
+        archive = zipfile.ZipFile(destination, "w", zipfile.ZIP_DEFLATED) if as_zip else nullcontext()
+        done = 0
+        pending = set()
+        try:
+            with archive:
+                while True:
+                    chunk = list(islice(record_ids, CHUNK_SIZE))
+                    if chunk:
+                        pending.add(service.submit(task, chunk, company, as_zip, output_dir,
+                                                   database.pool.db_path, self.profile, *task_args,
+                                                   priority=PRIORITY_BATCH))
+                    # Keep a bounded number of chunks in flight
+                    if pending and (len(pending) >= service.workers * 2 or not chunk):
+                        finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                        for future in finished:
+                            for filename, data in future.result():
+                                if as_zip:
+                                    archive.writestr(filename, data)
+                                done += 1
+                        if progress:
+                            progress(done, total)
+                    if not chunk and not pending:
+                        break
+        finally:
+            for future in pending:
+                future.cancel()
+            if service is not self.render_service:
+                service.shutdown()
+        return done
+
+
+def use_database(db_path):
+    """Point this worker process's connection pool at the exporting database."""
+    if database.pool.db_path != db_path:
+        database.pool = database.ConnectionPool(db_path)
+
+
+def _render_chunk(invoice_ids, company, as_zip, output_dir, db_path, profile):
+    """
+    Render a chunk of invoices in a worker process; returns
+    (filename, pdf bytes or None) pairs.
+    """
+    use_database(db_path)
+    service = PDFService(output_dir=output_dir, profile=profile)
+    results = []
+    for invoice_id in invoice_ids:
+        invoice_data, items = InvoiceController.get_invoice_details(invoice_id)
+        invoice_data.update(company)
+        filename = PDFService.pdf_filename(invoice_data)
+        if as_zip:
+            buffer = io.BytesIO()
+            service.render_invoice(invoice_data, items, buffer)
+            results.append((filename, buffer.getvalue()))
+        else:
+            service.render_invoice(invoice_data, items, os.path.join(output_dir, filename))
+            results.append((filename, None))
+    return results
@@ -1,16 +1,61 @@
+import hashlib
+import io
+import json
 import os
 import subprocess
 import platform
+import tempfile
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager, suppress
+from reportlab import rl_config
 from reportlab.lib.pagesizes import A4
 from reportlab.pdfgen import canvas
+from reportlab.lib.utils import ImageReader
+from PIL import Image
 from datetime import datetime
-import num2words
-from decimal import Decimal
+from itertools import islice
 
 from config.settings import Settings
+from utils.amount_in_words import amount_in_words
 
 class PDFService:
-    def __init__(self, output_dir=None):
+    # Item rows that fit in the fixed table region above the totals box
+    ROWS_PER_PAGE = 11
+    ROW_HEIGHT = 24
+    TEMPLATE_FORM = "InvoiceTemplate"
+    TOTALS_FORM = "InvoiceTotals"
+    # Bump whenever the drawing code changes, so cached PDFs are not reused
+    TEMPLATE_VERSION = 2
+    MEMORY_CACHE_SIZE = 32
+    DISK_CACHE_SIZE = 500
+    # Pruning trims the disk cache this far below DISK_CACHE_SIZE, so the
+    # directory is scanned once per this many new files, not on every store
+    DISK_CACHE_PRUNE_BATCH = 50
+
+    # Output profiles. "compact" is for archives: streams are stored as
+    # binary instead of ASCII85 text and the logo as a JPEG, which together
+    # cut a typical invoice to well under half of the default size.
+    PROFILES = {
+        "default": {"ascii85": True, "jpeg_logo": False},
+        "compact": {"ascii85": False, "jpeg_logo": True},
+    }
+    LOGO_JPEG_QUALITY = 75
+
+    _logo_readers = {}  # Cached ImageReaders by encoding, shared by every render in this process
+    # reportlab reads the ASCII85 switch from its global config while drawing
+    # and saving, so renders in this process take turns
+    _render_lock = threading.RLock()
+    # Recently rendered PDFs by content hash, shared by every PDFService instance
+    _pdf_cache = OrderedDict()
+    _pdf_cache_lock = threading.Lock()
+    # Cached PDF files per cache directory: counted once, then tracked per store
+    _disk_cache_counts = {}
+
+    def __init__(self, output_dir=None, profile="default"):
+        if profile not in self.PROFILES:
+            raise ValueError(f"Unknown PDF profile: {profile}")
+        self.profile = profile
         if output_dir is None:
             # Use APP_DIR_NAME or just project root logic? Project root logic seems safer for now as output_dir is relative to project.
             # But the user might want outputs in the secure dir?
@@ -21,6 +66,7 @@ class PDFService:
             
         if not os.path.exists(self.output_dir):
             os.makedirs(self.output_dir)
+        self.cache_dir = os.path.join(self.output_dir, ".cache")
 
     def generate_invoice_pdf(self, invoice_data, items):
         """
@@ -30,15 +76,192 @@ class PDFService:
         :param items: List of dictionaries containing invoice items
         :return: Path to the generated PDF
         """
+        return self.save_invoice_pdf(invoice_data, self.get_invoice_pdf_bytes(invoice_data, items))
+
+    def save_invoice_pdf(self, invoice_data, pdf_bytes):
+        """Write rendered PDF bytes to the invoice's file in output_dir; returns the path."""
+        pdf_path = os.path.join(self.output_dir, self.pdf_filename(invoice_data))
+        # A re-print leaves an identical file alone (it may be open in a viewer)
+        if not self._file_matches(pdf_path, pdf_bytes):
+            with open(pdf_path, "wb") as f:
+                f.write(pdf_bytes)
+        return pdf_path
+
+    def get_invoice_pdf_bytes(self, invoice_data, items):
+        """
+        Return the invoice PDF as bytes, served from the in-memory LRU or the
+        on-disk cache when the same content was rendered before.
+        """
+        items = list(items)
+        key = self.cache_key(invoice_data, items)
+        pdf_bytes = self.cached_pdf_bytes(key)
+        if pdf_bytes is None:
+            buffer = io.BytesIO()
+            self.render_invoice(invoice_data, items, buffer)
+            pdf_bytes = buffer.getvalue()
+            self.store_pdf_bytes(key, pdf_bytes)
+        return pdf_bytes
+
+    def cached_pdf_bytes(self, key):
+        """PDF bytes for a cache key from memory or the cache directory, or None."""
+        cls = type(self)
+        with cls._pdf_cache_lock:
+            pdf_bytes = cls._pdf_cache.get(key)
+            if pdf_bytes is not None:
+                cls._pdf_cache.move_to_end(key)
+                return pdf_bytes
+
+        cache_path = os.path.join(self.cache_dir, f"{key}.pdf")
+        try:
+            with open(cache_path, "rb") as f:
+                pdf_bytes = f.read()
+            os.utime(cache_path)  # Keep recently used files out of pruning
+        except OSError:
+            return None
+        self._remember(key, pdf_bytes)
+        return pdf_bytes
+
+    def store_pdf_bytes(self, key, pdf_bytes):
+        """Add freshly rendered PDF bytes to the memory and disk caches."""
+        self._store_on_disk(os.path.join(self.cache_dir, f"{key}.pdf"), pdf_bytes)
+        self._remember(key, pdf_bytes)
+
+    @classmethod
+    def _remember(cls, key, pdf_bytes):
+        with cls._pdf_cache_lock:
+            cls._pdf_cache[key] = pdf_bytes
+            cls._pdf_cache.move_to_end(key)
+            while len(cls._pdf_cache) > cls.MEMORY_CACHE_SIZE:
+                cls._pdf_cache.popitem(last=False)
+
+    def cache_key(self, invoice_data, items):
+        """
+        SHA-256 over everything that ends up in the file: invoice fields
+        (including status and the company settings), items, the template
+        version and the output profile. Any change produces a new key.
+        """
+        payload = json.dumps(
+            {"template": self.TEMPLATE_VERSION, "profile": self.profile,
+             "invoice": invoice_data, "items": [dict(item) for item in items],
+             # An undated invoice prints today's date
+             "printed_date": self._format_date(invoice_data.get("date"))},
+            sort_keys=True, default=str,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    @classmethod
+    def clear_cache(cls):
+        """Forget the in-memory PDFs (the disk cache is pruned on its own)."""
+        with cls._pdf_cache_lock:
+            cls._pdf_cache.clear()
+
+    def _store_on_disk(self, cache_path, pdf_bytes):
+        """
+        Write a rendered PDF to the cache directory. The directory is only
+        scanned the first time and once the tracked file count passes
+        DISK_CACHE_SIZE, when the oldest files are dropped.
+        """
+        cls = type(self)
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            is_new = not os.path.exists(cache_path)
+            # A unique temp file, so render workers in other processes storing
+            # the same key never write into each other's file
+            with tempfile.NamedTemporaryFile(dir=self.cache_dir, suffix=".tmp", delete=False) as f:
+                f.write(pdf_bytes)
+            try:
+                os.replace(f.name, cache_path)
+            except OSError:
+                with suppress(OSError):
+                    os.remove(f.name)
+                raise
+
+            with cls._pdf_cache_lock:
+                count = cls._disk_cache_counts.get(self.cache_dir)
+                if count is not None:
+                    count = cls._disk_cache_counts[self.cache_dir] = count + is_new
+            if count is None or count > self.DISK_CACHE_SIZE:
+                self._prune_disk_cache()
+        except OSError as e:
+            # The cache is an optimisation only
+            print(f"PDF cache write failed: {e}")
+
+    def _prune_disk_cache(self):
+        """Recount the cache directory and, if over the limit, drop the oldest files."""
+        cls = type(self)
+        entries = [e for e in os.scandir(self.cache_dir) if e.name.endswith(".pdf")]
+        excess = len(entries) - self.DISK_CACHE_SIZE
+        if excess > 0:
+            excess += self.DISK_CACHE_PRUNE_BATCH
+            entries.sort(key=lambda e: e.stat().st_mtime)
+            for entry in entries[:excess]:
+                with suppress(FileNotFoundError):  # Pruned by another worker
+                    os.remove(entry.path)
+        with cls._pdf_cache_lock:
+            cls._disk_cache_counts[self.cache_dir] = len(entries) - max(excess, 0)
+
+    @staticmethod
+    def _file_matches(path, data):
+        try:
+            if os.path.getsize(path) != len(data):
+                return False
+            with open(path, "rb") as f:
+                return f.read() == data
+        except OSError:
+            return False
+
+    @staticmethod
+    def pdf_filename(invoice_data):
+        """File name for an invoice's PDF, e.g. Invoice_MU_2082_2083_0001.pdf."""
         invoice_number = invoice_data.get("invoice_number", "UNKNOWN")
         safe_filename = invoice_number.replace("/", "_").replace("\\", "_")
-        pdf_path = os.path.join(self.output_dir, f"Invoice_{safe_filename}.pdf")
-        
-        c = canvas.Canvas(pdf_path, pagesize=A4)
+        return f"Invoice_{safe_filename}.pdf"
+
+    @staticmethod
+    def company_fields(settings):
+        """Company header fields for invoice_data, from the saved settings."""
+        return {
+            "company_name": settings.get("company_name", Settings.COMPANY_NAME),
+            "company_address": settings.get("company_address", Settings.COMPANY_ADDRESS),
+            "company_pan": settings.get("company_pan", Settings.COMPANY_PAN),
+            "company_contact": getattr(Settings, 'COMPANY_CONTACT', '9704508000'),
+            "company_email": getattr(Settings, 'COMPANY_EMAIL', 'moonalpvtltd@gmail.com'),
+        }
+
+    def render_invoice(self, invoice_data, items, target):
+        """
+        Draw the invoice onto target: a file path or a binary file object
+        (e.g. io.BytesIO when the PDF goes into an archive).
+        `items` may be any iterable; it is consumed one page at a time.
+        """
         width, height = A4
-        
-        # Precompute tax breakdown
-        subtotal = sum(float(i['total_price']) for i in items)
+
+        # Context for drawing
+        context = {
+            "invoice_data": invoice_data,
+            "width": width,
+            "height": height
+        }
+
+        with self._open_canvas(target) as c:
+            self._draw_pages(c, height - 50, context, items)
+
+    @contextmanager
+    def _open_canvas(self, target):
+        """An A4 canvas on target in this service's profile, saved when the block ends."""
+        with PDFService._render_lock:
+            saved_a85 = rl_config.useA85
+            rl_config.useA85 = int(self.PROFILES[self.profile]["ascii85"])
+            try:
+                c = canvas.Canvas(target, pagesize=A4, pageCompression=1)
+                yield c
+                c.save()
+            finally:
+                rl_config.useA85 = saved_a85
+
+    @staticmethod
+    def _calculate_totals(invoice_data, subtotal):
+        """Tax breakdown for the totals block, from the summed item totals."""
         vat_rate = float(invoice_data.get('vat_rate', 13) or 13)
         discount_pct = float(invoice_data.get('discount', 0) or 0)
         paid_amt = float(invoice_data.get('paid_amount', 0) or 0)
@@ -49,73 +272,154 @@ class PDFService:
         vat_amt = taxable * (vat_rate / 100)
         grand_total = taxable + vat_amt
         due = grand_total - paid_amt
-
-        # Context for drawing
-        context = {
-            "invoice_data": invoice_data,
-            "items": items,
-            "calculations": {
-                "subtotal": subtotal,
-                "discount_pct": discount_pct,
-                "discount_amt": discount_amt,
-                "taxable": taxable,
-                "vat_rate": vat_rate,
-                "vat_amt": vat_amt,
-                "grand_total": grand_total,
-                "paid_amt": paid_amt,
-                "due": due
-            },
-            "width": width,
-            "height": height
+        return {
+            "subtotal": subtotal,
+            "discount_pct": discount_pct,
+            "discount_amt": discount_amt,
+            "taxable": taxable,
+            "vat_rate": vat_rate,
+            "vat_amt": vat_amt,
+            "grand_total": grand_total,
+            "paid_amt": paid_amt,
+            "due": due
         }
 
-        # ── Draw One Full Copy ──
-        self._draw_full_page(c, height - 50, context)
+    @classmethod
+    def _paginate(cls, items):
+        """
+        Split items into pages lazily, yielding (rows, is_last_page).
+        Continuation pages give their first row to the brought-forward line,
+        and one page of look-ahead tells whether the current page is the last.
+        """
+        items = iter(items)
+        page = list(islice(items, cls.ROWS_PER_PAGE))
+        while True:
+            next_page = list(islice(items, cls.ROWS_PER_PAGE - 1))
+            yield page, not next_page
+            if not next_page:
+                return
+            page = next_page
 
-        c.save()
-        return pdf_path
+    def _draw_pages(self, c, start_y, context, items):
+        """Lay the invoice out page by page, carrying the running subtotal forward."""
+        # The static layout is recorded once per document as form XObjects;
+        # every page then only references them and draws its own values.
+        self._define_template(c, self.TEMPLATE_FORM, self._draw_static_layer, start_y, context)
+        L = self._layout(context["width"], start_y)
 
-    def _draw_full_page(self, c, start_y, context):
-        """Draw a fully structured, professional full-page A4 invoice."""
-        invoice_data = context["invoice_data"]
-        items = context["items"]
-        calc = context["calculations"]
-        width = context["width"]
-        height = context["height"]
+        subtotal = 0.0
+        serial = 0
+        for page_no, (rows, is_last) in enumerate(self._paginate(items), 1):
+            if page_no > 1:
+                c.showPage()
+            c.doForm(self.TEMPLATE_FORM)
+            self._draw_page_values(c, L, context, page_no, show_page_no=page_no > 1 or not is_last)
+            subtotal, serial = self._draw_item_rows(
+                c, L, rows, serial, subtotal, brought_forward=page_no > 1)
+            if is_last:
+                self._define_template(c, self.TOTALS_FORM, self._draw_totals_template, start_y, context)
+                c.doForm(self.TOTALS_FORM)
+                self._draw_totals(c, L, self._calculate_totals(context["invoice_data"], subtotal))
+            else:
+                self._draw_carried_forward(c, L, subtotal, page_no)
+            self._draw_watermark(c, context)
+
+    @staticmethod
+    def _define_template(c, name, draw, start_y, context):
+        """Record a form XObject the first time this document needs it."""
+        defined = c.__dict__.setdefault("_invoice_templates", set())
+        if name not in defined:
+            c.beginForm(name)
+            draw(c, start_y, context)
+            c.endForm()
+            defined.add(name)
 
+    @staticmethod
+    def _layout(width, start_y):
+        """Fixed positions shared by the static template and the variable layer."""
         # ── EXTREME PRECISION BALANCED COLUMN GRID ──
         LEFT = 50
         RIGHT = width - 50
-        TABLE_W = RIGHT - LEFT
-        
-        # Recalibrated X-slots for visual balance
-        X_SN = LEFT
         X_DESC = LEFT + 30
         X_HS = X_DESC + 155
         X_QTY = X_HS + 60
         X_UNIT = X_QTY + 35
         X_RATE = X_UNIT + 40
-        X_TOTAL = X_RATE + 85
-        
+
+        y_company = start_y - 52
+        y_header = y_company - 16 - 15 - 12 - 5 - 45 - 22 - 16 - 16 - 16 - 35
+        y_rows_top = y_header - 5
+        # Fixed table region: ROWS_PER_PAGE rows, then the totals box
+        table_bottom = y_rows_top - PDFService.ROW_HEIGHT * PDFService.ROWS_PER_PAGE - 5
+        totals_y = table_bottom - 25
+        return {
+            "LEFT": LEFT, "RIGHT": RIGHT, "TABLE_W": RIGHT - LEFT,
+            "X_SN": LEFT, "X_DESC": X_DESC, "X_HS": X_HS, "X_QTY": X_QTY,
+            "X_UNIT": X_UNIT, "X_RATE": X_RATE, "X_TOTAL": X_RATE + 85,
+            "y_company": y_company,
+            "y_bill_to": y_company - 16 - 15 - 12 - 5 - 45,
+            "y_header": y_header,
+            "y_rows_top": y_rows_top,
+            "y_table_start": y_rows_top + 26,
+            "table_bottom": table_bottom,
+            "totals_y": totals_y,
+            "totals_top": totals_y + 18,
+            "totals_x": RIGHT - 210,
+            "totals_w": 210,
+            "box_y": start_y - 12,
+            "box_x": RIGHT - 200,
+        }
+
+    @staticmethod
+    def _logo(jpeg=False):
+        """The letterhead logo, decoded once per process at print resolution."""
+        if jpeg not in PDFService._logo_readers:
+            project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+            logo_path = os.path.join(project_root, "moonal_blackwhite.png")
+            try:
+                image = Image.open(logo_path).convert("RGBA")
+                # 125pt wide at 300 dpi is about 520 px; the source PNG is twice that
+                max_px = 125 * 300 // 72
+                if image.width > max_px:
+                    image = image.resize((max_px, round(image.height * max_px / image.width)), Image.LANCZOS)
+                # The logo is black and white on a white page: flatten it to one
+                # grey channel so no transparency mask has to be embedded
+                flat = Image.new("RGB", image.size, "white")
+                flat.paste(image, mask=image.getchannel("A"))
+                flat = flat.convert("L")
+                if jpeg:
+                    # Embedded as-is (DCTDecode): far smaller than the Flate image
+                    buffer = io.BytesIO()
+                    flat.save(buffer, "JPEG", quality=PDFService.LOGO_JPEG_QUALITY)
+                    buffer.seek(0)
+                    flat = buffer
+                PDFService._logo_readers[jpeg] = ImageReader(flat)
+            except Exception:
+                PDFService._logo_readers[jpeg] = False
+        return PDFService._logo_readers[jpeg] or None
+
+    def _draw_static_layer(self, c, start_y, context):
+        """Everything that is the same on every page of this document."""
+        invoice_data = context["invoice_data"]
+        width = context["width"]
+        L = self._layout(width, start_y)
+        LEFT, RIGHT = L["LEFT"], L["RIGHT"]
+
         c.setFillColorRGB(0, 0, 0)
         y = start_y
 
         # ═══ PREMIUM HEADER ═══
-        project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-        logo_path = os.path.join(project_root, "moonal_blackwhite.png")
-        
-        try:
+        logo = self._logo(self.PROFILES[self.profile]["jpeg_logo"])
+        if logo is not None:
             logo_w, logo_h = 125, 42
-            c.drawImage(logo_path, LEFT, y-10, width=logo_w, height=logo_h,
-                        preserveAspectRatio=True, mask='auto')
-        except Exception:
-            pass
+            c.drawImage(logo, LEFT, y-10, width=logo_w, height=logo_h,
+                        preserveAspectRatio=True)
 
         c.setFont("Helvetica-Bold", 32)
         c.setFillColorRGB(0.1, 0.1, 0.1)
         c.drawRightString(RIGHT, y, "INVOICE")
         
-        y -= 52
+        y = L["y_company"]
         c.setFillColorRGB(0, 0, 0)
         c.setFont("Helvetica-Bold", 16)
         c.drawString(LEFT, y, invoice_data.get("company_name", Settings.COMPANY_NAME).upper())
@@ -143,10 +447,10 @@ class PDFService:
         c.line(LEFT, y, RIGHT, y)
         
         # ═══ INVOICE INFO BOX (Widened to 200pt, 60/40 Split) ═══
-        box_y = start_y - 12
+        box_y = L["box_y"]
         box_w = 200
         box_h = 44
-        box_x = RIGHT - box_w
+        box_x = L["box_x"]
         box_split_x = box_x + 120 # 60% of 200
         
         c.setLineWidth(1)
@@ -158,12 +462,9 @@ class PDFService:
         c.setFont("Helvetica-Bold", 8.5)
         c.drawCentredString(box_x + 60, box_y - 14, "INVOICE #")
         c.drawCentredString(box_split_x + 40, box_y - 14, "DATE")
-        c.setFont("Helvetica", 10.5)
-        c.drawCentredString(box_x + 60, box_y - 35, str(invoice_data.get('invoice_number', '')))
-        c.drawCentredString(box_split_x + 40, box_y - 35, datetime.now().strftime('%d/%m/%Y'))
 
         # ═══ ADDRESS BLOCK (Structured Labels) ═══
-        y -= 45
+        y = L["y_bill_to"]
         c.saveState()
         c.setFillColorRGB(0.15, 0.15, 0.15)
         c.rect(LEFT, y - 5, 230, 18, fill=1, stroke=0)
@@ -174,122 +475,95 @@ class PDFService:
         c.drawString(LEFT + 5, y, "CLIENT INFORMATION (BILL TO)")
         c.setFillColorRGB(0, 0, 0)
         
-        y -= 22
-        c.setFont("Helvetica", 10.5)
-        c.drawString(LEFT + 5, y, "Name:")
-        c.setFont("Helvetica-Bold", 11)
-        c.drawString(LEFT + 60, y, str(invoice_data.get('client_name', '')).upper())
-        
-        y -= 16
         c.setFont("Helvetica", 10.5)
-        c.drawString(LEFT + 5, y, "Address:")
-        c.drawString(LEFT + 60, y, str(invoice_data.get('address', '') or ''))
-        
-        y -= 16
-        c.drawString(LEFT + 5, y, "Contact:")
-        c.drawString(LEFT + 60, y, str(invoice_data.get('client_contact', '') or 'N/A'))
-        
-        y -= 16
-        pan_val = invoice_data.get('pan_no', '')
-        if pan_val:
-            c.drawString(LEFT + 5, y, "VAT/PAN:")
-            c.drawString(LEFT + 60, y, str(pan_val))
+        for label in ("Name:", "Address:", "Contact:"):
+            y -= 22 if label == "Name:" else 16
+            c.drawString(LEFT + 5, y, label)
 
         # ═══ TABLE HEADER (Rigorous Balanced Widths) ═══
-        y -= 35
+        y = L["y_header"]
         c.saveState()
         c.setFillColorRGB(0.12, 0.12, 0.12)
-        c.rect(LEFT, y - 5, TABLE_W, 26, fill=1, stroke=0)
+        c.rect(LEFT, y - 5, L["TABLE_W"], 26, fill=1, stroke=0)
         c.restoreState()
         
         c.setFillColorRGB(1, 1, 1)
         c.setFont("Helvetica-Bold", 9.5)
-        c.drawString(X_SN + 5, y + 2, "S.N.")
-        c.drawString(X_DESC + 5, y + 2, "PARTICULARS")
-        c.drawString(X_HS + 5, y + 2, "HS CODE")
-        c.drawString(X_QTY + 5, y + 2, "QTY")
-        c.drawString(X_UNIT + 5, y + 2, "UNIT")
-        c.drawString(X_RATE + 5, y + 2, "RATE (Rs.)")
+        c.drawString(L["X_SN"] + 5, y + 2, "S.N.")
+        c.drawString(L["X_DESC"] + 5, y + 2, "PARTICULARS")
+        c.drawString(L["X_HS"] + 5, y + 2, "HS CODE")
+        c.drawString(L["X_QTY"] + 5, y + 2, "QTY")
+        c.drawString(L["X_UNIT"] + 5, y + 2, "UNIT")
+        c.drawString(L["X_RATE"] + 5, y + 2, "RATE (Rs.)")
         c.drawRightString(RIGHT - 5, y + 2, "TOTAL (Rs.)")
         c.setFillColorRGB(0, 0, 0)
 
-        y -= 5
         c.setLineWidth(1)
-        c.line(LEFT, y, RIGHT, y)
-
-        # ═══ TABLE BODY (Precision Alignment) ═══
-        y_table_start = y + 26
-        c.setFont("Helvetica", 10)
-        row_h = 24
-        for idx, item in enumerate(items, 1):
-            y -= row_h
-            if y < 190: 
-                 break
-            # Row separator
-            c.setStrokeColorRGB(0.8, 0.8, 0.8)
-            c.setLineWidth(0.5)
-            c.line(LEFT, y-5, RIGHT, y-5)
-            c.setStrokeColorRGB(0, 0, 0)
-            
-            c.drawString(X_SN + 5, y, f"{idx:>2}.")
-            product_name = item.get('product_name', '') or ''
-            c.drawString(X_DESC + 5, y, product_name[:26])
-            c.drawString(X_HS + 5, y, str(item.get('hs_code', '') or ''))
-            c.drawRightString(X_QTY + 30, y, str(item.get('quantity', 0)))
-            c.drawString(X_UNIT + 5, y, str(item.get('unit', 'Ltr')))
-            
-            # Rate & Total: Right-aligned within their 85pt+ containers
-            c.drawRightString(X_RATE + 80, y, f"{float(item.get('price_per_unit', 0)):,.2f}")
-            c.drawRightString(RIGHT - 5, y, f"{float(item.get('total_price', 0)):,.2f}")
+        c.line(LEFT, L["y_rows_top"], RIGHT, L["y_rows_top"])
 
         # Vertical Grid Lines
-        table_bottom = y - 5
+        y_table_start = L["y_table_start"]
+        table_bottom = L["table_bottom"]
         c.setLineWidth(1)
         c.line(LEFT, y_table_start, LEFT, table_bottom)
         c.line(RIGHT, y_table_start, RIGHT, table_bottom)
         
         c.setLineWidth(0.5)
-        c.line(X_DESC, y_table_start, X_DESC, table_bottom)
-        c.line(X_HS, y_table_start, X_HS, table_bottom)
-        c.line(X_QTY, y_table_start, X_QTY, table_bottom)
-        c.line(X_UNIT, y_table_start, X_UNIT, table_bottom)
-        c.line(X_RATE, y_table_start, X_RATE, table_bottom)
-        c.line(X_TOTAL, y_table_start, X_TOTAL, table_bottom)
+        for x in (L["X_DESC"], L["X_HS"], L["X_QTY"], L["X_UNIT"], L["X_RATE"], L["X_TOTAL"]):
+            c.line(x, y_table_start, x, table_bottom)
         
-        y = table_bottom
         c.setLineWidth(1)
-        c.line(LEFT, y, RIGHT, y)
+        c.line(LEFT, table_bottom, RIGHT, table_bottom)
+
+        # ═══ FOOTER & SIGNATURE ═══
+        y_footer = 125
+        c.setFont("Helvetica-Bold", 9.5)
+        c.drawString(LEFT, y_footer, "TERMS & CONDITIONS")
+        y_footer -= 15
+        c.setFont("Helvetica", 8.5)
+        terms = [
+            "  • Product quality is guaranteed only if the original seal is intact.",
+            "  • Any query regarding this invoice must be raised within 3 working days.",
+            "  • Unopened packs can be returned within 7 days for quality inspection.",
+            "  • This is a computer generated invoice and does not require a stamp."
+        ]
+        for t in terms:
+            c.drawString(LEFT, y_footer, t)
+            y_footer -= 12
+
+        y_sig = 75
+        c.setFont("Helvetica-Bold", 11)
+        c.drawRightString(RIGHT, y_sig, "For MOONAL UDHYOG PVT. LTD.")
+        y_sig -= 40
+        c.setLineWidth(1)
+        c.line(RIGHT-170, y_sig, RIGHT, y_sig)
+        y_sig -= 14
+        c.drawRightString(RIGHT-35, y_sig, "Authorized Signatory")
+
+    def _draw_totals_template(self, c, start_y, context):
+        """Frame and labels of the totals block, used on the last page only."""
+        L = self._layout(context["width"], start_y)
+        LEFT, RIGHT = L["LEFT"], L["RIGHT"]
 
         # ═══ FORMAL TOTALS TABLE ═══
-        row_y = y - 25
-        total_w = 210
-        total_x = RIGHT - total_w
+        row_y = L["totals_y"]
+        total_w = L["totals_w"]
+        total_x = L["totals_x"]
         label_x = total_x + 10
-        value_x = RIGHT - 10
         col_sep_x = total_x + 120
         
-        ty = row_y + 18
+        ty = L["totals_top"]
         c.setLineWidth(1)
         c.rect(total_x, ty - 87, total_w, 87)
         c.line(col_sep_x, ty, col_sep_x, ty - 87)
         
         c.setFont("Helvetica-Bold", 9.5)
         c.drawString(label_x, row_y + 4, "SUBTOTAL")
-        c.drawRightString(value_x, row_y + 4, f"{calc['subtotal']:,.2f}")
-        c.line(total_x, row_y - 2, RIGHT, row_y - 2)
-        
-        row_y -= 21
-        c.setFont("Helvetica", 9.5)
-        c.drawString(label_x, row_y + 4, f"DISCOUNT ({calc['discount_pct']:.1f}%)")
-        c.drawRightString(value_x, row_y + 4, f"{calc['discount_amt']:,.2f}")
-        c.line(total_x, row_y - 2, RIGHT, row_y - 2)
+        for _ in range(3):
+            c.line(total_x, row_y - 2, RIGHT, row_y - 2)
+            row_y -= 21
+        row_y -= 3
         
-        row_y -= 21
-        c.drawString(label_x, row_y + 4, f"VAT ({calc['vat_rate']:.0f}%)")
-        c.drawRightString(value_x, row_y + 4, f"{calc['vat_amt']:,.2f}")
-        c.line(total_x, row_y - 2, RIGHT, row_y - 2)
-        
-        row_y -= 24
         c.saveState()
         c.setFillColorRGB(0.96, 0.96, 0.96)
         c.rect(total_x, ty-87, total_w, 23, fill=1, stroke=0)
@@ -297,87 +571,158 @@ class PDFService:
         
         c.setFont("Helvetica-Bold", 11)
         c.drawString(label_x, row_y + 6, "GRAND TOTAL")
-        c.drawRightString(value_x, row_y + 6, f"Rs. {calc['grand_total']:,.2f}")
 
         # ═══ AMOUNT IN WORDS (Spaced Layout) ═══
-        y_words = ty - 110
         c.setFont("Helvetica-Bold", 10)
-        c.drawString(LEFT, y_words, "TOTAL IN WORDS:")
+        c.drawString(LEFT, ty - 110, "TOTAL IN WORDS:")
+
+    def _draw_page_values(self, c, L, context, page_no, show_page_no):
+        """Header values repeated on every page: number, date, client, page number."""
+        invoice_data = context["invoice_data"]
+        LEFT = L["LEFT"]
+
+        c.setFillColorRGB(0, 0, 0)
+        c.setStrokeColorRGB(0, 0, 0)
+
+        # Invoice number and date
+        box_x, box_y = L["box_x"], L["box_y"]
+        c.setFont("Helvetica", 10.5)
+        c.drawCentredString(box_x + 60, box_y - 35, str(invoice_data.get('invoice_number', '')))
+        c.drawCentredString(box_x + 160, box_y - 35, self._format_date(invoice_data.get('date')))
+
+        # Client details
+        y = L["y_bill_to"] - 22
+        c.setFont("Helvetica-Bold", 11)
+        c.drawString(LEFT + 60, y, str(invoice_data.get('client_name', '')).upper())
+        
+        y -= 16
+        c.setFont("Helvetica", 10.5)
+        c.drawString(LEFT + 60, y, str(invoice_data.get('address', '') or ''))
+        
+        y -= 16
+        c.drawString(LEFT + 60, y, str(invoice_data.get('client_contact', '') or 'N/A'))
+        
+        y -= 16
+        pan_val = invoice_data.get('pan_no', '')
+        if pan_val:
+            c.drawString(LEFT + 5, y, "VAT/PAN:")
+            c.drawString(LEFT + 60, y, str(pan_val))
+
+        if show_page_no:
+            c.setFont("Helvetica", 8.5)
+            c.drawCentredString(context["width"] / 2, 20, f"Page {page_no}")
+
+    def _draw_item_rows(self, c, L, rows, serial, subtotal, brought_forward):
+        """
+        Draw one page of item rows, after a brought-forward line on continuation
+        pages. Returns the running (subtotal, serial number) for the next page.
+        """
+        # ═══ TABLE BODY (Precision Alignment) ═══
+        LEFT, RIGHT = L["LEFT"], L["RIGHT"]
+        y = L["y_rows_top"]
+        slot = 0
+
+        if brought_forward:
+            y -= self.ROW_HEIGHT
+            slot += 1
+            self._draw_row_separator(c, L, y)
+            c.setFont("Helvetica-Oblique", 10)
+            c.drawString(L["X_DESC"] + 5, y, "Brought forward")
+            c.drawRightString(RIGHT - 5, y, f"{subtotal:,.2f}")
+
         c.setFont("Helvetica", 10)
-        words_val = self.total_in_words(calc['grand_total'])
-        c.drawString(LEFT + 120, y_words, words_val)
+        for item in rows:
+            y -= self.ROW_HEIGHT
+            slot += 1
+            serial += 1
+            subtotal += float(item['total_price'])
+            # Row separator (the last row closes on the table's bottom rule)
+            if slot < self.ROWS_PER_PAGE:
+                self._draw_row_separator(c, L, y)
+            
+            c.drawString(L["X_SN"] + 5, y, f"{serial:>2}.")
+            product_name = item.get('product_name', '') or ''
+            c.drawString(L["X_DESC"] + 5, y, product_name[:26])
+            c.drawString(L["X_HS"] + 5, y, str(item.get('hs_code', '') or ''))
+            c.drawRightString(L["X_QTY"] + 30, y, str(item.get('quantity', 0)))
+            c.drawString(L["X_UNIT"] + 5, y, str(item.get('unit', 'Ltr')))
+            
+            # Rate & Total: Right-aligned within their 85pt+ containers
+            c.drawRightString(L["X_RATE"] + 80, y, f"{float(item.get('price_per_unit', 0)):,.2f}")
+            c.drawRightString(RIGHT - 5, y, f"{float(item.get('total_price', 0)):,.2f}")
 
-        # ═══ FOOTER & SIGNATURE ═══
-        y_footer = 125
+        return subtotal, serial
+
+    @staticmethod
+    def _draw_row_separator(c, L, y):
+        c.setStrokeColorRGB(0.8, 0.8, 0.8)
+        c.setLineWidth(0.5)
+        c.line(L["LEFT"], y-5, L["RIGHT"], y-5)
+        c.setStrokeColorRGB(0, 0, 0)
+
+    def _draw_carried_forward(self, c, L, subtotal, page_no):
+        """Running subtotal at the foot of a page that continues overleaf."""
+        RIGHT = L["RIGHT"]
+        row_y = L["totals_y"]
         c.setFont("Helvetica-Bold", 9.5)
-        c.drawString(LEFT, y_footer, "TERMS & CONDITIONS")
-        y_footer -= 15
-        c.setFont("Helvetica", 8.5)
-        terms = [
-            "  • Product quality is guaranteed only if the original seal is intact.",
-            "  • Any query regarding this invoice must be raised within 3 working days.",
-            "  • Unopened packs can be returned within 7 days for quality inspection.",
-            "  • This is a computer generated invoice and does not require a stamp."
-        ]
-        for t in terms:
-            c.drawString(LEFT, y_footer, t)
-            y_footer -= 12
+        c.drawString(L["totals_x"] + 10, row_y + 4, "CARRIED FORWARD")
+        c.drawRightString(RIGHT - 10, row_y + 4, f"{subtotal:,.2f}")
+        c.setFont("Helvetica-Oblique", 9)
+        c.drawRightString(RIGHT - 10, row_y - 17, f"Continued on page {page_no + 1}")
 
-        y_sig = 75
+    def _draw_totals(self, c, L, calc):
+        """Totals values and amount in words, on the last page only."""
+        RIGHT = L["RIGHT"]
+        row_y = L["totals_y"]
+        label_x = L["totals_x"] + 10
+        value_x = RIGHT - 10
+        c.setFont("Helvetica-Bold", 9.5)
+        c.drawRightString(value_x, row_y + 4, f"{calc['subtotal']:,.2f}")
+        
+        row_y -= 21
+        c.setFont("Helvetica", 9.5)
+        c.drawString(label_x, row_y + 4, f"DISCOUNT ({calc['discount_pct']:.1f}%)")
+        c.drawRightString(value_x, row_y + 4, f"{calc['discount_amt']:,.2f}")
+        
+        row_y -= 21
+        c.drawString(label_x, row_y + 4, f"VAT ({calc['vat_rate']:.0f}%)")
+        c.drawRightString(value_x, row_y + 4, f"{calc['vat_amt']:,.2f}")
+        
+        row_y -= 24
         c.setFont("Helvetica-Bold", 11)
-        c.drawRightString(RIGHT, y_sig, "For MOONAL UDHYOG PVT. LTD.")
-        y_sig -= 40
-        c.setLineWidth(1)
-        c.line(RIGHT-170, y_sig, RIGHT, y_sig)
-        y_sig -= 14
-        c.drawRightString(RIGHT-35, y_sig, "Authorized Signatory")
+        c.drawRightString(value_x, row_y + 6, f"Rs. {calc['grand_total']:,.2f}")
 
-        # Watermark
-        status = invoice_data.get('status', 'ACTIVE')
-        if status == 'CANCELLED':
-            c.saveState()
-            c.setFillColorRGB(1, 0.05, 0.05, 0.1)
-            c.setFont("Helvetica-Bold", 110)
-            c.translate(width / 2, height / 2)
-            c.rotate(45)
-            c.drawCentredString(0, 0, "CANCELLED")
-            c.restoreState()
+        c.setFont("Helvetica", 10)
+        c.drawString(L["LEFT"] + 120, L["totals_top"] - 110, self.total_in_words(calc['grand_total']))
 
-        # Watermark
-        status = invoice_data.get('status', 'ACTIVE')
+    @staticmethod
+    def _draw_watermark(c, context):
+        status = context["invoice_data"].get('status', 'ACTIVE')
         if status == 'CANCELLED':
             c.saveState()
-            c.setFillColorRGB(1, 0.1, 0.1, 0.12)
+            c.setFillColorRGB(1, 0.1, 0.1, 0.33)
             c.setFont("Helvetica-Bold", 110)
-            c.translate(width / 2, height / 2)
+            c.translate(context["width"] / 2, context["height"] / 2)
             c.rotate(45)
             c.drawCentredString(0, 0, "CANCELLED")
             c.restoreState()
 
-        # Watermark
-        status = invoice_data.get('status', 'ACTIVE')
-        if status == 'CANCELLED':
-            c.saveState()
-            c.setFillColorRGB(1, 0.2, 0.2, 0.15)
-            c.setFont("Helvetica-Bold", 110)
-            c.translate(width / 2, height / 2)
-            c.rotate(45)
-            c.drawCentredString(0, 0, "CANCELLED")
-            c.restoreState()
+    @staticmethod
+    def _format_date(value):
+        """Invoice date (YYYY-MM-DD) as DD/MM/YYYY; today for unsaved invoices."""
+        try:
+            return datetime.strptime(str(value)[:10], "%Y-%m-%d").strftime('%d/%m/%Y')
+        except (TypeError, ValueError):
+            return datetime.now().strftime('%d/%m/%Y')
 
     def total_in_words(self, total):
         try:
-            total = Decimal(str(total)).quantize(Decimal('0.01'))
-            rupees = int(total)
-            paisa = int((total - rupees) * 100)
-            text = f"{num2words.num2words(rupees, lang='en_IN').title()} Rupees"
-            if paisa > 0:
-                text += f" And {num2words.num2words(paisa, lang='en_IN').title()} Paisa"
-            return text
+            return amount_in_words(total)
         except Exception as e:
             return f"{total} (Error converting to words)"
             
-    def open_pdf(self, pdf_path):
+    @staticmethod
+    def open_pdf(pdf_path):
         """Opens the PDF file using the default system application."""
         if platform.system() == "Linux":
             subprocess.run(["xdg-open", pdf_path])
@@ -0,0 +1,197 @@
+import io
+import itertools
+import multiprocessing
+import os
+import queue
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+
+from services.pdf_service import PDFService
+
+# Lower numbers run first
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BATCH = 10
+
+# Jobs waiting for a worker; past this, submit() rejects the job rather than
+# block the caller (usually the Tk main thread)
+MAX_QUEUED_JOBS = 64
+
+# Per-process PDFService for each output profile, created by _warm_worker
+_worker_services = {}
+
+
+class RenderQueueFull(RuntimeError):
+    """Set on a submitted job's Future when the render queue has no room for it."""
+
+
+class RenderService:
+    """
+    Long-lived pool of warm PDF worker processes fed from a priority queue.
+
+    Worker processes import reportlab and draw a throwaway invoice when they
+    start, so no job pays for imports, font loading or the cached logo. A
+    dispatcher thread hands queued jobs to the workers, never more than one
+    per worker, so an interactive print overtakes any batch jobs still
+    waiting. Jobs are concurrent.futures.Future objects: cancel() drops a
+    job that has not started yet.
+    """
+
+    def __init__(self, workers=None):
+        self.workers = workers or min(os.cpu_count() or 1, 4)
+        self._queue = queue.PriorityQueue(MAX_QUEUED_JOBS)
+        self._sequence = itertools.count()  # FIFO order within a priority
+        self._slots = threading.Semaphore(self.workers)
+        self._lock = threading.Lock()
+        self._executor = None
+        self._dispatcher = None
+
+    def start(self):
+        """Start the worker processes now instead of on the first job."""
+        with self._lock:
+            if self._executor is not None:
+                return
+            # spawn: never fork a process that is running Tk and database threads.
+            # Spawned workers re-import the __main__ module, which keeps its GUI
+            # imports inside main() for that reason.
+            self._executor = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("spawn"),
+                                                 initializer=_warm_worker)
+            for _ in range(self.workers):
+                self._executor.submit(os.getpid)
+            self._dispatcher = threading.Thread(target=self._dispatch, name="moonal-render", daemon=True)
+            self._dispatcher.start()
+
+    def shutdown(self):
+        """Stop the dispatcher and the workers; queued jobs are cancelled."""
+        with self._lock:
+            if self._executor is None:
+                return
+            executor, self._executor = self._executor, None
+            dispatcher, self._dispatcher = self._dispatcher, None
+        while True:
+            try:
+                _, _, job = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            job[0].cancel()
+        self._queue.put((float("inf"), next(self._sequence), None))
+        dispatcher.join()
+        executor.shutdown(wait=True)
+
+    def submit(self, fn, *args, priority=PRIORITY_BATCH, then=None, widget=None,
+               on_success=None, on_error=None):
+        """
+        Queue `fn(*args)` for a worker process (fn and args must be picklable)
+        and return its Future. `then(result)`, if given, post-processes the
+        result in this process. With a Tk widget, on_success(result) or
+        on_error(exception) is delivered on the main thread via widget.after;
+        cancelled jobs get neither. submit() never blocks: when MAX_QUEUED_JOBS
+        are already waiting, the Future fails at once with RenderQueueFull.
+        """
+        self.start()
+        future = Future()
+        self._add_callbacks(future, widget, on_success, on_error)
+        try:
+            self._queue.put_nowait((priority, next(self._sequence), (future, fn, args, then)))
+        except queue.Full:
+            future.set_running_or_notify_cancel()
+            future.set_exception(RenderQueueFull(f"{MAX_QUEUED_JOBS} PDF jobs are already waiting; try again shortly"))
+        return future
+
+    def render_invoice(self, invoice_data, items, output_dir=None, profile="default", widget=None,
+                       on_success=None, on_error=None):
+        """
+        Render an invoice at interactive priority and save it to output_dir.
+        The job's result is the PDF path. A re-print served by the PDF cache
+        completes without a worker.
+        """
+        pdf_service = PDFService(output_dir=output_dir, profile=profile)
+        items = list(items)
+        key = pdf_service.cache_key(invoice_data, items)
+
+        def save(pdf_bytes):
+            pdf_service.store_pdf_bytes(key, pdf_bytes)
+            return pdf_service.save_invoice_pdf(invoice_data, pdf_bytes)
+
+        pdf_bytes = pdf_service.cached_pdf_bytes(key)
+        if pdf_bytes is None:
+            return self.submit(_render_invoice_bytes, invoice_data, items, profile, priority=PRIORITY_INTERACTIVE,
+                               then=save, widget=widget, on_success=on_success, on_error=on_error)
+
+        future = Future()
+        self._add_callbacks(future, widget, on_success, on_error)
+        future.set_running_or_notify_cancel()
+        _resolve(future, pdf_service.save_invoice_pdf, invoice_data, pdf_bytes)
+        return future
+
+    def _dispatch(self):
+        while True:
+            self._slots.acquire()
+            _, _, job = self._queue.get()
+            if job is None:
+                return
+            future, fn, args, then = job
+            if not future.set_running_or_notify_cancel():
+                self._slots.release()
+                continue
+            try:
+                worker_future = self._executor.submit(fn, *args)
+            except Exception as e:
+                self._slots.release()
+                future.set_exception(e)
+                continue
+            worker_future.add_done_callback(
+                lambda done, future=future, then=then: self._finish(future, then, done))
+
+    def _finish(self, future, then, worker_future):
+        self._slots.release()
+        if worker_future.exception() is not None:
+            future.set_exception(worker_future.exception())
+        elif then is not None:
+            _resolve(future, then, worker_future.result())
+        else:
+            future.set_result(worker_future.result())
+
+    @staticmethod
+    def _add_callbacks(future, widget, on_success, on_error):
+        if widget is None or not (on_success or on_error):
+            return
+
+        def deliver(done):
+            if done.cancelled():
+                return
+            error = done.exception()
+            try:
+                if error is None:
+                    if on_success:
+                        result = done.result()
+                        widget.after(0, lambda: on_success(result))
+                elif on_error:
+                    widget.after(0, lambda: on_error(error))
+            except RuntimeError:
+                pass  # Tk main loop has already exited
+        future.add_done_callback(deliver)
+
+
+def _resolve(future, fn, *args):
+    try:
+        future.set_result(fn(*args))
+    except Exception as e:
+        future.set_exception(e)
+
+
+def _warm_worker():
+    """Import and exercise the PDF stack once, before the first real job."""
+    sample = {"invoice_number": "WARMUP", "client_name": "", "status": "ACTIVE"}
+    item = {"product_name": "", "quantity": 1, "price_per_unit": 0, "total_price": 0}
+    for profile in PDFService.PROFILES:
+        _worker_services[profile] = PDFService(profile=profile)
+        _worker_services[profile].render_invoice(sample, [item], io.BytesIO())
+
+
+def _render_invoice_bytes(invoice_data, items, profile):
+    buffer = io.BytesIO()
+    _worker_services[profile].render_invoice(invoice_data, items, buffer)
+    return buffer.getvalue()
+
+
+render_service = RenderService()
@@ -0,0 +1,136 @@
+import sqlite3
+import threading
+
+from config import database
+
+
+class RepositoryCache:
+    """
+    Process-wide read-through cache for small, frequently read tables
+    (products, customers, settings).
+
+    Each dataset is loaded once and kept as the full row list plus a by-ID
+    index, and is registered with the tables it reads. Every read checks
+    PRAGMA data_version on a dedicated connection, which changes whenever any
+    other connection commits (another thread's pooled connection or another
+    process sharing the database). Only then is the table_versions change
+    counter table read, and only the datasets whose tables it shows as
+    changed are dropped, so commits to unrelated tables (the audit log,
+    invoices) leave the cache alone.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._loaders = {}   # name -> (loader, key)
+        self._tables = {}    # name -> tables the loader reads
+        self._entries = {}   # name -> (rows, index)
+        self._watch_conn = None
+        self._watch_path = None
+        self._data_version = None
+        self._table_versions = None
+        self._stats = {"hits": 0, "misses": 0, "invalidations": 0}
+
+    def register(self, name, loader, key=None, tables=()):
+        """
+        Register a dataset: loader() returns its rows, key(row) its ID, and
+        tables names the tables it reads. A dataset without tables is dropped
+        on every commit.
+        """
+        with self._lock:
+            self._loaders[name] = (loader, key)
+            self._tables[name] = frozenset(tables)
+            self._entries.pop(name, None)
+
+    def get_all(self, name):
+        """Return every row of a dataset, loading it on a miss."""
+        return self._entry(name)[0]
+
+    def get_by_id(self, name, record_id):
+        """Return one row of a dataset by its ID, or None."""
+        return self._entry(name)[1].get(record_id)
+
+    def invalidate(self, *names):
+        """
+        Drop the named datasets (all of them when no name is given) after a
+        write. Inside an open transaction nothing is dropped yet: the commit
+        bumps the tables' change counters, which drops them on the next read,
+        and a rollback leaves them valid.
+        """
+        with database.get_connection() as conn:
+            if conn.in_transaction:
+                return
+        self._drop(names or None)
+
+    def stats(self):
+        """Return a snapshot of the hit/miss counters."""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["cached_datasets"] = sorted(self._entries)
+        return stats
+
+    def close(self):
+        """Close the data_version connection and empty the cache."""
+        with self._lock:
+            if self._watch_conn is not None:
+                self._watch_conn.close()
+            self._watch_conn = None
+            self._watch_path = None
+            self._data_version = None
+            self._table_versions = None
+            self._entries.clear()
+
+    def _drop(self, names=None):
+        """Drop the named datasets, or all of them when names is None."""
+        with self._lock:
+            for name in list(self._entries) if names is None else names:
+                if self._entries.pop(name, None) is not None:
+                    self._stats["invalidations"] += 1
+
+    def _entry(self, name):
+        with self._lock:
+            self._check_versions()
+            entry = self._entries.get(name)
+            if entry is not None:
+                self._stats["hits"] += 1
+                return entry
+            self._stats["misses"] += 1
+
+            loader, key = self._loaders[name]
+            with database.get_connection() as conn:
+                # Rows read inside an open transaction may still be rolled back
+                cacheable = not conn.in_transaction
+                rows = loader()
+            if isinstance(rows, dict):
+                entry = (rows, rows)
+            else:
+                entry = (rows, {key(row): row for row in rows} if key else {})
+            if cacheable:
+                self._entries[name] = entry
+            return entry
+
+    def _check_versions(self):
+        """Drop the datasets whose tables were changed by a commit on any connection."""
+        db_path = database.pool.db_path
+        if self._watch_path != db_path:
+            self.close()
+            self._watch_conn = sqlite3.connect(db_path, check_same_thread=False)
+            self._watch_path = db_path
+        version = self._watch_conn.execute("PRAGMA data_version").fetchone()[0]
+        if version == self._data_version:
+            return
+        self._data_version = version
+        try:
+            tables = dict(self._watch_conn.execute("SELECT name, version FROM table_versions"))
+        except sqlite3.OperationalError:
+            tables = None  # schema without change counters: assume every table changed
+        if tables is None or self._table_versions is None:
+            self._drop()
+        else:
+            changed = {table for table in tables.keys() | self._table_versions.keys()
+                       if tables.get(table) != self._table_versions.get(table)}
+            self._drop([name for name in self._entries
+                        if not self._tables.get(name) or self._tables[name] & changed])
+        self._table_versions = tables
+
+
+repository_cache = RepositoryCache()
@@ -0,0 +1,267 @@
+import io
+import os
+from datetime import datetime
+
+from reportlab.lib.pagesizes import A4
+
+from config.settings import Settings
+from controllers.customer_controller import CustomerController
+from controllers.report_controller import ReportController
+from services.batch_export import BatchPDFExporter, use_database
+from services.pdf_service import PDFService
+
+
+class StatementService(PDFService):
+    """
+    Customer statement of account: every invoice, payment and credit note in a
+    period with a running balance, after the balance brought in from earlier.
+
+    Documents are read from the cursor and laid out page by page, so memory
+    use does not depend on how many invoices the customer has. Continuation
+    pages open with the balance brought forward; the totals and closing
+    balance are printed on the last page only.
+    """
+
+    ROWS_PER_PAGE = 24
+    ROW_HEIGHT = 18
+    TEMPLATE_FORM = "StatementTemplate"
+
+    def generate_statement_pdf(self, customer, start_date, end_date, company=None):
+        """Render a customer's statement into output_dir; returns the path."""
+        pdf_path = os.path.join(self.output_dir, self.statement_filename(customer, start_date, end_date))
+        self.render_statement(customer, start_date, end_date, pdf_path, company)
+        return pdf_path
+
+    @staticmethod
+    def statement_filename(customer, start_date, end_date):
+        """e.g. Statement_12_Shrestha_Traders_2025-07-17_2026-07-16.pdf."""
+        safe_name = "".join(ch if ch.isalnum() else "_" for ch in customer[1]).strip("_")
+        return f"Statement_{customer[0]}_{safe_name}_{start_date}_{end_date}.pdf"
+
+    def render_statement(self, customer, start_date, end_date, target, company=None):
+        """
+        Draw the statement for a customers-table row onto target (a path or a
+        binary file object). `company` is PDFService.company_fields() output.
+        """
+        name, pan = customer[1], customer[2] or ""
+        opening = ReportController.get_statement_opening_balance(name, pan, start_date)
+        documents = ReportController.iter_statement_documents(name, pan, start_date, end_date)
+        totals = {"debit": 0.0, "credit": 0.0, "balance": opening}
+        width, height = A4
+        context = {
+            "customer": customer,
+            "company": company or {},
+            "period": (start_date, end_date),
+            "width": width,
+            "height": height,
+        }
+        with self._open_canvas(target) as c:
+            self._draw_statement_pages(c, height - 50, context,
+                                       self._statement_lines(documents, opening, start_date, totals), totals)
+
+    @staticmethod
+    def _statement_lines(documents, opening, start_date, totals):
+        """
+        Turn document rows into statement lines (date, reference, particulars,
+        debit, credit, balance), keeping the running totals in `totals`.
+        """
+        yield (start_date, "", "Opening balance", None, None, opening)
+        for date, number, is_credit_note, status, total, paid in documents:
+            if is_credit_note:
+                entries = [("Credit note", 0.0, -total)]
+            else:
+                particulars = "Sales invoice (cancelled)" if status == "CANCELLED" else "Sales invoice"
+                entries = [(particulars, total, 0.0)]
+                if paid > 0:
+                    entries.append(("Payment received", 0.0, paid))
+            for particulars, debit, credit in entries:
+                totals["debit"] += debit
+                totals["credit"] += credit
+                totals["balance"] += debit - credit
+                yield (date, number, particulars, debit or None, credit or None, totals["balance"])
+
+    def _draw_statement_pages(self, c, start_y, context, lines, totals):
+        self._define_template(c, self.TEMPLATE_FORM, self._draw_statement_template, start_y, context)
+        L = self._statement_layout(context["width"], start_y)
+        balance = None
+        for page_no, (rows, is_last) in enumerate(self._paginate(lines), 1):
+            if page_no > 1:
+                c.showPage()
+            c.doForm(self.TEMPLATE_FORM)
+            y = L["y_rows_top"]
+            if page_no > 1:
+                y -= self.ROW_HEIGHT
+                self._draw_statement_row(c, L, y, ("", "", "Brought forward", None, None, balance), italic=True)
+            for row in rows:
+                y -= self.ROW_HEIGHT
+                self._draw_statement_row(c, L, y, row)
+                balance = row[5]
+
+            c.setFont("Helvetica", 8.5)
+            c.drawCentredString(context["width"] / 2, 30, f"Page {page_no}")
+            if not is_last:
+                c.setFont("Helvetica-Oblique", 9)
+                c.drawRightString(L["RIGHT"], L["table_bottom"] - 16,
+                                  f"Carried forward: {self._balance_text(balance)}")
+        self._draw_statement_summary(c, L, totals)
+
+    def _draw_statement_row(self, c, L, y, row, italic=False):
+        date, reference, particulars, debit, credit, balance = row
+        c.setFont("Helvetica-Oblique" if italic else "Helvetica", 9)
+        c.drawString(L["X_DATE"] + 4, y, str(date or ""))
+        c.drawString(L["X_REF"] + 4, y, str(reference or ""))
+        c.drawString(L["X_PART"] + 4, y, particulars)
+        if debit:
+            c.drawRightString(L["X_CREDIT"] - 4, y, f"{debit:,.2f}")
+        if credit:
+            c.drawRightString(L["X_BALANCE"] - 4, y, f"{credit:,.2f}")
+        c.drawRightString(L["RIGHT"] - 4, y, self._balance_text(balance))
+        c.setStrokeColorRGB(0.85, 0.85, 0.85)
+        c.setLineWidth(0.5)
+        c.line(L["LEFT"], y - 6, L["RIGHT"], y - 6)
+        c.setStrokeColorRGB(0, 0, 0)
+
+    def _draw_statement_summary(self, c, L, totals):
+        """Totals and closing balance under the table of the last page."""
+        x = L["RIGHT"] - 220
+        y = L["table_bottom"] - 22
+        c.setLineWidth(1)
+        c.rect(x, y - 48, 220, 62)
+        rows = [("Total debits", f"{totals['debit']:,.2f}"),
+                ("Total credits", f"{totals['credit']:,.2f}"),
+                ("Closing balance", self._balance_text(totals["balance"]))]
+        for label, value in rows:
+            bold = label == "Closing balance"
+            c.setFont("Helvetica-Bold" if bold else "Helvetica", 10 if bold else 9.5)
+            c.drawString(x + 10, y, label)
+            c.drawRightString(L["RIGHT"] - 10, y, value)
+            y -= 20
+
+    @staticmethod
+    def _balance_text(balance):
+        """Balances read as owed by the customer (Dr) or owed to them (Cr)."""
+        balance = balance or 0.0
+        if abs(balance) < 0.005:
+            return "0.00"
+        return f"{abs(balance):,.2f} {'Dr' if balance > 0 else 'Cr'}"
+
+    @classmethod
+    def _statement_layout(cls, width, start_y):
+        LEFT = 50
+        RIGHT = width - 50
+        y_header = start_y - 205
+        y_rows_top = y_header - 8
+        return {
+            "LEFT": LEFT, "RIGHT": RIGHT,
+            "X_DATE": LEFT, "X_REF": LEFT + 62, "X_PART": LEFT + 172,
+            "X_DEBIT": LEFT + 295, "X_CREDIT": LEFT + 360, "X_BALANCE": LEFT + 425,
+            "y_company": start_y - 52,
+            "y_customer": start_y - 130,
+            "y_header": y_header,
+            "y_rows_top": y_rows_top,
+            "table_bottom": y_rows_top - cls.ROW_HEIGHT * cls.ROWS_PER_PAGE - 8,
+        }
+
+    def _draw_statement_template(self, c, start_y, context):
+        """Letterhead, customer block and table frame, the same on every page."""
+        L = self._statement_layout(context["width"], start_y)
+        LEFT, RIGHT = L["LEFT"], L["RIGHT"]
+        company = context["company"]
+        customer = context["customer"]
+
+        logo = self._logo(self.PROFILES[self.profile]["jpeg_logo"])
+        if logo is not None:
+            c.drawImage(logo, LEFT, start_y - 10, width=125, height=42, preserveAspectRatio=True)
+        c.setFont("Helvetica-Bold", 20)
+        c.setFillColorRGB(0.1, 0.1, 0.1)
+        c.drawRightString(RIGHT, start_y, "STATEMENT OF ACCOUNT")
+
+        y = L["y_company"]
+        c.setFillColorRGB(0, 0, 0)
+        c.setFont("Helvetica-Bold", 14)
+        c.drawString(LEFT, y, company.get("company_name", Settings.COMPANY_NAME).upper())
+        c.setFont("Helvetica", 10)
+        c.drawString(LEFT, y - 15, company.get("company_address", Settings.COMPANY_ADDRESS))
+        c.setFont("Helvetica-Bold", 8.5)
+        c.drawString(LEFT, y - 29, f"VAT/PAN: {company.get('company_pan', Settings.COMPANY_PAN)}")
+        c.setStrokeColorRGB(0.75, 0.75, 0.75)
+        c.setLineWidth(0.8)
+        c.line(LEFT, y - 38, RIGHT, y - 38)
+
+        # Customer on the left, period on the right
+        y = L["y_customer"]
+        c.setFont("Helvetica-Bold", 9)
+        c.setFillColorRGB(0.4, 0.4, 0.4)
+        c.drawString(LEFT, y + 14, "STATEMENT FOR")
+        c.drawRightString(RIGHT, y + 14, "PERIOD")
+        c.setFillColorRGB(0, 0, 0)
+        c.setFont("Helvetica-Bold", 11)
+        c.drawString(LEFT, y, str(customer[1]).upper())
+        c.setFont("Helvetica", 10)
+        start_date, end_date = context["period"]
+        c.drawRightString(RIGHT, y, f"{start_date} to {end_date}")
+        details = [customer[3] or "", f"VAT/PAN: {customer[2]}" if customer[2] else "",
+                   f"Mobile: {customer[5]}" if customer[5] else ""]
+        for offset, text in enumerate(line for line in details if line):
+            c.drawString(LEFT, y - 15 * (offset + 1), text)
+        c.setFont("Helvetica", 9)
+        c.drawRightString(RIGHT, y - 15, f"Printed on {datetime.now().strftime('%d/%m/%Y')}")
+
+        # Table header band and frame
+        y = L["y_header"]
+        c.setFillColorRGB(0.12, 0.12, 0.12)
+        c.rect(LEFT, y - 5, RIGHT - LEFT, 20, fill=1, stroke=0)
+        c.setFillColorRGB(1, 1, 1)
+        c.setFont("Helvetica-Bold", 9)
+        c.drawString(L["X_DATE"] + 4, y + 1, "DATE")
+        c.drawString(L["X_REF"] + 4, y + 1, "DOCUMENT")
+        c.drawString(L["X_PART"] + 4, y + 1, "PARTICULARS")
+        c.drawRightString(L["X_CREDIT"] - 4, y + 1, "DEBIT")
+        c.drawRightString(L["X_BALANCE"] - 4, y + 1, "CREDIT")
+        c.drawRightString(RIGHT - 4, y + 1, "BALANCE")
+        c.setFillColorRGB(0, 0, 0)
+
+        c.setLineWidth(1)
+        c.rect(LEFT, L["table_bottom"], RIGHT - LEFT, y - 5 - L["table_bottom"])
+        c.setLineWidth(0.5)
+        for x in (L["X_REF"], L["X_PART"], L["X_DEBIT"], L["X_CREDIT"], L["X_BALANCE"]):
+            c.line(x, y - 5, x, L["table_bottom"])
+
+
+class StatementExporter(BatchPDFExporter):
+    """Statements for every customer, rendered in parallel like invoice exports."""
+
+    def export(self, destination, start_date, end_date, as_zip=False, progress=None):
+        """
+        Write one statement per customer to `destination` (a folder, or a .zip
+        path when as_zip is set). Returns the number of PDFs written.
+        """
+        customer_ids = [row[0] for row in CustomerController.get_all_customers()]
+        if progress:
+            progress(0, len(customer_ids))
+        if not customer_ids:
+            return 0
+        return self._run(destination, as_zip, len(customer_ids), iter(customer_ids),
+                         _render_statement_chunk, (start_date, end_date), progress)
+
+
+def _render_statement_chunk(customer_ids, company, as_zip, output_dir, db_path, profile,
+                            start_date, end_date):
+    """Render statements for a chunk of customers in a worker process."""
+    use_database(db_path)
+    service = StatementService(output_dir=output_dir, profile=profile)
+    results = []
+    for customer_id in customer_ids:
+        customer = CustomerController.get_customer_by_id(customer_id)
+        if customer is None:
+            continue
+        filename = service.statement_filename(customer, start_date, end_date)
+        if as_zip:
+            buffer = io.BytesIO()
+            service.render_statement(customer, start_date, end_date, buffer, company)
+            results.append((filename, buffer.getvalue()))
+        else:
+            service.render_statement(customer, start_date, end_date,
+                                     os.path.join(output_dir, filename), company)
+            results.append((filename, None))
+    return results
@@ -0,0 +1,82 @@
+"""
+Benchmark: per-invoice PDF render time and file size, for each output profile.
+
+    python tests/bench_pdf_render.py [renders] [items]
+
+Run it on two checkouts to compare before/after numbers.
+"""
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.pdf_service import PDFService
+
+
+def sample_invoice(n, item_count):
+    invoice_data = {
+        "invoice_number": f"MU/2082/2083/{n:04d}",
+        "date": "2025-08-01",
+        "client_name": f"Client {n}",
+        "client_contact": "9800000000",
+        "address": "Golbazar-4, Siraha",
+        "pan_no": "609764022",
+        "vat_rate": 13,
+        "discount": 5,
+        "paid_amount": 1000,
+        "status": "ACTIVE",
+    }
+    items = [{
+        "product_name": f"Engine Oil 20W-50 {i}L",
+        "hs_code": "27101980",
+        "quantity": i + 1,
+        "unit": "Ltr",
+        "price_per_unit": 650.0,
+        "total_price": 650.0 * (i + 1),
+    } for i in range(item_count)]
+    return invoice_data, items
+
+
+def bench_profile(profile, renders, item_count, out_dir):
+    service = PDFService(output_dir=out_dir, profile=profile)
+    service.render_invoice(*sample_invoice(0, item_count), os.path.join(out_dir, "warmup.pdf"))
+
+    timings, sizes = [], []
+    for n in range(1, renders + 1):
+        invoice_data, items = sample_invoice(n, item_count)
+        path = os.path.join(out_dir, service.pdf_filename(invoice_data))
+        # render_invoice, not generate_invoice_pdf: measure rendering, not the PDF cache
+        start = time.perf_counter()
+        service.render_invoice(invoice_data, items, path)
+        timings.append(time.perf_counter() - start)
+        sizes.append(os.path.getsize(path))
+
+    print(f"[{profile}]")
+    print(f"  mean render time: {statistics.mean(timings) * 1000:.2f} ms/invoice")
+    print(f"  p95 render time:  {sorted(timings)[int(len(timings) * 0.95) - 1] * 1000:.2f} ms")
+    print(f"  throughput:       {renders / sum(timings):.0f} invoices/s")
+    print(f"  mean file size:   {statistics.mean(sizes):,.0f} bytes/invoice")
+    return statistics.mean(sizes)
+
+
+def main():
+    renders = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    item_count = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+    print(f"renders: {renders} per profile ({item_count} items each)")
+    sizes = {}
+    for profile in PDFService.PROFILES:
+        out_dir = tempfile.mkdtemp()
+        try:
+            sizes[profile] = bench_profile(profile, renders, item_count, out_dir)
+        finally:
+            shutil.rmtree(out_dir, ignore_errors=True)
+    if "compact" in sizes:
+        print(f"compact/default size: {sizes['compact'] / sizes['default']:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import database
+from controllers.invoice_controller import InvoiceController
+from controllers.product_controller import ProductController
+
+
+class DatabaseTestCase(unittest.TestCase):
+    """
+    Runs every test against a fresh database file in a temporary directory,
+    swapped in as the application's connection pool and restored afterwards.
+    Subclasses extend setUp/tearDown and call super() first/last.
+    """
+
+    DB_NAME = "test.db"
+    CREATE_TABLES = True
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.tmp_dir, self.DB_NAME)
+        self.original_pool = database.pool
+        database.pool = database.ConnectionPool(self.db_path)
+        if self.CREATE_TABLES:
+            database.create_tables()
+
+    def tearDown(self):
+        database.close_reporting_connections()
+        database.pool.close_all()
+        database.pool = self.original_pool
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+
+class SalesTestCase(DatabaseTestCase):
+    """A database with one product, for tests that issue invoices dated today."""
+
+    FISCAL_YEAR = "2082/2083"
+
+    def setUp(self):
+        super().setUp()
+        ProductController.add_product("Engine Oil", 100, "2710", stock_quantity=100)
+        self.items = [{"product_id": ProductController.get_all_products()[0][0],
+                       "quantity": 2, "price_per_unit": 100}]
+        self.today = datetime.now().strftime("%Y-%m-%d")
+
+    def create_invoices(self, count, vat_rate=13, discount=0, client="Shrestha Traders"):
+        """Issue `count` invoices of two items at 100 (200 before discount and VAT)."""
+        return [InvoiceController.create_invoice(None, client, "", "", "", self.items, vat_rate, discount, 0,
+                                                 fiscal_year=self.FISCAL_YEAR)
+                for _ in range(count)]
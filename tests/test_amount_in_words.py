@@ -0,0 +1,44 @@
+import os
+import random
+import sys
+import unittest
+from decimal import Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.amount_in_words import amount_in_words, number_to_words
+
+try:
+    import num2words
+except ImportError:
+    num2words = None
+
+
+def reference(value):
+    return num2words.num2words(value, lang="en_IN").title()
+
+
+@unittest.skipIf(num2words is None, "num2words is not installed")
+class TestAmountInWords(unittest.TestCase):
+    def test_matches_num2words(self):
+        rng = random.Random(2082)
+        values = list(range(0, 20001))
+        # Every power of ten and its neighbours, then random values up to 999 crore
+        values += [10 ** k + d for k in range(2, 10) for d in (-1, 0, 1, 100, 1000, 100000)]
+        values += [rng.randrange(10 ** 10) for _ in range(20000)]
+        for value in values:
+            self.assertEqual(number_to_words(value), reference(value), value)
+
+    def test_rupees_and_paisa(self):
+        for total in (0, 0.5, 12.05, 508.5, -508.5, 226776.88, "1234.567", 99.999):
+            amount = Decimal(str(total)).quantize(Decimal("0.01"))
+            rupees = int(amount)
+            paisa = int((amount - rupees) * 100)
+            expected = f"{reference(rupees)} Rupees"
+            if paisa > 0:
+                expected += f" And {reference(paisa)} Paisa"
+            self.assertEqual(amount_in_words(total), expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
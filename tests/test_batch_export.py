@@ -0,0 +1,56 @@
+import os
+import sys
+import unittest
+import zipfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from controllers.invoice_controller import InvoiceController
+from controllers.product_controller import ProductController
+from services.batch_export import BatchPDFExporter
+from tests.db_test_case import DatabaseTestCase
+
+FISCAL_YEAR = "2082/2083"
+
+
+class TestBatchExport(DatabaseTestCase):
+    DB_NAME = "export.db"
+
+    def setUp(self):
+        super().setUp()
+        ProductController.add_product("Engine Oil", 500, "2710", stock_quantity=100)
+        product_id = ProductController.get_all_products()[0][0]
+        items = [{"product_id": product_id, "quantity": 2, "price_per_unit": 500}]
+        ids = [InvoiceController.create_invoice(None, f"Client {n}", "", "", "", items, 13, 0, 0,
+                                                fiscal_year=FISCAL_YEAR)
+               for n in range(5)]
+        InvoiceController.cancel_invoices(ids[:1], "Invoice issued by mistake", fiscal_year=FISCAL_YEAR)
+        InvoiceController.create_invoice(None, "Old Client", "", "", "", items, 13, 0, 0, fiscal_year="2081/2082")
+
+    def test_exports_fiscal_year_to_zip(self):
+        destination = os.path.join(self.tmp_dir, "invoices.zip")
+        updates = []
+
+        count = BatchPDFExporter(workers=2).export(destination, as_zip=True, fiscal_year=FISCAL_YEAR,
+                                                   progress=lambda done, total: updates.append((done, total)))
+
+        self.assertEqual(count, 6)
+        self.assertEqual(updates[0], (0, 6))
+        self.assertEqual(updates[-1], (6, 6))
+        with zipfile.ZipFile(destination) as archive:
+            names = sorted(archive.namelist())
+            self.assertIn("Invoice_CN_2082_2083_0001.pdf", names)
+            self.assertEqual(len(names), 6)
+            self.assertTrue(archive.read(names[0]).startswith(b"%PDF"))
+
+    def test_exports_files_to_folder(self):
+        destination = os.path.join(self.tmp_dir, "pdfs")
+
+        count = BatchPDFExporter(workers=1).export(destination, fiscal_year="2081/2082")
+
+        self.assertEqual(count, 1)
+        self.assertEqual(os.listdir(destination), ["Invoice_MU_2081_2082_0001.pdf"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+import json
+import os
+import sqlite3
+import sys
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import cli
+from controllers.invoice_controller import InvoiceController
+from controllers.product_controller import ProductController
+from tests.db_test_case import DatabaseTestCase
+
+
+class TestCli(DatabaseTestCase):
+    DB_NAME = "cli.db"
+
+    def setUp(self):
+        super().setUp()
+        ProductController.add_product("Engine Oil", 500, "2710", stock_quantity=100)
+        self.product_id = ProductController.get_all_products()[0][0]
+        env = mock.patch.dict(os.environ)
+        env.start()
+        self.addCleanup(env.stop)
+
+    def write_jsonl(self, records):
+        path = os.path.join(self.tmp_dir, "invoices.jsonl")
+        with open(path, "w", encoding="utf-8") as f:
+            f.writelines(json.dumps(record) + "\n" for record in records)
+        return path
+
+    def invoice(self, client, quantity=2):
+        return {"client_name": client, "items": [{"product_id": self.product_id, "quantity": quantity}]}
+
+    def test_create_writes_invoices_in_batches(self):
+        path = self.write_jsonl([self.invoice(f"Client {n}") for n in range(3)])
+
+        code = cli.main(["--db", self.db_path, "create", path, "--batch-size", "2",
+                         "--fiscal-year", "2082/2083"])
+
+        self.assertEqual(code, 0)
+        self.assertEqual(InvoiceController.count_invoices(), 3)
+        self.assertEqual(ProductController.get_product_by_id(self.product_id)[10], 94)
+        self.assertEqual(InvoiceController.get_invoice_number(1), "MU/2082/2083/0001")
+
+    def test_create_validates_every_line_before_writing(self):
+        path = self.write_jsonl([self.invoice("Good"), {"client_name": "Bad", "items": []},
+                                 self.invoice("Also good"), self.invoice("", quantity=1)])
+
+        with mock.patch("sys.stderr") as stderr:
+            code = cli.main(["--db", self.db_path, "create", path, "--batch-size", "1"])
+
+        self.assertEqual(code, 1)
+        errors = "".join(call.args[0] for call in stderr.write.call_args_list)
+        self.assertIn("line 2:", errors)
+        self.assertIn("line 4:", errors)
+        self.assertEqual(InvoiceController.count_invoices(), 0)
+        self.assertEqual(ProductController.get_product_by_id(self.product_id)[10], 100)
+
+    def test_batch_size_must_be_positive(self):
+        path = self.write_jsonl([self.invoice("Good")])
+        for size in ("0", "-3"):
+            with mock.patch("sys.stderr"), self.assertRaises(SystemExit):
+                cli.main(["--db", self.db_path, "create", path, "--batch-size", size])
+
+    def test_failed_batch_reports_its_first_line(self):
+        path = self.write_jsonl([self.invoice(f"Client {n}") for n in range(3)])
+        save = cli._save_batch
+        calls = []
+
+        def fail_second_batch(batch, fiscal_year):
+            calls.append(batch)
+            if len(calls) == 2:
+                raise sqlite3.OperationalError("database is locked")
+            return save(batch, fiscal_year)
+
+        with mock.patch("cli._save_batch", fail_second_batch), mock.patch("sys.stderr") as stderr:
+            code = cli.main(["--db", self.db_path, "create", path, "--batch-size", "2"])
+
+        self.assertEqual(code, 1)
+        self.assertIn("line 3:", "".join(call.args[0] for call in stderr.write.call_args_list))
+        self.assertEqual(InvoiceController.count_invoices(), 2)
+
+    def test_statements_passes_the_pdf_profile(self):
+        with mock.patch("services.statement_service.StatementExporter") as exporter:
+            exporter.return_value.export.return_value = 0
+            code = cli.main(["--db", self.db_path, "statements", self.tmp_dir,
+                             "--from", "2025-07-17", "--to", "2026-07-16", "--profile", "default"])
+
+        self.assertEqual(code, 0)
+        self.assertEqual(exporter.call_args.kwargs["profile"], "default")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,79 @@
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import threading
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import database
+
+
+class TestConnectionPool(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.pool = database.ConnectionPool(os.path.join(self.tmp_dir, "pool.db"))
+
+    def tearDown(self):
+        self.pool.close_all()
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_same_thread_reuses_one_connection(self):
+        with self.pool.connection() as first:
+            with self.pool.connection() as nested:
+                self.assertIs(first, nested)
+        with self.pool.connection() as again:
+            self.assertIs(first, again)
+
+        stats = self.pool.stats()
+        self.assertEqual(stats["connections_opened"], 1)
+        self.assertEqual(stats["borrows"], 3)
+        self.assertEqual(stats["reuses"], 2)
+
+    def test_each_thread_gets_its_own_connection(self):
+        seen = []
+
+        def worker():
+            with self.pool.connection() as conn:
+                seen.append(conn)
+
+        threads = [threading.Thread(target=worker) for _ in range(3)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(len({id(c) for c in seen}), 3)
+        self.assertEqual(self.pool.stats()["connections_opened"], 3)
+
+    def test_uncommitted_work_is_discarded_on_return(self):
+        with self.pool.connection() as conn:
+            conn.execute("CREATE TABLE t (x INTEGER)")
+            conn.commit()
+            conn.execute("INSERT INTO t VALUES (1)")
+
+        with self.pool.connection() as conn:
+            self.assertFalse(conn.in_transaction)
+            self.assertEqual(conn.execute("SELECT COUNT(*) FROM t").fetchone()[0], 0)
+
+    def test_reporting_connection_is_read_only_and_sees_commits(self):
+        with self.pool.connection() as conn:
+            conn.execute("CREATE TABLE t (x INTEGER)")
+            conn.execute("INSERT INTO t VALUES (1)")
+            conn.commit()
+
+        reporting = database.ConnectionPool(self.pool.db_path, read_only=True)
+        try:
+            with reporting.connection() as conn:
+                self.assertEqual(conn.execute("SELECT COUNT(*) FROM t").fetchone()[0], 1)
+                self.assertEqual(conn.execute("PRAGMA query_only").fetchone()[0], 1)
+                with self.assertRaises(sqlite3.OperationalError):
+                    conn.execute("INSERT INTO t VALUES (2)")
+        finally:
+            reporting.close_all()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,103 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import database
+from controllers.invoice_controller import InvoiceController
+from controllers.product_controller import ProductController
+from tests.db_test_case import DatabaseTestCase
+
+FISCAL_YEAR = "2082/2083"
+
+
+class TestInvoicePagination(DatabaseTestCase):
+    DB_NAME = "pages.db"
+
+    def setUp(self):
+        super().setUp()
+        ProductController.add_product("Engine Oil", 500, "2710", stock_quantity=1000)
+        product_id = ProductController.get_all_products()[0][0]
+        items = [{"product_id": product_id, "quantity": 1, "price_per_unit": 500}]
+        self.ids = [
+            InvoiceController.create_invoice(None, f"Client {n}", "", "", "", items, 13, 0, 0,
+                                             fiscal_year=FISCAL_YEAR)
+            for n in range(25)
+        ]
+
+    def test_pages_walk_every_invoice_newest_first(self):
+        seen, after_id = [], None
+        while True:
+            page = InvoiceController.get_invoices_page(after_id=after_id, limit=10)
+            if not page:
+                break
+            seen.extend(inv["invoice_id"] for inv in page)
+            after_id = page[-1]["invoice_id"]
+
+        self.assertEqual(seen, sorted(self.ids, reverse=True))
+
+    def test_filters(self):
+        credit_notes = InvoiceController.cancel_invoices(self.ids[:3], "Invoice issued by mistake",
+                                                        fiscal_year=FISCAL_YEAR)
+
+        cancelled = InvoiceController.get_invoices_page(status="CANCELLED")
+        self.assertEqual({inv["invoice_id"] for inv in cancelled}, set(self.ids[:3]))
+        notes = InvoiceController.get_invoices_page(is_credit_note=True, fiscal_year=FISCAL_YEAR)
+        self.assertEqual({inv["invoice_id"] for inv in notes}, set(credit_notes))
+        self.assertEqual(InvoiceController.get_invoices_page(fiscal_year="2070/2071"), [])
+        # Client 1, Client 10-19 and the credit note issued against Client 1
+        self.assertEqual(len(InvoiceController.get_invoices_page(search="Client 1")), 12)
+
+    def _page_and_plan(self, **filters):
+        """One page of get_invoices_page and the query plan of its list query."""
+        statements = []
+        with database.get_connection() as conn:
+            conn.set_trace_callback(statements.append)
+            try:
+                page = InvoiceController.get_invoices_page(**filters)
+            finally:
+                conn.set_trace_callback(None)
+            query = [sql for sql in statements if "ORDER BY" in sql][-1]
+            plan = [row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + query)]
+        return page, plan
+
+    def test_date_range_walks_the_primary_key_without_sorting(self):
+        with database.get_connection() as conn:
+            conn.execute("UPDATE Invoices SET date = '2025-07-20' WHERE invoice_id <= ?", (self.ids[9],))
+            conn.commit()
+
+        seen, after_id = [], None
+        while True:
+            page, plan = self._page_and_plan(after_id=after_id, limit=4, start_date="2025-07-01",
+                                             end_date="2025-07-31")
+            self.assertFalse([step for step in plan if "TEMP B-TREE" in step], plan)
+            self.assertFalse([step for step in plan if "idx_invoices_date" in step], plan)
+            if not page:
+                break
+            seen.extend(inv["invoice_id"] for inv in page)
+            after_id = page[-1]["invoice_id"]
+
+        self.assertEqual(seen, sorted(self.ids[:10], reverse=True))
+        self.assertEqual(InvoiceController.get_invoices_page(start_date="2030-01-01"), [])
+
+    def test_fiscal_year_filter_reads_its_index_in_id_order(self):
+        page, plan = self._page_and_plan(limit=5, fiscal_year=FISCAL_YEAR)
+
+        self.assertEqual([inv["invoice_id"] for inv in page], sorted(self.ids, reverse=True)[:5])
+        self.assertTrue([step for step in plan if "idx_invoices_fy_id" in step], plan)
+        self.assertFalse([step for step in plan if "TEMP B-TREE" in step], plan)
+
+    def test_search_matches_prefixes_and_follows_updates(self):
+        self.assertEqual([inv["invoice_id"] for inv in InvoiceController.search_invoices("MU/2082/2083/0003")],
+                         [self.ids[2]])
+        self.assertEqual(InvoiceController.search_invoices("cancel"), [])
+
+        InvoiceController.cancel_invoice(self.ids[2], "Invoice issued by mistake")
+
+        cancelled = InvoiceController.search_invoices("cli 2 cancel")
+        self.assertEqual([inv["invoice_id"] for inv in cancelled], [self.ids[2]])
+
+
+if __name__ == "__main__":
+    unittest.main()
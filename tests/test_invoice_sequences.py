@@ -0,0 +1,82 @@
+import multiprocessing
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import database
+from controllers.invoice_controller import InvoiceController
+from utils.invoice_utils import InvoiceUtils
+from tests.db_test_case import DatabaseTestCase
+
+FISCAL_YEAR = "2082/2083"
+WORKERS = 6
+INVOICES_PER_WORKER = 25
+
+
+def _use_database(db_path):
+    database.pool.close_all()
+    database.pool = database.ConnectionPool(db_path)
+
+
+def _issue_invoices(db_path, count, series):
+    """Worker process: save `count` invoices as fast as possible."""
+    _use_database(db_path)
+    numbers = []
+    for _ in range(count):
+        invoice_id = InvoiceController.create_invoice(
+            None, "Stress Client", "", "", "", [],
+            13, 0, 0, is_credit_note=(series == InvoiceController.SERIES_CREDIT_NOTE),
+            fiscal_year=FISCAL_YEAR
+        )
+        numbers.append(InvoiceController.get_invoice_number(invoice_id))
+    return numbers
+
+
+class TestInvoiceSequences(DatabaseTestCase):
+    DB_NAME = "sequences.db"
+
+    def _values(self, numbers, series):
+        parsed = [InvoiceUtils.parse_document_number(n) for n in numbers]
+        self.assertTrue(all(p[0] == series and p[1] == FISCAL_YEAR for p in parsed))
+        return sorted(p[2] for p in parsed)
+
+    def test_series_are_independent(self):
+        mu = _issue_invoices(self.db_path, 2, InvoiceController.SERIES_INVOICE)
+        cn = _issue_invoices(self.db_path, 1, InvoiceController.SERIES_CREDIT_NOTE)
+        mu += _issue_invoices(self.db_path, 1, InvoiceController.SERIES_INVOICE)
+        self.assertEqual(mu, ["MU/2082/2083/0001", "MU/2082/2083/0002", "MU/2082/2083/0003"])
+        self.assertEqual(cn, ["CN/2082/2083/0001"])
+        self.assertEqual(InvoiceController.get_next_invoice_number(FISCAL_YEAR), "MU/2082/2083/0004")
+
+    def test_migration_seeds_sequence_from_existing_invoices(self):
+        with database.get_connection() as conn:
+            conn.execute("DELETE FROM sequences")
+            conn.execute("INSERT INTO Invoices (invoice_number) VALUES ('MU/2082/2083/0041')")
+            conn.execute("PRAGMA user_version = 1")
+            conn.commit()
+        database.create_tables()
+        self.assertEqual(InvoiceController.get_next_invoice_number(FISCAL_YEAR), "MU/2082/2083/0042")
+
+    def test_concurrent_processes_get_gapless_unique_numbers(self):
+        ctx = multiprocessing.get_context("spawn")
+        jobs = [(self.db_path, INVOICES_PER_WORKER, series)
+                for series in (InvoiceController.SERIES_INVOICE, InvoiceController.SERIES_CREDIT_NOTE)
+                for _ in range(WORKERS // 2)]
+        with ctx.Pool(len(jobs)) as workers:
+            results = workers.starmap(_issue_invoices, jobs)
+
+        expected = list(range(1, (WORKERS // 2) * INVOICES_PER_WORKER + 1))
+        mu = [n for batch, job in zip(results, jobs) if job[2] == "MU" for n in batch]
+        cn = [n for batch, job in zip(results, jobs) if job[2] == "CN" for n in batch]
+        self.assertEqual(self._values(mu, "MU"), expected)
+        self.assertEqual(self._values(cn, "CN"), expected)
+
+        with database.get_connection() as conn:
+            stored = conn.execute("SELECT COUNT(DISTINCT invoice_number) FROM Invoices").fetchone()[0]
+        self.assertEqual(stored, len(mu) + len(cn))
+
+
+if __name__ == "__main__":
+    unittest.main()
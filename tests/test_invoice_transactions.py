@@ -0,0 +1,91 @@
+import os
+import sys
+import unittest
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import database
+from controllers.invoice_controller import InvoiceController
+from controllers.product_controller import ProductController
+from tests.db_test_case import DatabaseTestCase
+
+FISCAL_YEAR = "2082/2083"
+
+
+class TestInvoiceTransactions(DatabaseTestCase):
+    DB_NAME = "tx.db"
+
+    def setUp(self):
+        super().setUp()
+        ProductController.add_product("Engine Oil", 500, "2710", stock_quantity=40)
+        ProductController.add_product("Gear Oil", 300, "2710", stock_quantity=10)
+        self.oil, self.gear = [p[0] for p in ProductController.get_all_products()]
+
+    def _stock(self):
+        return {p[0]: p[10] for p in ProductController.get_all_products()}
+
+    def _items(self):
+        return [
+            {"product_id": self.oil, "quantity": 4, "price_per_unit": 500},
+            {"product_id": self.gear, "quantity": 2, "price_per_unit": 300},
+        ]
+
+    def _count(self, table):
+        with database.get_connection() as conn:
+            return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+    def test_save_invoice_writes_items_and_stock_together(self):
+        invoice_id, number = InvoiceController.save_invoice(
+            "Client", "", "", "", self._items(), 13, 0, 0, fiscal_year=FISCAL_YEAR)
+
+        self.assertEqual(number, "MU/2082/2083/0001")
+        data, items = InvoiceController.get_invoice_details(invoice_id)
+        self.assertAlmostEqual(data["total_amount"], 2600 * 1.13)
+        self.assertEqual(len(items), 2)
+        self.assertEqual(self._stock(), {self.oil: 36, self.gear: 8})
+
+    def test_failure_rolls_back_invoice_items_stock_and_number(self):
+        with patch.object(ProductController, "adjust_stock_bulk", side_effect=RuntimeError("disk full")):
+            with self.assertRaises(RuntimeError):
+                InvoiceController.save_invoice(
+                    "Client", "", "", "", self._items(), 13, 0, 0, fiscal_year=FISCAL_YEAR)
+
+        self.assertEqual(self._count("Invoices"), 0)
+        self.assertEqual(self._count("Invoice_Items"), 0)
+        self.assertEqual(self._stock(), {self.oil: 40, self.gear: 10})
+        self.assertEqual(InvoiceController.get_next_invoice_number(FISCAL_YEAR), "MU/2082/2083/0001")
+
+    def test_cancel_invoices_issues_credit_notes_and_restores_stock(self):
+        first, _ = InvoiceController.save_invoice(
+            "Client", "", "", "", self._items(), 13, 0, 0, fiscal_year=FISCAL_YEAR)
+        second, _ = InvoiceController.save_invoice(
+            "Client", "", "", "", self._items()[:1], 13, 0, 0, fiscal_year=FISCAL_YEAR)
+
+        credit_notes = InvoiceController.cancel_invoices(
+            [first, second], "Invoice issued by mistake", fiscal_year=FISCAL_YEAR)
+
+        self.assertEqual(self._stock(), {self.oil: 40, self.gear: 10})
+        data, items = InvoiceController.get_invoice_details(credit_notes[0])
+        self.assertEqual(data["invoice_number"], "CN/2082/2083/0001")
+        self.assertAlmostEqual(data["total_amount"], -2600 * 1.13)
+        self.assertEqual(sorted(item["quantity"] for item in items), [-4, -2])
+        self.assertEqual(InvoiceController.get_invoice_details(first)[0]["status"], "CANCELLED")
+
+    def test_cancel_invoices_is_all_or_nothing(self):
+        first, _ = InvoiceController.save_invoice(
+            "Client", "", "", "", self._items(), 13, 0, 0, fiscal_year=FISCAL_YEAR)
+        second, _ = InvoiceController.save_invoice(
+            "Client", "", "", "", self._items(), 13, 0, 0, fiscal_year=FISCAL_YEAR)
+        InvoiceController.cancel_invoice(second, "Customer returned goods")
+
+        with self.assertRaises(ValueError):
+            InvoiceController.cancel_invoices([first, second], "Invoice issued by mistake")
+
+        self.assertEqual(InvoiceController.get_invoice_details(first)[0]["status"], "ACTIVE")
+        self.assertEqual(self._count("Invoices"), 3)
+        self.assertEqual(self._stock(), {self.oil: 36, self.gear: 8})
+
+
+if __name__ == "__main__":
+    unittest.main()
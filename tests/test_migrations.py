@@ -0,0 +1,39 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import database
+from tests.db_test_case import DatabaseTestCase
+
+
+class TestSchemaMigrations(DatabaseTestCase):
+    DB_NAME = "schema.db"
+    CREATE_TABLES = False
+
+    def test_fresh_database_reaches_latest_version(self):
+        database.create_tables()
+        with database.get_connection() as conn:
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            indexes = {row[0] for row in conn.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'index'")}
+            settings = conn.execute("SELECT COUNT(*) FROM settings").fetchone()[0]
+        self.assertEqual(version, database.LATEST_SCHEMA_VERSION)
+        self.assertIn("idx_invoices_date", indexes)
+        self.assertIn("idx_invoice_items_invoice", indexes)
+        self.assertGreater(settings, 0)
+
+    def test_up_to_date_database_skips_migrations(self):
+        database.create_tables()
+        with database.get_connection() as conn:
+            conn.execute("DELETE FROM settings")
+            conn.commit()
+        database.create_tables()
+        with database.get_connection() as conn:
+            # Settings are only seeded by the baseline migration, not on every start
+            self.assertEqual(conn.execute("SELECT COUNT(*) FROM settings").fetchone()[0], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
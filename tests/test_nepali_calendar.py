@@ -0,0 +1,43 @@
+import os
+import sys
+import unittest
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import nepali_datetime
+
+from utils import nepali_calendar
+
+
+class TestNepaliCalendar(unittest.TestCase):
+    def test_matches_nepali_datetime_across_the_range(self):
+        day = nepali_calendar.FIRST_AD_DATE
+        while day <= nepali_calendar.LAST_AD_DATE:
+            expected = nepali_datetime.date.from_datetime_date(day)
+            self.assertEqual(nepali_calendar.to_bs(day), (expected.year, expected.month, expected.day))
+            self.assertEqual(nepali_calendar.to_ad(expected.year, expected.month, expected.day), day)
+            day += timedelta(days=37)
+
+    def test_fiscal_year_turns_over_on_shrawan_1(self):
+        self.assertEqual(nepali_calendar.format_bs("2025-07-17"), "2082-04-01")
+        self.assertEqual(nepali_calendar.fiscal_year("2025-07-16"), "2081/2082")
+        self.assertEqual(nepali_calendar.fiscal_year(date(2025, 7, 17)), "2082/2083")
+        self.assertEqual(nepali_calendar.fiscal_year_range("2082/2083"), (date(2025, 7, 17), date(2026, 7, 16)))
+
+    def test_month_boundaries(self):
+        start, end = nepali_calendar.month_range(2082, 4)
+        self.assertEqual(nepali_calendar.bs_month(start), "2082-04")
+        self.assertEqual(nepali_calendar.bs_month(start - timedelta(days=1)), "2082-03")
+        self.assertEqual((end - start).days + 1, nepali_calendar.days_in_month(2082, 4))
+        self.assertEqual(len(nepali_calendar.fiscal_year_months("2082/2083")), 12)
+
+    def test_out_of_range(self):
+        with self.assertRaises(ValueError):
+            nepali_calendar.to_bs(nepali_calendar.LAST_AD_DATE + timedelta(days=1))
+        with self.assertRaises(ValueError):
+            nepali_calendar.to_ad(2082, 13, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
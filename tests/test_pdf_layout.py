@@ -0,0 +1,86 @@
+import io
+import os
+import re
+import shutil
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.pdf_service import PDFService
+
+PAGE_OBJECT = re.compile(rb"/Type /Page\b(?!s)")
+
+
+def sample_items(count):
+    return [{"product_name": f"Engine Oil {n}", "hs_code": "2710", "quantity": 1,
+             "unit": "Ltr", "price_per_unit": 100, "total_price": 100}
+            for n in range(count)]
+
+
+class TestPdfLayout(unittest.TestCase):
+    def test_paginate_reserves_brought_forward_row(self):
+        pages = list(PDFService._paginate(sample_items(32)))
+        self.assertEqual([len(rows) for rows, _ in pages], [11, 10, 10, 1])
+        self.assertEqual([is_last for _, is_last in pages], [False, False, False, True])
+        self.assertEqual(list(PDFService._paginate([])), [([], True)])
+
+    def test_long_invoice_keeps_every_item(self):
+        invoice = {"invoice_number": "MU/2082/2083/0001", "client_name": "Client",
+                   "vat_rate": 13, "discount": 0, "paid_amount": 0, "status": "ACTIVE"}
+        buffer = io.BytesIO()
+        # A generator: items are consumed page by page
+        PDFService().render_invoice(invoice, (item for item in sample_items(40)), buffer)
+        self.assertEqual(len(PAGE_OBJECT.findall(buffer.getvalue())), 4)
+
+
+class TestPdfCache(unittest.TestCase):
+    def setUp(self):
+        self.out_dir = tempfile.mkdtemp()
+        PDFService.clear_cache()
+        self.invoice = {"invoice_number": "MU/2082/2083/0002", "client_name": "Client",
+                        "date": "2025-08-01", "vat_rate": 13, "discount": 0,
+                        "paid_amount": 0, "status": "ACTIVE"}
+
+    def tearDown(self):
+        PDFService.clear_cache()
+        shutil.rmtree(self.out_dir, ignore_errors=True)
+
+    def test_reprint_is_served_from_cache(self):
+        service = PDFService(output_dir=self.out_dir)
+        first = service.generate_invoice_pdf(self.invoice, sample_items(3))
+        with mock.patch.object(PDFService, "render_invoice") as render:
+            self.assertEqual(service.generate_invoice_pdf(self.invoice, sample_items(3)), first)
+            # After the memory cache is gone the disk cache still answers
+            PDFService.clear_cache()
+            service.get_invoice_pdf_bytes(self.invoice, sample_items(3))
+        render.assert_not_called()
+
+    def test_status_change_gives_new_key(self):
+        items = sample_items(3)
+        service = PDFService(output_dir=self.out_dir)
+        key = service.cache_key(self.invoice, items)
+        self.assertEqual(service.cache_key(dict(self.invoice), items), key)
+        self.assertNotEqual(service.cache_key(dict(self.invoice, status="CANCELLED"), items), key)
+        compact = PDFService(output_dir=self.out_dir, profile="compact")
+        self.assertNotEqual(compact.cache_key(self.invoice, items), key)
+
+
+    def test_disk_cache_is_scanned_only_when_pruning(self):
+        service = PDFService(output_dir=self.out_dir)
+        with mock.patch.object(PDFService, "DISK_CACHE_SIZE", 5), \
+                mock.patch.object(PDFService, "DISK_CACHE_PRUNE_BATCH", 2), \
+                mock.patch("services.pdf_service.os.scandir", wraps=os.scandir) as scandir:
+            for n in range(12):
+                service.store_pdf_bytes(f"key{n:02d}", b"%PDF-1.4")
+
+        # One count on the first store, then a prune (to 3 files) on the 6th, 9th and 12th
+        self.assertEqual(scandir.call_count, 4)
+        self.assertEqual(len([name for name in os.listdir(service.cache_dir) if name.endswith(".pdf")]), 3)
+        self.assertFalse([name for name in os.listdir(service.cache_dir) if name.endswith(".tmp")])
+
+
+if __name__ == "__main__":
+    unittest.main()
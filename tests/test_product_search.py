@@ -0,0 +1,48 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from controllers.product_controller import ProductController
+from tests.db_test_case import DatabaseTestCase
+
+
+class TestProductSearch(DatabaseTestCase):
+    DB_NAME = "products.db"
+
+    def setUp(self):
+        super().setUp()
+        ProductController.add_product("Servo Pride 15W-40", 650, "27101980", category="Engine Oil",
+                                      brand="Servo", viscosity="15W-40")
+        ProductController.add_product("Castrol GTX", 700, "27101980", category="Engine Oil",
+                                      brand="Castrol", viscosity="20W-50")
+        ProductController.add_product("Gear Oil EP 90", 400, "27101990", category="Gear Oil",
+                                      brand="Servo", viscosity="90")
+        self.ids = {p[1]: p[0] for p in ProductController.get_all_products()}
+
+    def _names(self, keyword):
+        return [p[1] for p in ProductController.search_products(keyword)]
+
+    def test_substring_search_is_ranked_by_name(self):
+        # Both are Servo-branded, but only one has "Servo" in its name
+        self.assertEqual(self._names("servo"), ["Servo Pride 15W-40", "Gear Oil EP 90"])
+        self.assertEqual(self._names("W-4"), ["Servo Pride 15W-40"])
+        self.assertEqual(self._names("9019"), [])
+        self.assertEqual(self._names("1990"), ["Gear Oil EP 90"])
+
+    def test_short_words_and_updates(self):
+        self.assertEqual(self._names("engine 20"), ["Castrol GTX"])
+        self.assertEqual(len(ProductController.search_product_ids("", limit=2)), 2)
+
+        ProductController.update_product(self.ids["Castrol GTX"], "Castrol Magnatec", 750, "27101980",
+                                         category="Engine Oil", brand="Castrol", viscosity="10W-40")
+        self.assertEqual(self._names("gtx"), [])
+        self.assertEqual(self._names("magna"), ["Castrol Magnatec"])
+
+        ProductController.delete_product(self.ids["Gear Oil EP 90"])
+        self.assertEqual(self._names("servo"), ["Servo Pride 15W-40"])
+
+
+if __name__ == "__main__":
+    unittest.main()
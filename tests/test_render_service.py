@@ -0,0 +1,81 @@
+import os
+import shutil
+import sys
+import tempfile
+import subprocess
+import time
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.pdf_service import PDFService
+from services.render_service import PRIORITY_BATCH, PRIORITY_INTERACTIVE, RenderQueueFull, RenderService
+
+
+class TestRenderService(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.service = RenderService(workers=1)
+        cls.service.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.service.shutdown()
+
+    def test_interactive_jobs_overtake_batch_jobs(self):
+        order = []
+        busy = self.service.submit(time.sleep, 0.5)
+        batch = self.service.submit(abs, -1, priority=PRIORITY_BATCH)
+        cancelled = self.service.submit(abs, -2, priority=PRIORITY_BATCH)
+        interactive = self.service.submit(abs, -3, priority=PRIORITY_INTERACTIVE)
+        for future, name in ((batch, "batch"), (interactive, "interactive")):
+            future.add_done_callback(lambda _, name=name: order.append(name))
+
+        self.assertTrue(cancelled.cancel())
+        self.assertEqual(batch.result(timeout=30), 1)
+        busy.result()
+        self.assertEqual(order, ["interactive", "batch"])
+        self.assertEqual(interactive.result(), 3)
+
+    def test_render_invoice_saves_pdf_and_reprints_from_cache(self):
+        out_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, out_dir, True)
+        self.addCleanup(PDFService.clear_cache)
+        invoice = {"invoice_number": "MU/2082/2083/0003", "client_name": "Client",
+                   "date": "2025-08-01", "status": "ACTIVE"}
+        items = [{"product_name": "Engine Oil", "quantity": 2, "price_per_unit": 500, "total_price": 1000}]
+
+        path = self.service.render_invoice(invoice, items, output_dir=out_dir).result(timeout=60)
+        with open(path, "rb") as f:
+            self.assertTrue(f.read().startswith(b"%PDF"))
+
+        reprint = self.service.render_invoice(invoice, items, output_dir=out_dir)
+        self.assertTrue(reprint.done())
+        self.assertEqual(reprint.result(), path)
+
+
+    def test_main_module_imports_no_gui(self):
+        # Spawned workers re-import __main__, i.e. main.py when the app runs
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        check = "import sys, main; print(sorted(m for m in ('tkinter', 'views') if m in sys.modules))"
+        result = subprocess.run([sys.executable, "-c", check], cwd=root, capture_output=True, text=True, timeout=60)
+        self.assertEqual(result.stdout.strip(), "[]", result.stderr)
+
+    def test_full_queue_rejects_instead_of_blocking(self):
+        with mock.patch("services.render_service.MAX_QUEUED_JOBS", 1):
+            service = RenderService(workers=1)
+        self.addCleanup(service.shutdown)
+        busy = service.submit(time.sleep, 0.5)
+        while not (busy.running() or busy.done()):
+            time.sleep(0.01)
+
+        queued = service.submit(os.getpid)
+        overflow = service.submit(os.getpid)
+
+        self.assertTrue(overflow.done())
+        self.assertIsInstance(overflow.exception(), RenderQueueFull)
+        self.assertNotEqual(queued.result(timeout=30), os.getpid())
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+import os
+import sqlite3
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.database import transaction
+from controllers.audit_controller import AuditLogger
+from controllers.customer_controller import CustomerController
+from controllers.product_controller import ProductController
+from controllers.settings_controller import SettingsController
+from services.repository_cache import repository_cache
+from tests.db_test_case import DatabaseTestCase
+
+
+class TestRepositoryCache(DatabaseTestCase):
+    DB_NAME = "cache.db"
+
+    def setUp(self):
+        super().setUp()
+        ProductController.add_product("Engine Oil", 500, "2710", stock_quantity=40)
+        self.product_id = ProductController.get_all_products()[0][0]
+
+    def tearDown(self):
+        repository_cache.close()
+        super().tearDown()
+
+    def test_reads_are_served_from_cache_until_a_write(self):
+        ProductController.get_all_products()
+        before = repository_cache.stats()
+        self.assertEqual(ProductController.get_product_by_id(self.product_id)[1], "Engine Oil")
+        self.assertEqual(repository_cache.stats()["hits"], before["hits"] + 1)
+
+        ProductController.adjust_stock(self.product_id, -5)
+        self.assertEqual(ProductController.get_product_by_id(self.product_id)[10], 35)
+
+        customer_id = CustomerController.add_customer("Ram Traders", "123", "", "", "", "")
+        self.assertEqual(CustomerController.get_customer_by_id(customer_id)[1], "Ram Traders")
+
+        SettingsController.save_settings({"company_name": "Moonal"})
+        self.assertEqual(SettingsController.get_setting("company_name"), "Moonal")
+
+    def test_commits_from_another_connection_invalidate(self):
+        ProductController.get_all_products()
+        # Simulates another process sharing the database file
+        other = sqlite3.connect(self.db_path)
+        other.execute("UPDATE Products SET name = 'Gear Oil' WHERE product_id = ?", (self.product_id,))
+        other.commit()
+        other.close()
+
+        self.assertEqual(ProductController.get_product_by_id(self.product_id)[1], "Gear Oil")
+
+
+    def test_commits_to_other_tables_keep_the_cache(self):
+        ProductController.get_all_products()
+        CustomerController.get_all_customers()
+        misses = repository_cache.stats()["misses"]
+
+        AuditLogger.log_action("LOGIN", "admin")
+        CustomerController.add_customer("Ram Traders", "123", "", "", "", "")
+
+        ProductController.get_all_products()
+        self.assertEqual(repository_cache.stats()["misses"], misses)
+        self.assertEqual(CustomerController.get_all_customers()[0][1], "Ram Traders")
+
+    def test_writes_inside_a_transaction_invalidate_on_commit(self):
+        ProductController.get_all_products()
+
+        with transaction():
+            ProductController.adjust_stock_bulk([(self.product_id, -5)])
+            self.assertIn("products", repository_cache.stats()["cached_datasets"])
+        self.assertEqual(ProductController.get_product_by_id(self.product_id)[10], 35)
+
+        with self.assertRaises(RuntimeError):
+            with transaction():
+                ProductController.adjust_stock_bulk([(self.product_id, -5)])
+                raise RuntimeError("sale abandoned")
+        self.assertEqual(ProductController.get_product_by_id(self.product_id)[10], 35)
+        self.assertIn("products", repository_cache.stats()["cached_datasets"])
+
+
+if __name__ == "__main__":
+    unittest.main()
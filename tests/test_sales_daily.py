@@ -0,0 +1,99 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import database
+from controllers.invoice_controller import InvoiceController
+from controllers.report_controller import ReportController
+from utils import nepali_calendar
+from utils.invoice_utils import InvoiceUtils
+from tests.db_test_case import SalesTestCase
+
+FISCAL_YEAR = SalesTestCase.FISCAL_YEAR
+
+
+class TestSalesDaily(SalesTestCase):
+    DB_NAME = "sales.db"
+
+    def _rollup(self):
+        with database.get_connection() as conn:
+            return [tuple(row) for row in conn.execute("SELECT * FROM sales_daily ORDER BY date, fiscal_year")]
+
+    def test_rollup_tracks_invoices_and_cancellations(self):
+        ids = self.create_invoices(3)
+        InvoiceController.cancel_invoices(ids[:1], "Wrong customer", fiscal_year=FISCAL_YEAR)
+
+        summary = ReportController.get_sales_summary(self.today, self.today)
+        self.assertEqual(summary["invoice_count"], 3)
+        self.assertAlmostEqual(summary["taxable"], 400.0)
+        self.assertAlmostEqual(summary["vat"], 52.0)
+        self.assertAlmostEqual(summary["total"], 452.0)
+        self.assertAlmostEqual(summary["credit_note_total"], -226.0)
+        self.assertAlmostEqual(summary["cancelled_total"], 226.0)
+        # Months follow the document date's fiscal year, as in the VAT return,
+        # not the year carried in the invoice number
+        bs_month = InvoiceUtils.get_bs_month(self.today)
+        date_year = nepali_calendar.fiscal_year(self.today)
+        self.assertEqual(ReportController.get_monthly_summary(date_year), {bs_month: 452.0})
+        if date_year != FISCAL_YEAR:
+            self.assertEqual(ReportController.get_monthly_summary(FISCAL_YEAR), {})
+        month, = ReportController.get_bs_month_summary(date_year)
+        self.assertEqual((month["bs_month"], month["invoice_count"]), (bs_month, 3))
+        self.assertAlmostEqual(month["credit_note_total"], -226.0)
+
+    def test_cancelling_a_zero_total_invoice_matches_the_rebuild(self):
+        self.create_invoices(2)
+        free, = self.create_invoices(1, discount=100)
+        InvoiceController.cancel_invoices([free], "Sample sent as a sale", fiscal_year=FISCAL_YEAR)
+        incremental = self._rollup()
+
+        self.assertEqual(ReportController.get_sales_summary(self.today, self.today)["invoice_count"], 3)
+        database.rebuild_sales_daily()
+        self.assertEqual(self._rollup(), incremental)
+
+    def test_taxable_is_after_discount_like_the_vat_return(self):
+        ids = self.create_invoices(2, discount=10)
+        self.create_invoices(1, vat_rate=0, discount=5)
+        InvoiceController.cancel_invoices(ids[:1], "Duplicate", fiscal_year=FISCAL_YEAR)
+
+        summary = ReportController.get_sales_summary(self.today, self.today)
+        month, = [p for p in ReportController.get_vat_return(nepali_calendar.fiscal_year(self.today))
+                  if p["start_date"] <= self.today <= p["end_date"]]
+        self.assertAlmostEqual(summary["taxable"], 370.0)  # 2 x 180 + 190 exempt - 180 reversed
+        self.assertAlmostEqual(summary["taxable"], month["taxable_sales"] + month["exempt_sales"]
+                               + month["credit_note_taxable"])
+        self.assertAlmostEqual(summary["vat"], month["net_vat"])
+        self.assertAlmostEqual(summary["taxable"] + summary["vat"], summary["total"])
+
+        database.rebuild_sales_daily()
+        self.assertAlmostEqual(ReportController.get_sales_summary(self.today, self.today)["taxable"], 370.0)
+
+    def test_month_summary_groups_on_the_bs_month_index(self):
+        self.create_invoices(2)
+        statements = []
+        with database.get_reporting_connection() as conn:
+            conn.set_trace_callback(statements.append)
+            try:
+                months = ReportController.get_bs_month_summary(nepali_calendar.fiscal_year(self.today))
+            finally:
+                conn.set_trace_callback(None)
+            plan = [row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + statements[-1])]
+
+        self.assertEqual([(m["bs_month"], m["invoice_count"]) for m in months],
+                         [(InvoiceUtils.get_bs_month(self.today), 2)])
+        self.assertTrue([step for step in plan if "idx_sales_daily_bs_month" in step], plan)
+        self.assertFalse([step for step in plan if "TEMP B-TREE" in step], plan)
+
+    def test_rebuild_matches_incremental_rollup(self):
+        ids = self.create_invoices(4)
+        InvoiceController.cancel_invoices(ids[1:3], "Duplicate", fiscal_year=FISCAL_YEAR)
+        incremental = self._rollup()
+
+        self.assertEqual(database.rebuild_sales_daily(), 1)
+        self.assertEqual(self._rollup(), incremental)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,46 @@
+import csv
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from controllers.invoice_controller import InvoiceController
+from controllers.report_controller import ReportController
+from tests.db_test_case import SalesTestCase
+
+FISCAL_YEAR = SalesTestCase.FISCAL_YEAR
+
+
+class TestSalesRegisterExport(SalesTestCase):
+    DB_NAME = "register.db"
+
+    def test_register_csv_streams_numeric_rows(self):
+        ids = self.create_invoices(5)
+        InvoiceController.cancel_invoices(ids[:1], "Duplicate", fiscal_year=FISCAL_YEAR)
+        path = os.path.join(self.tmp_dir, "register.csv")
+        progress = []
+
+        count = ReportController.export_sales_register_csv(self.today, self.today, path,
+                                                           progress=lambda *p: progress.append(p), chunk_size=2)
+
+        self.assertEqual(count, 6)
+        self.assertEqual(progress, [(0, 6), (2, 6), (4, 6), (6, 6)])
+        with open(path, newline="", encoding="utf-8-sig") as f:
+            rows = list(csv.reader(f))
+        self.assertEqual(tuple(rows[0]), ReportController.SALES_REGISTER_COLUMNS)
+        self.assertEqual(rows[1][4:], ["200.0", "26.0", "226.0", "Cancelled"])
+        self.assertEqual(rows[-1][4:], ["-200.0", "-26.0", "-226.0", "Credit Note"])
+
+
+    def test_register_taxable_matches_the_summary_after_discount(self):
+        self.create_invoices(2, discount=10)
+
+        rows = list(ReportController.iter_sales_register(self.today, self.today))
+        summary = ReportController.get_sales_summary(self.today, self.today)
+        self.assertAlmostEqual(rows[0][4], 180.0)
+        self.assertAlmostEqual(sum(row[4] for row in rows), summary["taxable"])
+
+
+if __name__ == "__main__":
+    unittest.main()
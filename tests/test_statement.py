@@ -0,0 +1,60 @@
+import os
+import sys
+import unittest
+import zipfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from controllers.customer_controller import CustomerController
+from controllers.invoice_controller import InvoiceController
+from controllers.product_controller import ProductController
+from controllers.report_controller import ReportController
+from services.statement_service import StatementExporter, StatementService
+from tests.db_test_case import DatabaseTestCase
+
+FISCAL_YEAR = "2082/2083"
+
+
+class TestCustomerStatement(DatabaseTestCase):
+    DB_NAME = "statement.db"
+
+    def setUp(self):
+        super().setUp()
+        ProductController.add_product("Engine Oil", 100, "2710", stock_quantity=100)
+        product_id = ProductController.get_all_products()[0][0]
+        self.customer_id = CustomerController.add_customer("Shrestha Traders", "300123456", "Lahan", "", "", "")
+        CustomerController.add_customer("Walk-in", "", "", "", "", "")
+        items = [{"product_id": product_id, "quantity": 1, "price_per_unit": 100}]
+        # Totals 113.00 each (13% VAT); the first is paid in part, the second is cancelled
+        ids = [InvoiceController.create_invoice(None, "Shrestha Traders", "", "", "300123456", items, 13, 0, paid,
+                                                fiscal_year=FISCAL_YEAR)
+               for paid in (50, 0, 0)]
+        InvoiceController.cancel_invoices(ids[1:2], "Wrong customer", fiscal_year=FISCAL_YEAR)
+
+    def test_running_balance_and_totals(self):
+        documents = ReportController.iter_statement_documents("shrestha traders", "300123456",
+                                                              "2000-01-01", "2100-01-01")
+        totals = {"debit": 0.0, "credit": 0.0, "balance": 0.0}
+        lines = list(StatementService._statement_lines(documents, 0.0, "2000-01-01", totals))
+
+        self.assertEqual([line[2] for line in lines],
+                         ["Opening balance", "Sales invoice", "Payment received",
+                          "Sales invoice (cancelled)", "Sales invoice", "Credit note"])
+        self.assertAlmostEqual(totals["debit"], 339)
+        self.assertAlmostEqual(totals["credit"], 163)
+        self.assertAlmostEqual(lines[-1][5], 176)
+
+    def test_exports_every_customer_to_zip(self):
+        destination = os.path.join(self.tmp_dir, "statements.zip")
+
+        count = StatementExporter(workers=1).export(destination, "2000-01-01", "2100-01-01", as_zip=True)
+
+        self.assertEqual(count, 2)
+        with zipfile.ZipFile(destination) as archive:
+            names = sorted(archive.namelist())
+            self.assertTrue(names[0].startswith(f"Statement_{self.customer_id}_Shrestha_Traders"))
+            self.assertTrue(archive.read(names[0]).startswith(b"%PDF"))
+
+
+if __name__ == "__main__":
+    unittest.main()
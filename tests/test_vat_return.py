@@ -0,0 +1,77 @@
+import csv
+import os
+import sys
+import unittest
+import zipfile
+import xml.etree.ElementTree as ET
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import database
+from controllers.invoice_controller import InvoiceController
+from controllers.report_controller import ReportController
+from utils import nepali_calendar
+from tests.db_test_case import SalesTestCase
+
+FISCAL_YEAR = SalesTestCase.FISCAL_YEAR
+NS = {"m": "http://schemas.openxmlformats.org/spreadsheetml/2006/main"}
+
+
+class TestVATReturn(SalesTestCase):
+    DB_NAME = "vat.db"
+
+    def setUp(self):
+        super().setUp()
+        ids = self.create_invoices(2)
+        InvoiceController.create_invoice(None, "Walk-in", "", "", "", self.items, 0, 10, 0, fiscal_year=FISCAL_YEAR)
+        InvoiceController.cancel_invoices(ids[:1], "Duplicate", fiscal_year=FISCAL_YEAR)
+        self.return_year = nepali_calendar.fiscal_year(self.today)
+
+    def test_vat_return_splits_taxable_exempt_and_reversals(self):
+        periods = ReportController.get_vat_return(self.return_year)
+        self.assertEqual(len(periods), 12)
+        self.assertTrue(periods[0]["period"].startswith("Shrawan"))
+        month, = [p for p in periods if p["start_date"] <= self.today <= p["end_date"]]
+        self.assertAlmostEqual(month["taxable_sales"], 400.0)
+        self.assertAlmostEqual(month["exempt_sales"], 180.0)  # 10% discount, no VAT
+        self.assertAlmostEqual(month["vat_collected"], 52.0)
+        self.assertAlmostEqual(month["credit_note_vat"], -26.0)
+        self.assertAlmostEqual(month["net_vat"], 26.0)
+        self.assertAlmostEqual(month["cancelled_total"], 226.0)
+        self.assertEqual((month["invoice_count"], month["cancelled_count"], month["credit_note_count"]), (3, 1, 1))
+        self.assertEqual(sum(p["invoice_count"] for p in periods), 3)
+
+
+    def test_csv_and_xlsx_totals_agree(self):
+        csv_path = os.path.join(self.tmp_dir, "vat.csv")
+        xlsx_path = os.path.join(self.tmp_dir, "vat.xlsx")
+        totals = ReportController.export_vat_return(self.return_year, csv_path)
+        self.assertEqual(ReportController.export_vat_return(self.return_year, xlsx_path), totals)
+
+        with open(csv_path, newline="", encoding="utf-8-sig") as f:
+            csv_totals = list(csv.reader(f))[-1][3:]
+        with zipfile.ZipFile(xlsx_path) as archive:
+            sheet = ET.fromstring(archive.read("xl/worksheets/sheet1.xml"))
+        cells = sheet.findall("m:sheetData/m:row", NS)[-1].findall("m:c", NS)[3:]
+        xlsx_totals = [cell.find("m:v", NS).text for cell in cells]
+
+        self.assertEqual(len(xlsx_totals), len(csv_totals))
+        self.assertEqual([float(v) for v in xlsx_totals], [float(v) for v in csv_totals])
+        self.assertEqual(csv_totals[-3:], ["3", "1", "1"])
+
+
+    def test_return_is_read_from_the_rollup_and_survives_a_rebuild(self):
+        periods = ReportController.get_vat_return(self.return_year)
+        with database.get_connection() as conn:
+            conn.execute("DELETE FROM sales_daily")
+            conn.commit()
+        self.assertEqual(sum(p["invoice_count"] for p in ReportController.get_vat_return(self.return_year)), 0)
+
+        database.rebuild_sales_daily()
+        self.assertEqual(ReportController.get_vat_return(self.return_year), periods)
+        month, = ReportController.get_bs_month_summary(self.return_year)
+        self.assertAlmostEqual(sum(p["net_vat"] for p in periods), month["vat"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+import zipfile
+import xml.etree.ElementTree as ET
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from controllers.invoice_controller import InvoiceController
+from controllers.report_controller import ReportController
+from utils.xlsx_writer import STYLE_INTEGER, STYLE_TOTAL_INTEGER, XLSXWriter, column_letter
+from tests.db_test_case import SalesTestCase
+
+NS = {"m": "http://schemas.openxmlformats.org/spreadsheetml/2006/main"}
+
+
+class TestXLSXWriter(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp_dir, "report.xlsx")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def _sheet(self, archive, number):
+        return ET.fromstring(archive.read(f"xl/worksheets/sheet{number}.xml"))
+
+    def test_column_letters(self):
+        self.assertEqual([column_letter(i) for i in (0, 25, 26, 27, 701, 702)],
+                         ["A", "Z", "AA", "AB", "ZZ", "AAA"])
+
+    def test_typed_cells_frozen_header_and_totals(self):
+        with XLSXWriter(self.path) as book:
+            sheet = book.add_sheet("Invoices", ["Customer", "Total"], number_columns=[1])
+            sheet.write_rows([("श्रेष्ठ ट्रेडर्स", 113.0), ("A & B <Co>", -56.5)])
+            sheet.write_totals()
+            book.add_sheet("Summary", ["Item", "Amount"]).write_row(("Count", 2))
+
+        with zipfile.ZipFile(self.path) as archive:
+            self.assertIsNone(archive.testzip())
+            workbook = ET.fromstring(archive.read("xl/workbook.xml"))
+            self.assertEqual([s.get("name") for s in workbook.iterfind("m:sheets/m:sheet", NS)],
+                             ["Invoices", "Summary"])
+
+            sheet = self._sheet(archive, 1)
+            pane = sheet.find("m:sheetViews/m:sheetView/m:pane", NS)
+            self.assertEqual((pane.get("state"), pane.get("topLeftCell")), ("frozen", "A2"))
+            rows = sheet.findall("m:sheetData/m:row", NS)
+            self.assertEqual(len(rows), 4)
+            name, total = rows[1].findall("m:c", NS)
+            self.assertEqual(name.get("t"), "inlineStr")
+            self.assertEqual(name.find("m:is/m:t", NS).text, "श्रेष्ठ ट्रेडर्स")
+            self.assertIsNone(total.get("t"))
+            self.assertEqual(float(total.find("m:v", NS).text), 113.0)
+            self.assertEqual(rows[2].find("m:c/m:is/m:t", NS).text, "A & B <Co>")
+            totals = rows[3].findall("m:c", NS)
+            self.assertEqual(totals[1].find("m:f", NS).text, "SUM(B2:B3)")
+            self.assertEqual(float(totals[1].find("m:v", NS).text), 56.5)
+
+    def test_integer_columns_use_count_format_and_total(self):
+        with XLSXWriter(self.path) as book:
+            sheet = book.add_sheet("Months", ["Month", "Invoices", "Total"], integer_columns=[1], number_columns=[2])
+            sheet.write_rows([("Shrawan", 3, 452.0), ("Bhadra", 2, 226.0)])
+            sheet.write_totals()
+
+        with zipfile.ZipFile(self.path) as archive:
+            rows = self._sheet(archive, 1).findall("m:sheetData/m:row", NS)
+            self.assertIn('numFmtId="3"', archive.read("xl/styles.xml").decode())
+        count = rows[1].findall("m:c", NS)[1]
+        self.assertEqual((count.get("s"), count.find("m:v", NS).text), (str(STYLE_INTEGER), "3"))
+        total = rows[3].findall("m:c", NS)[1]
+        self.assertEqual((total.get("s"), total.find("m:v", NS).text), (str(STYLE_TOTAL_INTEGER), "5"))
+
+
+class TestSalesRegisterXLSX(SalesTestCase):
+    DB_NAME = "register.db"
+
+    def test_register_has_invoice_credit_note_and_summary_sheets(self):
+        ids = self.create_invoices(3)
+        InvoiceController.cancel_invoices(ids[:1], "Duplicate", fiscal_year=self.FISCAL_YEAR)
+        path = os.path.join(self.tmp_dir, "register.xlsx")
+
+        self.assertEqual(ReportController.export_sales_register(self.today, self.today, path), 4)
+        with zipfile.ZipFile(path) as archive:
+            workbook = archive.read("xl/workbook.xml").decode()
+            credit_notes = ET.fromstring(archive.read("xl/worksheets/sheet2.xml"))
+            summary = ET.fromstring(archive.read("xl/worksheets/sheet3.xml"))
+        for name in ("Invoices", "Credit Notes", "Summary"):
+            self.assertIn(f'name="{name}"', workbook)
+        self.assertEqual(len(credit_notes.findall("m:sheetData/m:row", NS)), 3)  # header, one credit note, totals
+        issued = summary.findall("m:sheetData/m:row", NS)[2].findall("m:c", NS)[1]
+        self.assertEqual((issued.get("s"), issued.find("m:v", NS).text), (str(STYLE_INTEGER), "3"))
+
+
+if __name__ == "__main__":
+    unittest.main()
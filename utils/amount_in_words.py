@@ -0,0 +1,56 @@
+from decimal import Decimal
+from functools import lru_cache
+
+# Words for an amount, in the format printed on invoices:
+#   1234567.5 -> "Twelve Lakh, Thirty-Four Thousand, Five Hundred And
+#                 Sixty-Seven Rupees And Fifty Paisa"
+# The wording matches num2words(..., lang='en_IN').title() exactly.
+
+_ONES = [
+    "Zero", "One", "Two", "Three", "Four", "Five", "Six", "Seven", "Eight", "Nine",
+    "Ten", "Eleven", "Twelve", "Thirteen", "Fourteen", "Fifteen", "Sixteen",
+    "Seventeen", "Eighteen", "Nineteen",
+]
+_TENS = ["", "", "Twenty", "Thirty", "Forty", "Fifty", "Sixty", "Seventy", "Eighty", "Ninety"]
+
+# Indian grouping, largest first: crore = 10^7, lakh = 10^5
+_SCALES = [(10 ** 7, "Crore"), (10 ** 5, "Lakh"), (1000, "Thousand"), (100, "Hundred")]
+
+
+@lru_cache(maxsize=4096)
+def number_to_words(number):
+    """Words for a whole number, e.g. 105000 -> 'One Lakh, Five Thousand'."""
+    number = int(number)
+    if number < 0:
+        return f"Minus {number_to_words(-number)}"
+    if number < 100:
+        return _below_hundred(number)
+
+    parts = []
+    for scale, name in _SCALES:
+        count, number = divmod(number, scale)
+        if count:
+            parts.append(f"{number_to_words(count)} {name}")
+    text = ", ".join(parts)
+    if number:
+        text += f" And {_below_hundred(number)}"
+    return text
+
+
+@lru_cache(maxsize=4096)
+def amount_in_words(amount):
+    """Rupees-and-paisa words for an amount (int, float, str or Decimal)."""
+    amount = Decimal(str(amount)).quantize(Decimal("0.01"))
+    rupees = int(amount)
+    paisa = int((amount - rupees) * 100)
+    text = f"{number_to_words(rupees)} Rupees"
+    if paisa > 0:
+        text += f" And {number_to_words(paisa)} Paisa"
+    return text
+
+
+def _below_hundred(number):
+    if number < 20:
+        return _ONES[number]
+    tens, ones = divmod(number, 10)
+    return f"{_TENS[tens]}-{_ONES[ones]}" if ones else _TENS[tens]
@@ -1,9 +1,15 @@
-import threading
 import tkinter as tk
+from concurrent.futures import ThreadPoolExecutor
+
+# Long-lived worker threads: each keeps its pooled database connection
+# between tasks instead of opening a fresh one per background job.
+_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="moonal-async")
+# Single reporting thread holding the read-only reporting connection.
+_report_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="moonal-reports")
 
 def run_async(widget, target, on_success=None, on_error=None, *args, **kwargs):
     """
-    Run `target(*args, **kwargs)` in a separate thread.
+    Run `target(*args, **kwargs)` on a background worker thread.
     On completion, schedule `on_success(result)` or `on_error(exception)`
     to run on the main thread using `widget.after`.
     
@@ -12,13 +18,21 @@ def run_async(widget, target, on_success=None, on_error=None, *args, **kwargs):
     :param on_success: Callback function receiving the result on success.
     :param on_error: Callback function receiving the exception on error.
     """
-    def thread_target():
-        try:
-            result = target(*args, **kwargs)
-            if on_success:
-                widget.after(0, lambda: on_success(result))
-        except Exception as e:
-            if on_error:
-                widget.after(0, lambda: on_error(e))
-    
-    threading.Thread(target=thread_target, daemon=True).start()
+    _executor.submit(_with_callbacks, widget, target, on_success, on_error, args, kwargs)
+
+def run_report_async(widget, target, on_success=None, on_error=None, *args, **kwargs):
+    """
+    Like run_async, but on the dedicated reporting thread so report queries
+    use the read-only reporting connection and queue behind one another
+    instead of competing with interactive work.
+    """
+    _report_executor.submit(_with_callbacks, widget, target, on_success, on_error, args, kwargs)
+
+def _with_callbacks(widget, target, on_success, on_error, args, kwargs):
+    try:
+        result = target(*args, **kwargs)
+        if on_success:
+            widget.after(0, lambda: on_success(result))
+    except Exception as e:
+        if on_error:
+            widget.after(0, lambda e=e: on_error(e))
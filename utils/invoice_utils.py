@@ -1,36 +1,51 @@
 import os
 from datetime import datetime
 
+from utils import nepali_calendar
 
-class InvoiceUtils:
-    @staticmethod
-    def is_leap_year(year):
-        """Check if a given year is a leap year."""
-        return (year % 4 == 0 and (year % 100 != 0 or year % 400 == 0))
 
+class InvoiceUtils:
     @staticmethod
     def get_fiscal_year_nepali():
-        """Calculate the current Nepali fiscal year."""
-        today = datetime.now()
-        year = today.year
-        month = today.month
-        day = today.day
+        """Current Nepali fiscal year, e.g. '2082/2083' (Shrawan 1 to the end of Asar)."""
+        return nepali_calendar.fiscal_year(datetime.now())
 
-        # Determine if the current year is a leap year
-        leap_year = InvoiceUtils.is_leap_year(year)
+    @staticmethod
+    def get_bs_month(date):
+        """
+        Bikram Sambat month of a 'YYYY-MM-DD' date as 'YYYY-MM', e.g.
+        '2025-07-17' -> '2082-04' (Shrawan). None outside the supported range.
+        """
+        try:
+            return nepali_calendar.bs_month(date)
+        except (TypeError, ValueError):
+            return None
 
-        # Shrawan start day varies between leap and non-leap years
-        shrawan_start_day = 16 if leap_year else 17
+    @staticmethod
+    def format_document_number(series, fiscal_year, value):
+        """Format a document number, e.g. ('MU', '2082/2083', 5) -> 'MU/2082/2083/0005'."""
+        return f"{series}/{fiscal_year}/{value:04d}"
 
-        # Approximate fiscal year based on Nepali calendar
-        if month < 7 or (month == 7 and day < shrawan_start_day):
-            nepali_year = year + 57  # Convert to Nepali year
-            fiscal_year = f"{nepali_year - 1}/{nepali_year}"
-        else:
-            nepali_year = year + 57
-            fiscal_year = f"{nepali_year}/{nepali_year + 1}"
+    @staticmethod
+    def parse_document_number(number):
+        """
+        Split 'MU/2082/2083/0005' into ('MU', '2082/2083', 5).
+        Returns None for numbers that do not follow the SERIES/FY/NNNN layout.
+        """
+        parts = (number or "").split('/')
+        if len(parts) < 3:
+            return None
+        try:
+            value = int(parts[-1])
+        except ValueError:
+            return None
+        return parts[0], '/'.join(parts[1:-1]), value
 
-        return fiscal_year
+    @staticmethod
+    def document_fiscal_year(number):
+        """Fiscal year embedded in a document number ('' if it has none)."""
+        parsed = InvoiceUtils.parse_document_number(number)
+        return parsed[1] if parsed else ''
 
     @staticmethod
     def get_last_invoice(current_fiscal_year, invoice_file):
@@ -51,6 +66,6 @@ class InvoiceUtils:
 
     @staticmethod
     def generate_invoice_number(current_fiscal_year):
-        """Generate a new invoice number using the database."""
+        """Preview the next invoice number (allocation happens when the invoice is saved)."""
         from controllers.invoice_controller import InvoiceController
         return InvoiceController.get_next_invoice_number(current_fiscal_year)
\ No newline at end of file
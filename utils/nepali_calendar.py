@@ -0,0 +1,134 @@
+import csv
+from array import array
+from datetime import date, datetime
+from functools import lru_cache
+
+from nepali_datetime.config import CALENDAR_PATH, MINDATE, REFERENCE_DATE_AD
+
+# Bikram Sambat <-> Gregorian conversion from precomputed tables.
+#
+# The month lengths come from the calendar table shipped with nepali_datetime
+# (BS 1975-2100). At import they are unrolled into two flat arrays:
+#   _MONTH_START[i]  Gregorian ordinal of the 1st of BS month i
+#                    (i = (year - MIN_YEAR) * 12 + month - 1), plus an end sentinel
+#   _DAY_MONTH[n]    BS month index of the n-th day of the range
+# so a conversion in either direction is two array reads, with no loops.
+#
+# The Nepali fiscal year runs from Shrawan 1 (month 4) to the end of Asar,
+# written '2082/2083' as in document numbers.
+
+FISCAL_YEAR_START_MONTH = 4
+
+MONTH_NAMES = ("Baishakh", "Jestha", "Asar", "Shrawan", "Bhadra", "Ashwin",
+               "Kartik", "Mangsir", "Poush", "Magh", "Falgun", "Chaitra")
+
+
+def _load_tables():
+    with open(CALENDAR_PATH, newline="") as f:
+        rows = list(csv.reader(f))[1:]
+    month_start = array("l")
+    day_month = array("H")
+    ordinal = date(**REFERENCE_DATE_AD).toordinal()
+    for year_index, row in enumerate(rows):
+        for month_index, length in enumerate(int(days) for days in row[1:13]):
+            month_start.append(ordinal)
+            day_month.extend([year_index * 12 + month_index] * length)
+            ordinal += length
+    month_start.append(ordinal)
+    return int(rows[0][0]), int(rows[-1][0]), month_start, day_month
+
+
+MIN_YEAR, MAX_YEAR, _MONTH_START, _DAY_MONTH = _load_tables()
+assert MIN_YEAR == MINDATE["year"]
+FIRST_AD_DATE = date.fromordinal(_MONTH_START[0])
+LAST_AD_DATE = date.fromordinal(_MONTH_START[-1] - 1)
+
+
+def _as_date(value):
+    """Accept a date, a datetime or a 'YYYY-MM-DD' string."""
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return datetime.strptime(value, "%Y-%m-%d").date()
+
+
+def _month_index(year, month):
+    if not (MIN_YEAR <= year <= MAX_YEAR and 1 <= month <= 12):
+        raise ValueError(f"BS month {year}-{month:02d} is outside {MIN_YEAR}-{MAX_YEAR}")
+    return (year - MIN_YEAR) * 12 + month - 1
+
+
+def days_in_month(year, month):
+    """Number of days in a BS month."""
+    i = _month_index(year, month)
+    return _MONTH_START[i + 1] - _MONTH_START[i]
+
+
+def to_bs(ad_date):
+    """Gregorian date, datetime or 'YYYY-MM-DD' -> BS (year, month, day)."""
+    if isinstance(ad_date, datetime):
+        ad_date = ad_date.date()  # memoise per day, not per timestamp
+    return _to_bs(ad_date)
+
+
+@lru_cache(maxsize=1024)
+def _to_bs(ad_date):
+    ad_date = _as_date(ad_date)
+    offset = ad_date.toordinal() - _MONTH_START[0]
+    if not 0 <= offset < len(_DAY_MONTH):
+        raise ValueError(f"{ad_date} is outside the supported range {FIRST_AD_DATE} to {LAST_AD_DATE}")
+    i = _DAY_MONTH[offset]
+    return MIN_YEAR + i // 12, i % 12 + 1, ad_date.toordinal() - _MONTH_START[i] + 1
+
+
+def to_ad(year, month, day):
+    """BS year, month, day -> Gregorian date."""
+    i = _month_index(year, month)
+    if not 1 <= day <= _MONTH_START[i + 1] - _MONTH_START[i]:
+        raise ValueError(f"day must be in 1..{_MONTH_START[i + 1] - _MONTH_START[i]} for {year}-{month:02d}")
+    return date.fromordinal(_MONTH_START[i] + day - 1)
+
+
+def format_bs(ad_date):
+    """BS date as 'YYYY-MM-DD', e.g. 2025-07-17 -> '2082-04-01'."""
+    year, month, day = to_bs(ad_date)
+    return f"{year:04d}-{month:02d}-{day:02d}"
+
+
+def bs_month(ad_date):
+    """BS month of a Gregorian date as 'YYYY-MM', e.g. 2025-07-17 -> '2082-04'."""
+    year, month, _ = to_bs(ad_date)
+    return f"{year:04d}-{month:02d}"
+
+
+def month_range(year, month):
+    """First and last Gregorian dates of a BS month."""
+    i = _month_index(year, month)
+    return date.fromordinal(_MONTH_START[i]), date.fromordinal(_MONTH_START[i + 1] - 1)
+
+
+def fiscal_year(ad_date):
+    """Fiscal year containing a Gregorian date, e.g. 2025-07-17 -> '2082/2083'."""
+    year, month, _ = to_bs(ad_date)
+    start = year if month >= FISCAL_YEAR_START_MONTH else year - 1
+    return f"{start}/{start + 1}"
+
+
+def fiscal_year_months(fiscal_year):
+    """The twelve (year, month) BS months of a fiscal year, Shrawan first."""
+    start = int(fiscal_year.split("/")[0])
+    return [(start + (month < FISCAL_YEAR_START_MONTH), month)
+            for month in (*range(FISCAL_YEAR_START_MONTH, 13), *range(1, FISCAL_YEAR_START_MONTH))]
+
+
+def fiscal_year_range(fiscal_year):
+    """First and last Gregorian dates of a fiscal year such as '2082/2083'."""
+    months = fiscal_year_months(fiscal_year)
+    return month_range(*months[0])[0], month_range(*months[-1])[1]
+
+
+def today():
+    """Today's BS (year, month, day); memoised per day by to_bs."""
+    return to_bs(date.today())
+
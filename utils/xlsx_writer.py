@@ -0,0 +1,249 @@
+import io
+import math
+import re
+import zipfile
+from functools import lru_cache
+from xml.sax.saxutils import escape
+
+# Minimal Office Open XML workbook writer, streaming rows straight into the
+# ZIP archive so exports of any length run in constant memory:
+#
+#     with XLSXWriter("register.xlsx") as book:
+#         sheet = book.add_sheet("Invoices", ["Date", "Items", "Total"],
+#                                integer_columns=[1], number_columns=[2])
+#         for row in rows:
+#             sheet.write_row(row)
+#         sheet.write_totals()
+#
+# Sheets are written one after another; adding a sheet finishes the previous
+# one. Strings are stored inline (no shared string table to hold in memory).
+
+# Cell styles, indexes into cellXfs in _STYLES
+STYLE_TEXT = 0
+STYLE_HEADER = 1
+STYLE_NUMBER = 2
+STYLE_TOTAL_TEXT = 3
+STYLE_TOTAL_NUMBER = 4
+STYLE_INTEGER = 5
+STYLE_TOTAL_INTEGER = 6
+
+_STYLES = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<styleSheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">
+<numFmts count="1"><numFmt numFmtId="164" formatCode="#,##0.00"/></numFmts>
+<fonts count="2"><font><sz val="11"/><name val="Calibri"/></font><font><b/><sz val="11"/><name val="Calibri"/></font></fonts>
+<fills count="3"><fill><patternFill patternType="none"/></fill><fill><patternFill patternType="gray125"/></fill>\
+<fill><patternFill patternType="solid"><fgColor rgb="FFF3E5AB"/><bgColor indexed="64"/></patternFill></fill></fills>
+<borders count="2"><border><left/><right/><top/><bottom/><diagonal/></border>\
+<border><left/><right/><top style="thin"/><bottom style="double"/><diagonal/></border></borders>
+<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>
+<cellXfs count="7">
+<xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>
+<xf numFmtId="0" fontId="1" fillId="2" borderId="0" xfId="0" applyFont="1" applyFill="1"/>
+<xf numFmtId="164" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/>
+<xf numFmtId="0" fontId="1" fillId="0" borderId="1" xfId="0" applyFont="1" applyBorder="1"/>
+<xf numFmtId="164" fontId="1" fillId="0" borderId="1" xfId="0" applyNumberFormat="1" applyFont="1" applyBorder="1"/>
+<xf numFmtId="3" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/>
+<xf numFmtId="3" fontId="1" fillId="0" borderId="1" xfId="0" applyNumberFormat="1" applyFont="1" applyBorder="1"/>
+</cellXfs>
+<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles>
+</styleSheet>"""
+
+_ROOT_RELS = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">
+<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" \
+Target="xl/workbook.xml"/>
+</Relationships>"""
+
+# Characters XML 1.0 cannot carry at all
+_INVALID_XML = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f\ufffe\uffff]")
+_INVALID_SHEET_NAME = re.compile(r"[\[\]:*?/\\]")
+
+
+@lru_cache(maxsize=256)
+def column_letter(index):
+    """Spreadsheet column name for a 0-based index: 0 -> 'A', 27 -> 'AB'."""
+    name = ""
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        name = chr(65 + remainder) + name
+    return name
+
+
+class XLSXWriter:
+    """Write an .xlsx workbook sheet by sheet without loading rows into memory."""
+
+    def __init__(self, path):
+        self.path = path
+        self._zip = zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED)
+        self._sheet_names = []
+        self._sheet = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def add_sheet(self, name, columns, number_columns=(), widths=None, freeze_header=True, integer_columns=()):
+        """
+        Start a new worksheet with a bold header row and return it. Values in
+        number_columns (0-based indexes) are written as numeric cells with a
+        #,##0.00 format, those in integer_columns (counts) with #,##0; widths
+        are character widths per column.
+        """
+        self._finish_sheet()
+        name = _INVALID_SHEET_NAME.sub("-", name)[:31] or f"Sheet{len(self._sheet_names) + 1}"
+        if name.lower() in (existing.lower() for existing in self._sheet_names):
+            raise ValueError(f"duplicate sheet name: {name}")
+        self._sheet_names.append(name)
+        stream = self._zip.open(f"xl/worksheets/sheet{len(self._sheet_names)}.xml", "w", force_zip64=True)
+        self._sheet = Worksheet(io.TextIOWrapper(stream, encoding="utf-8", newline=""),
+                                columns, number_columns, widths, freeze_header, integer_columns)
+        return self._sheet
+
+    def close(self):
+        """Finish the last sheet and write the workbook parts."""
+        if self._zip is None:
+            return
+        self._finish_sheet()
+        if not self._sheet_names:
+            self.add_sheet("Sheet1", [])
+            self._finish_sheet()
+        count = len(self._sheet_names)
+        self._zip.writestr("[Content_Types].xml", self._content_types(count))
+        self._zip.writestr("_rels/.rels", _ROOT_RELS)
+        self._zip.writestr("xl/workbook.xml", self._workbook())
+        self._zip.writestr("xl/_rels/workbook.xml.rels", self._workbook_rels(count))
+        self._zip.writestr("xl/styles.xml", _STYLES)
+        self._zip.close()
+        self._zip = None
+
+    def _finish_sheet(self):
+        if self._sheet is not None:
+            self._sheet.close()
+            self._sheet = None
+
+    def _workbook(self):
+        sheets = "".join(f'<sheet name="{escape(name, {chr(34): "&quot;"})}" sheetId="{i}" r:id="rId{i}"/>'
+                         for i, name in enumerate(self._sheet_names, 1))
+        return ('<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+                '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+                'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+                f'<sheets>{sheets}</sheets></workbook>')
+
+    @staticmethod
+    def _workbook_rels(count):
+        rels = "".join(f'<Relationship Id="rId{i}" Type="http://schemas.openxmlformats.org/officeDocument/2006/'
+                       f'relationships/worksheet" Target="worksheets/sheet{i}.xml"/>' for i in range(1, count + 1))
+        rels += (f'<Relationship Id="rId{count + 1}" Type="http://schemas.openxmlformats.org/officeDocument/2006/'
+                 'relationships/styles" Target="styles.xml"/>')
+        return ('<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+                '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+                f'{rels}</Relationships>')
+
+    @staticmethod
+    def _content_types(count):
+        sheets = "".join(f'<Override PartName="/xl/worksheets/sheet{i}.xml" ContentType="application/'
+                         'vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+                         for i in range(1, count + 1))
+        return ('<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+                '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+                '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+                '<Default Extension="xml" ContentType="application/xml"/>'
+                '<Override PartName="/xl/workbook.xml" ContentType="application/'
+                'vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+                '<Override PartName="/xl/styles.xml" ContentType="application/'
+                'vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+                f'{sheets}</Types>')
+
+
+class Worksheet:
+    """One sheet being streamed; created by XLSXWriter.add_sheet."""
+
+    def __init__(self, stream, columns, number_columns, widths, freeze_header, integer_columns=()):
+        self._stream = stream
+        self.columns = list(columns)
+        self.integer_columns = set(integer_columns)
+        self.number_columns = set(number_columns) | self.integer_columns
+        self.rows_written = 0
+        self._totals = {index: 0 if index in self.integer_columns else 0.0 for index in self.number_columns}
+        self._closed = False
+
+        stream.write('<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+                     '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">')
+        if freeze_header and self.columns:
+            stream.write('<sheetViews><sheetView workbookViewId="0">'
+                         '<pane ySplit="1" topLeftCell="A2" activePane="bottomLeft" state="frozen"/>'
+                         '</sheetView></sheetViews>')
+        if widths:
+            stream.write("<cols>" + "".join(f'<col min="{i}" max="{i}" width="{width}" customWidth="1"/>'
+                                            for i, width in enumerate(widths, 1)) + "</cols>")
+        stream.write("<sheetData>")
+        if self.columns:
+            self._write_cells([(name, STYLE_HEADER, None) for name in self.columns])
+
+    def write_row(self, values):
+        """Append a data row; numeric columns also accumulate their totals."""
+        cells = []
+        for index, value in enumerate(values):
+            if index in self.number_columns and _is_number(value):
+                self._totals[index] += value
+                cells.append((value, STYLE_INTEGER if index in self.integer_columns else STYLE_NUMBER, None))
+            else:
+                cells.append((value, STYLE_TEXT, None))
+        self._write_cells(cells)
+
+    def write_rows(self, rows):
+        for row in rows:
+            self.write_row(row)
+
+    def write_totals(self, label="Total"):
+        """
+        Append a bold totals row: a SUM formula over every numeric column, with
+        the running total stored as the cached value so readers that do not
+        recalculate still show it.
+        """
+        last_row = self.rows_written
+        cells = []
+        for index in range(len(self.columns)):
+            if index in self.number_columns:
+                letter = column_letter(index)
+                style = STYLE_TOTAL_INTEGER if index in self.integer_columns else STYLE_TOTAL_NUMBER
+                cells.append((self._totals[index], style, f"SUM({letter}2:{letter}{last_row})"))
+            elif index == 0:
+                cells.append((label, STYLE_TOTAL_TEXT, None))
+            else:
+                cells.append((None, STYLE_TOTAL_TEXT, None))
+        self._write_cells(cells)
+
+    def close(self):
+        if self._closed:
+            return
+        self._stream.write("</sheetData></worksheet>")
+        self._stream.close()
+        self._closed = True
+
+    def _write_cells(self, cells):
+        self.rows_written += 1
+        row = self.rows_written
+        parts = [f'<row r="{row}">']
+        for index, (value, style, formula) in enumerate(cells):
+            ref = f"{column_letter(index)}{row}"
+            style_attr = f' s="{style}"' if style else ""
+            if formula is not None:
+                parts.append(f'<c r="{ref}"{style_attr}><f>{formula}</f><v>{value!r}</v></c>')
+            elif value is None or value == "":
+                if style:
+                    parts.append(f'<c r="{ref}"{style_attr}/>')
+            elif _is_number(value):
+                parts.append(f'<c r="{ref}"{style_attr}><v>{value!r}</v></c>')
+            else:
+                text = escape(_INVALID_XML.sub("", str(value)))
+                parts.append(f'<c r="{ref}"{style_attr} t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>')
+        parts.append("</row>")
+        self._stream.write("".join(parts))
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool) and math.isfinite(value)
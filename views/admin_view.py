@@ -7,6 +7,8 @@ from tkinter import ttk, messagebox
 from config.settings import Settings
 from controllers.authController import AuthController
 from controllers.backup_controller import BackupController
+from config.database import get_pool_stats
+from services.repository_cache import repository_cache
 
 
 class AdminView(tk.Frame):
@@ -27,7 +29,8 @@ class AdminView(tk.Frame):
         self.tabs = {}
         self.tab_frames = {}
 
-        for key, label in [("users", "👥 Users"), ("backup", "💾 Backups"), ("audit", "📋 Audit Log")]:
+        for key, label in [("users", "👥 Users"), ("backup", "💾 Backups"), ("audit", "📋 Audit Log"),
+                           ("diagnostics", "🩺 Diagnostics")]:
             btn = tk.Label(tab_bar, text=label, font=self.F["body_bold"],
                            bg="white", fg=self.C["secondary"], padx=16, pady=6, cursor="hand2")
             btn.pack(side="left")
@@ -59,6 +62,8 @@ class AdminView(tk.Frame):
             self._build_backup_tab()
         elif key == "audit":
             self._build_audit_tab()
+        elif key == "diagnostics":
+            self._build_diagnostics_tab()
 
     def _build_users_tab(self):
         card = tk.Frame(self.content, bg="white",
@@ -224,3 +229,41 @@ class AdminView(tk.Frame):
                 self.audit_tree.insert("", "end", values=l)
         except Exception:
             pass
+
+    def _build_diagnostics_tab(self):
+        card = tk.Frame(self.content, bg="white",
+                        highlightbackground=self.C["border"], highlightthickness=1)
+        card.pack(fill="both", expand=True)
+
+        toolbar = tk.Frame(card, bg="white", padx=16, pady=12)
+        toolbar.pack(fill="x")
+        tk.Label(toolbar, text="Diagnostics", font=self.F["h3"],
+                 bg="white", fg=self.C["text"]).pack(side="left")
+        ttk.Button(toolbar, text="Refresh", style="Gold.TButton",
+                    command=self._load_diagnostics).pack(side="right")
+
+        cols = ("Metric", "Value")
+        self.diag_tree = ttk.Treeview(card, columns=cols, show="headings",
+                                       style="Custom.Treeview")
+        self.diag_tree.pack(fill="both", expand=True, padx=8, pady=(0, 8))
+        for c in cols:
+            self.diag_tree.heading(c, text=c)
+            self.diag_tree.column(c, width=250)
+
+        self._load_diagnostics()
+
+    def _load_diagnostics(self):
+        for i in self.diag_tree.get_children():
+            self.diag_tree.delete(i)
+        cache = repository_cache.stats()
+        lookups = cache["hits"] + cache["misses"]
+        rows = [
+            ("Cache hits", cache["hits"]),
+            ("Cache misses", cache["misses"]),
+            ("Cache hit rate", f"{cache['hits'] / lookups:.1%}" if lookups else "-"),
+            ("Cache invalidations", cache["invalidations"]),
+            ("Cached datasets", ", ".join(cache["cached_datasets"]) or "-"),
+        ]
+        rows += [(f"Connections: {k.replace('_', ' ')}", v) for k, v in get_pool_stats().items()]
+        for row in rows:
+            self.diag_tree.insert("", "end", values=row)
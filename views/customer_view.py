@@ -3,9 +3,15 @@ CustomerView — Customer management with light golden theme.
 Renders inside AppShell content area.
 """
 import tkinter as tk
-from tkinter import ttk, messagebox
+from datetime import date, timedelta
+from tkinter import ttk, messagebox, filedialog
 from config.settings import Settings
 from controllers.customer_controller import CustomerController
+from controllers.settings_controller import SettingsController
+from services.pdf_service import PDFService
+from services.render_service import render_service
+from services.statement_service import StatementExporter, StatementService
+from utils.async_utils import run_async
 
 
 class CustomerView(tk.Frame):
@@ -60,6 +66,8 @@ class CustomerView(tk.Frame):
         self.delete_btn.pack(side="left", fill="x", expand=True, padx=(4, 0))
         ttk.Button(left, text="Clear Form", style="Ghost.TButton",
                     command=self.clear_form).pack(fill="x", pady=(8, 0))
+        ttk.Button(left, text="📄  Statement of Account", style="Ghost.TButton",
+                    command=self.open_statement_dialog).pack(fill="x", pady=(8, 0))
 
         # Right: Table
         right = tk.Frame(main, bg="white",
@@ -112,8 +120,7 @@ class CustomerView(tk.Frame):
         values = self.tree.item(sel[0])["values"]
         cid = int(values[0])
         try:
-            customers = CustomerController.get_all_customers()
-            cust = next((c for c in customers if c[0] == cid), None)
+            cust = CustomerController.get_customer_by_id(cid)
         except Exception:
             cust = None
         if cust:
@@ -177,3 +184,88 @@ class CustomerView(tk.Frame):
         for e in self.entries.values():
             e.delete(0, tk.END)
         self._update_buttons(editing=False)
+
+    def open_statement_dialog(self):
+        """Statement PDF for the selected customer, or a ZIP of every customer's."""
+        dialog = tk.Toplevel(self)
+        dialog.title("Statement of Account")
+        dialog.geometry("380x300")
+        dialog.configure(bg="white")
+        dialog.resizable(False, False)
+        dialog.transient(self)
+        dialog.grab_set()
+
+        tk.Label(dialog, text="Statement of Account", font=self.F["h3"],
+                 bg="white", fg=self.C["primary"]).pack(pady=(20, 8))
+
+        today = date.today()
+        fields = {}
+        for key, label, default in [("start_date", "FROM DATE (YYYY-MM-DD)", today - timedelta(days=365)),
+                                    ("end_date", "TO DATE (YYYY-MM-DD)", today)]:
+            tk.Label(dialog, text=label, font=self.F["small_bold"],
+                     bg="white", fg=self.C["secondary"]).pack(anchor="w", padx=30, pady=(8, 2))
+            entry = tk.Entry(dialog, font=self.F["body"], bg=self.C["input_bg"],
+                             relief="flat", highlightthickness=2,
+                             highlightbackground=self.C["input_border"],
+                             highlightcolor=self.C["primary"])
+            entry.insert(0, default.isoformat())
+            entry.pack(fill="x", padx=30, ipady=4)
+            fields[key] = entry
+
+        status = tk.Label(dialog, text="", font=self.F["small"], bg="white", fg=self.C["secondary"])
+        status.pack(pady=(10, 0))
+        btn_frame = tk.Frame(dialog, bg="white")
+        btn_frame.pack(fill="x", padx=30, pady=12)
+
+        def period():
+            return fields["start_date"].get().strip(), fields["end_date"].get().strip()
+
+        def on_error(e):
+            if dialog.winfo_exists():
+                status.configure(text="")
+            messagebox.showerror("Error", f"Statement failed: {e}")
+
+        def selected_statement():
+            if not self.selected_customer_id:
+                return messagebox.showwarning("Select", "Select a customer first.", parent=dialog)
+            customer = CustomerController.get_customer_by_id(self.selected_customer_id)
+            company = PDFService.company_fields(SettingsController.get_all_settings())
+            start_date, end_date = period()
+            status.configure(text="Generating...")
+
+            def on_success(pdf_path):
+                if dialog.winfo_exists():
+                    dialog.destroy()
+                PDFService.open_pdf(pdf_path)
+
+            run_async(self, StatementService(profile=Settings.PDF_PROFILE).generate_statement_pdf,
+                      on_success, on_error, customer, start_date, end_date, company)
+
+        def all_statements():
+            start_date, end_date = period()
+            destination = filedialog.asksaveasfilename(
+                parent=dialog, defaultextension=".zip",
+                initialfile=f"Statements_{start_date}_{end_date}.zip",
+                filetypes=[("ZIP archive", "*.zip")])
+            if not destination:
+                return
+
+            def on_progress(done, total):
+                self.after(0, lambda: dialog.winfo_exists() and status.configure(
+                    text=f"{done} of {total} statements"))
+
+            def on_success(count):
+                if dialog.winfo_exists():
+                    dialog.destroy()
+                messagebox.showinfo("Exported", f"{count} statements saved to {destination}")
+
+            status.configure(text="Starting workers...")
+            run_async(self, StatementExporter(render_service=render_service).export, on_success, on_error,
+                      destination, start_date, end_date, as_zip=True, progress=on_progress)
+
+        ttk.Button(btn_frame, text="Selected Customer", style="Gold.TButton",
+                   command=selected_statement).pack(side="right")
+        ttk.Button(btn_frame, text="All (ZIP)", style="Ghost.TButton",
+                   command=all_statements).pack(side="right", padx=(0, 8))
+        ttk.Button(btn_frame, text="Close", style="Ghost.TButton",
+                   command=dialog.destroy).pack(side="left")
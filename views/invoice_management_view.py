@@ -3,18 +3,36 @@ InvoiceManagementView — Invoice history with light golden theme.
 Renders inside AppShell content area.
 """
 import tkinter as tk
-from tkinter import ttk, messagebox
+from tkinter import ttk, messagebox, filedialog
 from config.settings import Settings
 from controllers.invoice_controller import InvoiceController
+from services.batch_export import BatchPDFExporter
+from services.render_service import render_service
+from utils.async_utils import run_async
+from utils.invoice_utils import InvoiceUtils
 
 
 class InvoiceManagementView(tk.Frame):
+    PAGE_SIZE = 100
+    SEARCH_DEBOUNCE_MS = 200
+    # Filter label -> get_invoices_page keyword arguments
+    FILTERS = {
+        "All": {},
+        "Active": {"status": "ACTIVE", "is_credit_note": False},
+        "Cancelled": {"status": "CANCELLED"},
+        "Credit Notes": {"is_credit_note": True},
+    }
+
     def __init__(self, parent, controller):
         super().__init__(parent)
         self.controller = controller
         self.C = Settings.COLORS
         self.F = Settings.FONTS
         self.configure(bg=self.C["bg"])
+        self._last_id = None
+        self._has_more = False
+        self._page_pending = False
+        self._search_job = None
         self._build_ui()
         self.load_invoices()
 
@@ -27,17 +45,25 @@ class InvoiceManagementView(tk.Frame):
         tk.Label(toolbar, text="🔍", font=("Segoe UI", 11),
                  bg="white", fg=self.C["muted"]).pack(side="left")
         self.search_var = tk.StringVar()
-        self.search_var.trace_add("write", lambda *a: self.load_invoices())
+        self.search_var.trace_add("write", lambda *a: self._schedule_search())
         tk.Entry(toolbar, textvariable=self.search_var, font=self.F["body"],
                  bg=self.C["input_bg"], relief="flat", highlightthickness=2,
                  highlightbackground=self.C["input_border"],
                  highlightcolor=self.C["primary"]).pack(
             side="left", fill="x", expand=True, ipady=5, padx=(8, 16))
 
+        self.filter_var = tk.StringVar(value="All")
+        filter_combo = ttk.Combobox(toolbar, textvariable=self.filter_var, state="readonly",
+                                    values=list(self.FILTERS), width=12, font=self.F["body"])
+        filter_combo.pack(side="left", padx=(0, 16))
+        filter_combo.bind("<<ComboboxSelected>>", lambda e: self.load_invoices())
+
         ttk.Button(toolbar, text="📄 View", style="Gold.TButton",
                     command=self.view_invoice).pack(side="right", padx=(4, 0))
         ttk.Button(toolbar, text="❌ Cancel", style="Danger.TButton",
                     command=self.cancel_invoice).pack(side="right", padx=(4, 0))
+        ttk.Button(toolbar, text="📦 Export PDFs", style="Ghost.TButton",
+                    command=self.export_pdfs).pack(side="right", padx=(4, 0))
 
         # Table
         table_frame = tk.Frame(self, bg="white",
@@ -45,9 +71,13 @@ class InvoiceManagementView(tk.Frame):
         table_frame.pack(fill="both", expand=True, padx=24, pady=16)
 
         cols = ("ID", "Invoice #", "Client", "Total", "Paid", "Due", "Status", "Date")
+        self.scrollbar = ttk.Scrollbar(table_frame, orient="vertical")
+        self.scrollbar.pack(side="right", fill="y", pady=8)
         self.tree = ttk.Treeview(table_frame, columns=cols, show="headings",
-                                  style="Custom.Treeview")
+                                  style="Custom.Treeview",
+                                  yscrollcommand=self._on_tree_scroll)
         self.tree.pack(fill="both", expand=True, padx=8, pady=8)
+        self.scrollbar.configure(command=self.tree.yview)
 
         widths = {"ID": 50, "Invoice #": 120, "Client": 160, "Total": 100,
                   "Paid": 100, "Due": 100, "Status": 80, "Date": 100}
@@ -58,26 +88,42 @@ class InvoiceManagementView(tk.Frame):
         self.tree.bind("<Double-1>", lambda e: self.view_invoice())
 
     def load_invoices(self):
+        """Reset the list and fetch the first page; later pages load on scroll."""
         for i in self.tree.get_children():
             self.tree.delete(i)
+        self._last_id = None
+        self._has_more = True
+        self.tree.tag_configure("cancelled", foreground=self.C["danger"])
+        self._load_next_page()
+
+    def _schedule_search(self):
+        """Debounce typing: search once the user pauses instead of per keystroke."""
+        if self._search_job:
+            self.after_cancel(self._search_job)
+        self._search_job = self.after(self.SEARCH_DEBOUNCE_MS, self._run_search)
+
+    def _run_search(self):
+        self._search_job = None
+        self.load_invoices()
+
+    def _load_next_page(self):
+        self._page_pending = False
+        if not self._has_more:
+            return
+        search = self.search_var.get().strip() if hasattr(self, 'search_var') else ""
+        filters = self.FILTERS.get(self.filter_var.get(), {}) if hasattr(self, 'filter_var') else {}
         try:
-            invoices = InvoiceController.get_all_invoices()
+            invoices = InvoiceController.get_invoices_page(
+                after_id=self._last_id, limit=self.PAGE_SIZE, search=search or None, **filters)
         except Exception:
             invoices = []
+        self._has_more = len(invoices) == self.PAGE_SIZE
 
-        search = self.search_var.get().lower() if hasattr(self, 'search_var') else ""
         for inv in invoices:
-            # Check if search term matches any visible text in the row
-            if search:
-                row_str = f"{inv['invoice_number']} {inv['client_name']} {inv['status']}".lower()
-                if search not in row_str:
-                    continue
-            
             status = inv.get("status", "ACTIVE")
             tag = "cancelled" if status == "CANCELLED" else ""
             
             # Format row for treeview: (id, num, client, total, paid, due, status, date)
-            # Note: The controller only returns a partial dict in get_all_invoices
             self.tree.insert("", "end", values=(
                 inv["invoice_id"], inv["invoice_number"], inv["client_name"],
                 f"Rs. {inv['total_amount']:,.2f}", 
@@ -85,8 +131,15 @@ class InvoiceManagementView(tk.Frame):
                 f"Rs. {inv.get('due_amount', 0):,.2f}",
                 status, inv["date"]
             ), tags=(tag,))
+        if invoices:
+            self._last_id = invoices[-1]["invoice_id"]
 
-        self.tree.tag_configure("cancelled", foreground=self.C["danger"])
+    def _on_tree_scroll(self, first, last):
+        """Keep the scrollbar in sync and fetch the next page near the bottom."""
+        self.scrollbar.set(first, last)
+        if float(last) >= 0.9 and self._has_more and not self._page_pending:
+            self._page_pending = True
+            self.after_idle(self._load_next_page)
 
     def view_invoice(self):
         sel = self.tree.selection()
@@ -99,18 +152,19 @@ class InvoiceManagementView(tk.Frame):
         sel = self.tree.selection()
         if not sel:
             return messagebox.showinfo("Select", "Select an invoice to cancel.")
-        inv_id = self.tree.item(sel[0])["values"][0]
+        inv_ids = [self.tree.item(s)["values"][0] for s in sel]
+        title = "Cancel Invoice" if len(inv_ids) == 1 else f"Cancel {len(inv_ids)} Invoices"
 
         # Cancel dialog
         dialog = tk.Toplevel(self)
-        dialog.title("Cancel Invoice")
+        dialog.title(title)
         dialog.geometry("420x350")
         dialog.configure(bg="white")
         dialog.resizable(False, False)
         dialog.transient(self)
         dialog.grab_set()
 
-        tk.Label(dialog, text="Cancel Invoice", font=self.F["h3"],
+        tk.Label(dialog, text=title, font=self.F["h3"],
                  bg="white", fg=self.C["danger"]).pack(pady=(20, 8))
         tk.Label(dialog, text="This action cannot be undone.", font=self.F["small"],
                  bg="white", fg=self.C["secondary"]).pack()
@@ -140,9 +194,9 @@ class InvoiceManagementView(tk.Frame):
             if not reason or reason == "Select a reason...":
                 return messagebox.showerror("Required", "Please select a cancellation reason.")
             try:
-                InvoiceController.cancel_invoice(inv_id, reason, comment_entry.get().strip())
+                InvoiceController.cancel_invoices(inv_ids, reason, comment_entry.get().strip())
                 dialog.destroy()
-                messagebox.showinfo("Cancelled", "Invoice has been cancelled.")
+                messagebox.showinfo("Cancelled", f"{len(inv_ids)} invoice(s) cancelled.")
                 self.load_invoices()
             except Exception as e:
                 messagebox.showerror("Error", str(e))
@@ -151,3 +205,83 @@ class InvoiceManagementView(tk.Frame):
                     command=do_cancel).pack(side="right")
         ttk.Button(btn_frame, text="Go Back", style="Ghost.TButton",
                     command=dialog.destroy).pack(side="left")
+
+    def export_pdfs(self):
+        """Batch-export every invoice and credit note of a fiscal year or date range."""
+        dialog = tk.Toplevel(self)
+        dialog.title("Export Invoice PDFs")
+        dialog.geometry("420x420")
+        dialog.configure(bg="white")
+        dialog.resizable(False, False)
+        dialog.transient(self)
+        dialog.grab_set()
+
+        tk.Label(dialog, text="Export Invoice PDFs", font=self.F["h3"],
+                 bg="white", fg=self.C["primary"]).pack(pady=(20, 8))
+
+        fields = {}
+        for key, label, default in [("fiscal_year", "FISCAL YEAR", InvoiceUtils.get_fiscal_year_nepali()),
+                                    ("start_date", "FROM DATE (YYYY-MM-DD, OPTIONAL)", ""),
+                                    ("end_date", "TO DATE (YYYY-MM-DD, OPTIONAL)", "")]:
+            tk.Label(dialog, text=label, font=self.F["small_bold"],
+                     bg="white", fg=self.C["secondary"]).pack(anchor="w", padx=30, pady=(8, 2))
+            entry = tk.Entry(dialog, font=self.F["body"], bg=self.C["input_bg"],
+                             relief="flat", highlightthickness=2,
+                             highlightbackground=self.C["input_border"],
+                             highlightcolor=self.C["primary"])
+            entry.insert(0, default)
+            entry.pack(fill="x", padx=30, ipady=4)
+            fields[key] = entry
+
+        as_zip = tk.BooleanVar(value=True)
+        tk.Checkbutton(dialog, text="Single ZIP archive", variable=as_zip,
+                       bg="white", font=self.F["body"]).pack(anchor="w", padx=26, pady=(10, 0))
+
+        progress = ttk.Progressbar(dialog, mode="determinate")
+        progress.pack(fill="x", padx=30, pady=(12, 4))
+        status = tk.Label(dialog, text="", font=self.F["small"], bg="white", fg=self.C["secondary"])
+        status.pack()
+
+        btn_frame = tk.Frame(dialog, bg="white")
+        btn_frame.pack(fill="x", padx=30, pady=16)
+
+        def on_progress(done, total):
+            # Called on the export thread; hand the update to the UI thread
+            def update():
+                if dialog.winfo_exists():
+                    progress.configure(maximum=max(total, 1), value=done)
+                    status.configure(text=f"{done} of {total} PDFs")
+            self.after(0, update)
+
+        def do_export():
+            filters = {k: e.get().strip() or None for k, e in fields.items()}
+            if as_zip.get():
+                safe_fy = (filters["fiscal_year"] or "all").replace("/", "-")
+                destination = filedialog.asksaveasfilename(
+                    parent=dialog, defaultextension=".zip", initialfile=f"Invoices_{safe_fy}.zip",
+                    filetypes=[("ZIP archive", "*.zip")])
+            else:
+                destination = filedialog.askdirectory(parent=dialog)
+            if not destination:
+                return
+            export_btn.state(["disabled"])
+            status.configure(text="Starting workers...")
+
+            def on_success(count):
+                if dialog.winfo_exists():
+                    dialog.destroy()
+                messagebox.showinfo("Exported", f"{count} PDFs saved to {destination}")
+
+            def on_error(e):
+                if dialog.winfo_exists():
+                    export_btn.state(["!disabled"])
+                    status.configure(text="")
+                messagebox.showerror("Error", f"Export failed: {e}")
+
+            run_async(self, BatchPDFExporter(render_service=render_service).export, on_success, on_error,
+                      destination, as_zip.get(), progress=on_progress, **filters)
+
+        export_btn = ttk.Button(btn_frame, text="Export", style="Gold.TButton", command=do_export)
+        export_btn.pack(side="right")
+        ttk.Button(btn_frame, text="Close", style="Ghost.TButton",
+                    command=dialog.destroy).pack(side="left")
@@ -12,12 +12,14 @@ from controllers.settings_controller import SettingsController
 import os
 import sys
 from services.pdf_service import PDFService
+from services.render_service import render_service
 from PIL import Image, ImageTk
 from utils.invoice_utils import InvoiceUtils
-from utils.async_utils import run_async
 
 
 class InvoiceView(tk.Frame):
+    PRODUCT_PICKER_LIMIT = 20
+
     def __init__(self, parent, controller, invoice_id=None, **kwargs):
         super().__init__(parent)
         self.controller = controller
@@ -177,11 +179,13 @@ class InvoiceView(tk.Frame):
         tk.Label(form, text="SELECT PRODUCT", font=self.F["h3"],
                  bg="white", fg=self.C["primary"]).pack(anchor="w", pady=(0, 10))
 
-        self.product_list = ProductController.get_all_products()
-        self.prod_dropdown = ttk.Combobox(
-            form, values=[f"{p[1]} (Rs. {p[2]}/{p[5]})" for p in self.product_list],
-            font=self.F["body"])
+        # Type-ahead picker: only the best matches for the typed text are loaded
+        self.product_matches = {}
+        self._product_search_job = None
+        self.prod_dropdown = ttk.Combobox(form, font=self.F["body"])
         self.prod_dropdown.pack(fill="x", pady=5)
+        self.prod_dropdown.bind("<KeyRelease>", self.on_product_typed)
+        self.refresh_product_matches()
 
         tk.Label(form, text="QUANTITY", font=self.F["small_bold"],
                  bg="white", fg=self.C["secondary"]).pack(anchor="w", pady=(10, 0))
@@ -217,14 +221,38 @@ class InvoiceView(tk.Frame):
         ttk.Button(nav, text="CANCEL ❌", style="Ghost.TButton",
                     command=self.controller.show_dashboard).pack(side="right", padx=10)
 
+    def on_product_typed(self, event):
+        if event.keysym in ("Up", "Down", "Return", "Escape", "Tab"):
+            return
+        if self._product_search_job:
+            self.after_cancel(self._product_search_job)
+        self._product_search_job = self.after(150, self.refresh_product_matches)
+
+    def refresh_product_matches(self):
+        """Reload the picker with the products best matching the typed text."""
+        self._product_search_job = None
+        text = self.prod_dropdown.get()
+        if text in self.product_matches:
+            return
+        product_ids = ProductController.search_product_ids(text, limit=self.PRODUCT_PICKER_LIMIT)
+        self.product_matches = {
+            f"{p[1]} (Rs. {p[2]}/{p[5]})": p
+            for p in ProductController.get_products_by_ids(product_ids)
+        }
+        self.prod_dropdown["values"] = list(self.product_matches)
+
     def add_product(self):
         val = self.prod_dropdown.get()
         qty_str = self.qty_entry.get()
         if not qty_str.isdigit():
             return messagebox.showerror("Error", "Invalid quantity")
         qty = int(qty_str)
-        selected = next((p for p in self.product_list
-                         if f"{p[1]} (Rs. {p[2]}/{p[5]})" == val), None)
+        selected = self.product_matches.get(val)
+        if selected is None and val.strip():
+            # Typed text without picking: accept it if it identifies a single product
+            product_ids = ProductController.search_product_ids(val, limit=2)
+            if len(product_ids) == 1:
+                selected = ProductController.get_products_by_ids(product_ids)[0]
         if selected:
             pid, name, price, hs, unit = selected[0], selected[1], selected[2], selected[3], selected[5]
             existing = next((item for item in self.invoice_items
@@ -528,23 +556,14 @@ class InvoiceView(tk.Frame):
             grand_total = taxable + tax_amount
             due_amount = grand_total - paid_amt
 
-            # Generate invoice number
-            if not self.invoice_number:
-                self.invoice_number = InvoiceUtils.generate_invoice_number(self.current_fiscal_year)
-
-            invoice_id = InvoiceController.create_invoice(
-                self.invoice_number, self.cust_name, self.cust_contact,
+            # Number allocation, items and stock decrements commit together
+            invoice_id, self.invoice_number = InvoiceController.save_invoice(
+                self.cust_name, self.cust_contact,
                 self.cust_address, self.cust_tax, self.invoice_items,
-                vat_rate, discount_pct, paid_amt
+                vat_rate, discount_pct, paid_amt,
+                fiscal_year=self.current_fiscal_year
             )
 
-            # Update inventory
-            for item in self.invoice_items:
-                try:
-                    ProductController.adjust_stock(item["product_id"], -item["quantity"])
-                except Exception:
-                    pass
-
             messagebox.showinfo("Success", "Invoice Saved Successfully!")
             self.invoice_id = invoice_id
             
@@ -565,6 +584,7 @@ class InvoiceView(tk.Frame):
         self.cust_address = data["address"]
         self.cust_tax = data["pan_no"]
         self.invoice_number = data["invoice_number"]
+        self.invoice_date = data["date"]
         self.invoice_items = items
         self.vat_rate = data["vat_rate"]
         self.discount = data["discount"]
@@ -578,8 +598,6 @@ class InvoiceView(tk.Frame):
 
     def print_invoice(self, on_exit=None):
         try:
-            pdf_service = PDFService()
-
             invoice_data = {
                 "invoice_number": self.invoice_number,
                 "client_name": self.cust_name,
@@ -593,18 +611,12 @@ class InvoiceView(tk.Frame):
                 "cancel_reason": getattr(self, 'cancel_reason', ''),
                 "cancelled_date": getattr(self, 'cancelled_date', ''),
                 "is_credit_note": getattr(self, 'is_credit_note', False),
-                "company_name": self.settings.get("company_name", Settings.COMPANY_NAME),
-                "company_address": self.settings.get("company_address", Settings.COMPANY_ADDRESS),
-                "company_pan": self.settings.get("company_pan", Settings.COMPANY_PAN),
-                "company_contact": getattr(Settings, 'COMPANY_CONTACT', '9704508000'),
-                "company_email": getattr(Settings, 'COMPANY_EMAIL', 'moonalpvtltd@gmail.com'),
+                "date": getattr(self, 'invoice_date', None),
+                **PDFService.company_fields(self.settings),
             }
 
             self.configure(cursor="watch")
 
-            def generate_task():
-                return pdf_service.generate_invoice_pdf(invoice_data, self.invoice_items)
-
             def on_success(pdf_path):
                 if not self.winfo_exists(): return
                 try:
@@ -612,7 +624,7 @@ class InvoiceView(tk.Frame):
                 except tk.TclError: pass
                 
                 try:
-                    pdf_service.open_pdf(pdf_path)
+                    PDFService.open_pdf(pdf_path)
                     # Optional: messagebox.showinfo("Success", f"PDF generated at {pdf_path}")
                 except Exception as e:
                     messagebox.showerror("Error", f"PDF generated but could not open: {e}")
@@ -627,8 +639,8 @@ class InvoiceView(tk.Frame):
                 except tk.TclError: pass
                 messagebox.showerror("Error", f"Failed to generate PDF: {str(e)}")
 
-            from utils.async_utils import run_async
-            run_async(self, generate_task, on_success, on_error)
+            render_service.render_invoice(invoice_data, self.invoice_items, profile=Settings.PDF_PROFILE,
+                                          widget=self, on_success=on_success, on_error=on_error)
 
         except Exception as e:
             if self.winfo_exists():
@@ -7,7 +7,7 @@ from tkinter import ttk, messagebox
 from controllers.authController import AuthController
 from config.settings import Settings
 from datetime import datetime
-import nepali_datetime
+from utils import nepali_calendar
 
 
 
@@ -181,10 +181,9 @@ class LoginView(tk.Frame):
         
         if self.show_nepali_date:
             try:
-                # Convert to Nepali Date
-                nd = nepali_datetime.date.from_datetime_date(now.date())
-                date_str = f"{nd.year}-{nd.month:02}-{nd.day:02} (BS)"
-            except Exception:
+                # Table lookup, memoised per day
+                date_str = f"{nepali_calendar.format_bs(now.date())} (BS)"
+            except ValueError:
                 date_str = now.strftime("%A, %B %d, %Y")
         else:
             date_str = now.strftime("%A, %B %d, %Y")
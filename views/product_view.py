@@ -172,8 +172,7 @@ class ProductView(tk.Frame):
         values = self.tree.item(sel[0])["values"]
         pid = int(values[0])  # Cast to int to match DB type
         try:
-            products = ProductController.get_all_products()
-            product = next((p for p in products if p[0] == pid), None)
+            product = ProductController.get_product_by_id(pid)
         except Exception:
             product = None
 
@@ -6,8 +6,10 @@ import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
 from config.settings import Settings
 from controllers.report_controller import ReportController
-import csv
-import os
+from utils import nepali_calendar
+from utils.async_utils import run_report_async
+from utils.invoice_utils import InvoiceUtils
+from datetime import date
 
 try:
     from tkcalendar import DateEntry
@@ -34,12 +36,16 @@ class ReportsView(tk.Frame):
         tk.Label(filters, text="Date Range:", font=self.F["body_bold"],
                  bg="white", fg=self.C["text"]).pack(side="left")
 
+        # Default to the current fiscal year
+        fy_start, fy_end = nepali_calendar.fiscal_year_range(InvoiceUtils.get_fiscal_year_nepali())
         if HAS_CALENDAR:
             self.start_date = DateEntry(filters, font=self.F["body"], width=12)
+            self.start_date.set_date(fy_start)
             self.start_date.pack(side="left", padx=(8, 4))
             tk.Label(filters, text="to", bg="white", fg=self.C["secondary"],
                      font=self.F["body"]).pack(side="left")
             self.end_date = DateEntry(filters, font=self.F["body"], width=12)
+            self.end_date.set_date(min(fy_end, date.today()))
             self.end_date.pack(side="left", padx=(4, 12))
         else:
             tk.Label(filters, text="From:", bg="white", fg=self.C["secondary"],
@@ -50,7 +56,7 @@ class ReportsView(tk.Frame):
                                         highlightbackground=self.C["input_border"],
                                         highlightcolor=self.C["primary"])
             self.start_date.pack(side="left", padx=(0, 4), ipady=3)
-            self.start_date.insert(0, "2024-01-01")
+            self.start_date.insert(0, fy_start.isoformat())
 
             tk.Label(filters, text="To:", bg="white", fg=self.C["secondary"],
                      font=self.F["small"]).pack(side="left", padx=(4, 2))
@@ -60,12 +66,17 @@ class ReportsView(tk.Frame):
                                       highlightbackground=self.C["input_border"],
                                       highlightcolor=self.C["primary"])
             self.end_date.pack(side="left", padx=(0, 12), ipady=3)
-            self.end_date.insert(0, "2025-12-31")
+            self.end_date.insert(0, min(fy_end, date.today()).isoformat())
 
         ttk.Button(filters, text="Generate Report", style="Gold.TButton",
                     command=self.generate_report).pack(side="left", padx=4)
-        ttk.Button(filters, text="📥 Export CSV", style="Ghost.TButton",
-                    command=self.export_csv).pack(side="right")
+        ttk.Button(filters, text="🧾 VAT Return", style="Ghost.TButton",
+                    command=self.open_vat_return).pack(side="left", padx=4)
+        ttk.Button(filters, text="📥 Export", style="Ghost.TButton",
+                    command=self.export_report).pack(side="right")
+        self.export_status = tk.Label(filters, text="", font=self.F["small"],
+                                      bg="white", fg=self.C["secondary"])
+        self.export_status.pack(side="right", padx=8)
 
         # Stats cards
         self.stats_frame = tk.Frame(self, bg=self.C["bg"], padx=24, pady=12)
@@ -84,25 +95,34 @@ class ReportsView(tk.Frame):
             self.tree.heading(c, text=c)
             self.tree.column(c, width=100 if len(c) < 5 else 125)
 
+    def _date_range(self):
+        if HAS_CALENDAR:
+            return (self.start_date.get_date().strftime("%Y-%m-%d"),
+                    self.end_date.get_date().strftime("%Y-%m-%d"))
+        return self.start_date.get().strip(), self.end_date.get().strip()
+
     def generate_report(self):
         try:
-            if HAS_CALENDAR:
-                start = self.start_date.get_date().strftime("%Y-%m-%d")
-                end = self.end_date.get_date().strftime("%Y-%m-%d")
-            else:
-                start = self.start_date.get().strip()
-                end = self.end_date.get().strip()
+            start, end = self._date_range()
+        except Exception as e:
+            return messagebox.showerror("Error", str(e))
+
+        # Query on the reporting thread; the table is filled back on the UI thread
+        run_report_async(self, self._load_report, self._show_report,
+                         lambda e: messagebox.showerror("Error", str(e)), start, end)
 
-            data = ReportController.get_sales_register(start, end)
+    @staticmethod
+    def _load_report(start, end):
+        """Register rows plus the stat card totals, which come from the daily rollup."""
+        return ReportController.get_sales_register(start, end), ReportController.get_sales_summary(start, end)
 
+    def _show_report(self, report):
+        try:
+            data, summary = report
             # Clear table
             for i in self.tree.get_children():
                 self.tree.delete(i)
 
-            total_revenue = 0
-            total_vat = 0
-            total_taxable = 0
-
             for row in data:
                 # row is a dict: {"Date", "Invoice No", "Customer", "PAN", "Taxable", "VAT", "Total", "Type"}
                 self.tree.insert("", "end", values=(
@@ -110,22 +130,16 @@ class ReportsView(tk.Frame):
                     f"Rs. {row['Taxable']:,.2f}", f"Rs. {row['VAT']:,.2f}",
                     f"Rs. {row['Total']:,.2f}", row["Type"]
                 ))
-                try:
-                    total_revenue += float(row["Total"])
-                    total_vat += float(row["VAT"])
-                    total_taxable += float(row["Taxable"])
-                except (ValueError, TypeError):
-                    pass
 
             # Update stats
             for w in self.stats_frame.winfo_children():
                 w.destroy()
 
             stats = [
-                ("Total Revenue", f"Rs. {total_revenue:,.0f}", self.C["primary"]),
-                ("Taxable Amount", f"Rs. {total_taxable:,.0f}", self.C["info"]),
-                ("VAT Collected", f"Rs. {total_vat:,.0f}", self.C["success"]),
-                ("Record Count", str(len(data)), self.C["warning"]),
+                ("Total Revenue", f"Rs. {summary['total']:,.0f}", self.C["primary"]),
+                ("Taxable Amount", f"Rs. {summary['taxable']:,.0f}", self.C["info"]),
+                ("VAT Collected", f"Rs. {summary['vat']:,.0f}", self.C["success"]),
+                ("Invoices Issued", str(summary["invoice_count"]), self.C["warning"]),
             ]
 
             for i, (lbl, val, color) in enumerate(stats):
@@ -142,21 +156,94 @@ class ReportsView(tk.Frame):
         except Exception as e:
             messagebox.showerror("Error", str(e))
 
-    def export_csv(self):
-        items = self.tree.get_children()
-        if not items:
-            return messagebox.showinfo("No Data", "Generate a report first.")
-        path = filedialog.asksaveasfilename(defaultextension=".csv",
-                                             filetypes=[("CSV", "*.csv")])
-        if not path:
-            return
+    def export_report(self):
+        """Stream the selected period's register to Excel or CSV on the reporting thread."""
         try:
-            with open(path, "w", newline="") as f:
-                writer = csv.writer(f)
-                cols = [self.tree.heading(c)["text"] for c in self.tree["columns"]]
-                writer.writerow(cols)
-                for item in items:
-                    writer.writerow(self.tree.item(item)["values"])
-            messagebox.showinfo("Exported", f"Report saved to {path}")
+            start, end = self._date_range()
         except Exception as e:
+            return messagebox.showerror("Error", str(e))
+        path = filedialog.asksaveasfilename(defaultextension=".xlsx",
+                                             initialfile=f"sales_register_{start}_{end}.xlsx",
+                                             filetypes=[("Excel Workbook", "*.xlsx"), ("CSV", "*.csv")])
+        if not path:
+            return
+
+        def on_progress(done, total):
+            # Called on the reporting thread; hand the update to the UI thread
+            self.after(0, lambda: self.export_status.configure(text=f"Exporting {done:,} of {total:,} rows"))
+
+        def on_success(count):
+            self.export_status.configure(text="")
+            messagebox.showinfo("Exported", f"{count:,} rows saved to {path}")
+
+        def on_error(e):
+            self.export_status.configure(text="")
             messagebox.showerror("Error", str(e))
+
+        run_report_async(self, ReportController.export_sales_register, on_success, on_error,
+                         start, end, path, progress=on_progress)
+
+    def open_vat_return(self):
+        """Month-by-month VAT return figures for a fiscal year, with export."""
+        dialog = tk.Toplevel(self)
+        dialog.title("VAT Return")
+        dialog.geometry("1100x480")
+        dialog.configure(bg="white")
+        dialog.transient(self)
+
+        top = tk.Frame(dialog, bg="white", padx=20, pady=14)
+        top.pack(fill="x")
+        tk.Label(top, text="FISCAL YEAR", font=self.F["small_bold"],
+                 bg="white", fg=self.C["secondary"]).pack(side="left")
+        fiscal_year = tk.Entry(top, font=self.F["body"], width=12, bg=self.C["input_bg"],
+                               relief="flat", highlightthickness=2,
+                               highlightbackground=self.C["input_border"],
+                               highlightcolor=self.C["primary"])
+        fiscal_year.insert(0, InvoiceUtils.get_fiscal_year_nepali())
+        fiscal_year.pack(side="left", padx=8, ipady=3)
+
+        columns = ReportController.VAT_RETURN_COLUMNS
+        tree = ttk.Treeview(dialog, columns=[key for key, _ in columns], show="headings",
+                            style="Custom.Treeview", height=13)
+        for key, heading in columns:
+            tree.heading(key, text=heading)
+            tree.column(key, width=110 if key == "period" else 82,
+                        anchor="w" if key in ("period", "start_date", "end_date") else "e")
+        tree.pack(fill="both", expand=True, padx=20, pady=(0, 16))
+
+        def show(periods):
+            if not dialog.winfo_exists():
+                return
+            tree.delete(*tree.get_children())
+            totals = {key: 0 for key, _ in columns[3:]}
+            for period in periods:
+                for key in totals:
+                    totals[key] += period[key]
+                tree.insert("", "end", values=self._vat_return_values(period))
+            tree.insert("", "end", values=self._vat_return_values({"period": "Total", "start_date": "",
+                                                                   "end_date": "", **totals}))
+
+        def load():
+            run_report_async(self, ReportController.get_vat_return, show,
+                             lambda e: messagebox.showerror("Error", str(e), parent=dialog),
+                             fiscal_year.get().strip())
+
+        def export():
+            fy = fiscal_year.get().strip()
+            path = filedialog.asksaveasfilename(parent=dialog, defaultextension=".xlsx",
+                                                 initialfile=f"VAT_Return_{fy.replace('/', '-')}.xlsx",
+                                                 filetypes=[("Excel Workbook", "*.xlsx"), ("CSV", "*.csv")])
+            if path:
+                run_report_async(self, ReportController.export_vat_return,
+                                 lambda _: messagebox.showinfo("Exported", f"VAT return saved to {path}",
+                                                               parent=dialog),
+                                 lambda e: messagebox.showerror("Error", str(e), parent=dialog), fy, path)
+
+        ttk.Button(top, text="Show", style="Gold.TButton", command=load).pack(side="left", padx=4)
+        ttk.Button(top, text="📥 Export", style="Ghost.TButton", command=export).pack(side="right")
+        load()
+
+    @staticmethod
+    def _vat_return_values(period):
+        return [f"{period[key]:,.2f}" if key in ReportController.VAT_RETURN_AMOUNTS else period[key]
+                for key, _ in ReportController.VAT_RETURN_COLUMNS]